@@ -0,0 +1,136 @@
+import time # Para limitar el tiempo del precálculo en cada llamada
+from typing import Dict, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from solucionador import contar_fichas, hijos
+from tableros import Tablero
+
+# Tableros con más huecos que este no se analizan enteros bajo demanda (serían millones de estados)
+LIMITE_HUECOS_EXACTO = 21
+
+
+# Valor de un estado del tablero:
+#   resoluble     -> si se puede terminar con una sola ficha (None = desconocido)
+#   mejor_fichas  -> menor número de fichas alcanzable (si no es exacto, cota inferior o,
+#                    con Monte Carlo, el mejor resultado encontrado)
+#   soluciones    -> número de secuencias de saltos que terminan en una ficha (None = desconocido)
+#   exacta        -> si los tres valores están calculados y no son estimaciones
+#   visitas       -> simulaciones de Monte Carlo que pasaron por el estado (0 = sin Monte Carlo)
+class Evaluacion:
+    def __init__(self, resoluble: Optional[bool], mejor_fichas: int, soluciones: Optional[int], exacta: bool,
+                 visitas: int = 0):
+        self.resoluble = resoluble
+        self.mejor_fichas = mejor_fichas
+        self.soluciones = soluciones
+        self.exacta = exacta
+        self.visitas = visitas
+
+    # Clave para ordenar de mejor a peor: resoluble primero, luego menos fichas, más
+    # soluciones y más visitas de Monte Carlo
+    def clave(self) -> Tuple[int, int, int, int]:
+        orden_resoluble = 0 if self.resoluble else (2 if self.resoluble is False else 1)
+        return (orden_resoluble, self.mejor_fichas, -(self.soluciones or 0), -self.visitas)
+
+
+# Analizador de estados con memoria compartida: para cada estado calcula el mejor número
+# de fichas alcanzable y cuántas soluciones tiene, recorriendo el grafo de estados una
+# sola vez. Los valores se guardan en un diccionario, así que después de analizar la
+# posición inicial cualquier estado posterior de la partida se consulta al instante.
+# Si hay tabla en disco (tablabase.py) se usa para los tableros demasiado grandes.
+class AnalizadorEstados:
+
+    def __init__(self, tablero: Tablero, tablabase=None):
+        self.tablero = tablero
+        self.saltos = tablero.saltos
+        self.tablabase = tablabase
+        self.valores: Dict[int, Tuple[int, int]] = {}  # {estado: (mejor_fichas, soluciones)}
+
+        # Estado del precálculo incremental (se puede pausar y reanudar)
+        self.raiz_pendiente = None
+        self.pila = []  # [estado, hijos, indice, mejor_fichas, soluciones]
+        self.nodos_expandidos = 0
+        self.consultas = 0
+        self.aciertos = 0  # Consultas respondidas sin calcular nada
+
+    # Indica si un estado ya está analizado
+    def conocido(self, mascara: int) -> bool:
+        return mascara in self.valores
+
+    # Analiza todos los estados alcanzables desde una máscara durante como máximo
+    # presupuesto_ms milisegundos (None = hasta terminar). Devuelve True al terminar.
+    def precalcular(self, mascara: int, presupuesto_ms: Optional[float] = None) -> bool:
+        valores = self.valores
+        if mascara in valores:
+            return True
+        if mascara != self.raiz_pendiente:
+            # Nueva raíz: lo ya calculado se conserva en el diccionario
+            self.raiz_pendiente = mascara
+            self.pila = [[mascara, hijos(mascara, self.saltos), 0, contar_fichas(mascara), 0]]
+
+        limite = None if presupuesto_ms is None else time.perf_counter() + presupuesto_ms / 1000
+        pila = self.pila
+        saltos = self.saltos
+        contador = 0
+
+        while pila:
+            nodo = pila[-1]
+            lista_hijos = nodo[1]
+            if nodo[2] < len(lista_hijos):
+                hijo = lista_hijos[nodo[2]]
+                nodo[2] += 1
+                valor = valores.get(hijo)
+                if valor is None:
+                    # Hijo sin analizar: se baja a él
+                    pila.append([hijo, hijos(hijo, saltos), 0, contar_fichas(hijo), 0])
+                    self.nodos_expandidos += 1
+                    contador += 1
+                    if limite is not None and contador & 63 == 0 and time.perf_counter() >= limite:
+                        return False
+                    continue
+            else:
+                # Todos los hijos analizados: se guarda el valor del nodo y se sube
+                pila.pop()
+                if not lista_hijos and nodo[3] == 1:
+                    nodo[4] = 1  # Una ficha sola: es una solución
+                valor = (nodo[3], nodo[4])
+                valores[nodo[0]] = valor
+                if not pila:
+                    break
+                nodo = pila[-1]
+
+            # Combina el valor del hijo con el del nodo padre
+            if valor[0] < nodo[3]:
+                nodo[3] = valor[0]
+            nodo[4] += valor[1]
+
+        self.raiz_pendiente = None
+        return True
+
+    # Evalúa un estado usando lo ya calculado o, en tableros pequeños, analizándolo
+    # en el momento; en los grandes recurre a la tabla en disco o a la paridad. Con
+    # calcular=False nunca analiza nada (para quien no puede esperar, como la interfaz):
+    # lo que no esté calculado sale también de la tabla o de la paridad.
+    def evaluar(self, mascara: int, calcular: bool = True) -> Evaluacion:
+        self.consultas += 1
+        valor = self.valores.get(mascara)
+        if valor is not None:
+            self.aciertos += 1
+        elif calcular and self.tablero.num_huecos <= LIMITE_HUECOS_EXACTO:
+            self.precalcular(mascara)
+            valor = self.valores[mascara]
+
+        if valor is not None:
+            return Evaluacion(valor[0] == 1, valor[0], valor[1], True)
+
+        # Sin análisis completo: tabla en disco o, si no hay, la cota de paridad
+        if self.tablabase is not None:
+            mejor = self.tablabase.mejor_fichas(mascara)
+            resoluble = self.tablabase.es_resoluble(mascara)
+            if mejor is None:
+                mejor = 1 if resoluble else max(2, self.tablero.cota_fichas(mascara))
+            return Evaluacion(resoluble, mejor, None, False)
+        cota = self.tablero.cota_fichas(mascara)
+        return Evaluacion(False if cota > 1 else None, cota, None, False)
+
+    # Fracción de consultas respondidas sin calcular (para estadísticas)
+    def tasa_aciertos(self) -> float:
+        return self.aciertos / self.consultas if self.consultas else 0.0
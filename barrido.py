@@ -0,0 +1,209 @@
+import argparse # Para las órdenes de línea de comandos
+import multiprocessing # Para repartir cada capa entre varios procesos
+import os # Para saber cuántos núcleos hay
+import struct # Para escribir la cabecera de la tabla
+import time # Para informar del tiempo de cada capa
+import zlib # Para la suma de control (CRC32) de la tabla
+from multiprocessing import shared_memory # Para que los procesos escriban los resultados sin copiarlos
+from typing import Callable, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from tableros import Tablero, cargar_tablero
+from tablabase import FIRMA, FORMATO_CABECERA, TAM_CABECERA, VERSION_FORMATO, combinaciones_bits, ruta_por_defecto
+
+# Bits altos del índice que fijan cada tarea: cada capa se parte en hasta 2^BITS_PREFIJO trozos
+BITS_PREFIJO = 8
+
+
+# Barrido completo del espacio de estados de un tablero. Para cada estado se calcula el
+# menor número de fichas alcanzable y se guarda en un byte de una memoria compartida
+# (el índice es la máscara sin el bit 0; el estado vacío vale 0). Los estados se
+# procesan por capas de fichas: un salto siempre quita una ficha, así que una capa solo
+# depende de la anterior y todos sus estados se pueden calcular a la vez en procesos
+# distintos. Cada proceso escribe sus resultados directamente en la memoria compartida
+# (un byte por estado: dos procesos nunca tocan el mismo byte) y solo devuelve un número.
+
+# Memoria compartida y saltos del proceso actual (se preparan una vez por proceso)
+_memoria = None
+_saltos = None
+
+def _iniciar_proceso(nombre_memoria: str, saltos):
+    global _memoria, _saltos
+    _memoria = shared_memory.SharedMemory(name=nombre_memoria)
+    _saltos = saltos
+
+# Calcula los estados de una capa cuyo índice empieza por un prefijo de bits altos.
+# tarea = (fichas, prefijo, bits_bajos); devuelve cuántos estados ha calculado.
+def _calcular_trozo(tarea: Tuple[int, int, int]) -> int:
+    fichas, prefijo, bits_bajos = tarea
+    datos = _memoria.buf
+    saltos = _saltos
+    base = prefijo << bits_bajos
+    calculados = 0
+    for bajos in combinaciones_bits(bits_bajos, fichas - bin(prefijo).count("1")):
+        indice = base | bajos
+        mascara = indice << 1
+        if fichas == 1:
+            valor = 1
+        else:
+            # Mejor resultado: el mínimo de los hijos (capa anterior, ya calculada)
+            valor = fichas
+            for desde, sobre, hasta, requerida, cambio in saltos:
+                if mascara & requerida == requerida and not mascara >> hasta & 1:
+                    hijo = datos[(mascara ^ cambio) >> 1]
+                    if hijo < valor:
+                        valor = hijo
+                        if valor == 1:
+                            break
+        datos[indice] = valor
+        calculados += 1
+    return calculados
+
+# Tareas de una capa: un trozo por cada prefijo de bits altos que deja sitio a las fichas restantes
+def tareas_capa(num_huecos: int, fichas: int) -> List[Tuple[int, int, int]]:
+    bits_prefijo = min(BITS_PREFIJO, num_huecos)
+    bits_bajos = num_huecos - bits_prefijo
+    tareas = []
+    for prefijo in range(1 << bits_prefijo):
+        restantes = fichas - bin(prefijo).count("1")
+        if 0 <= restantes <= bits_bajos:
+            tareas.append((fichas, prefijo, bits_bajos))
+    return tareas
+
+
+# Resultado de un barrido: un byte por estado con el menor número de fichas alcanzable
+class ResultadoBarrido:
+
+    def __init__(self, tablero: Tablero, memoria: shared_memory.SharedMemory):
+        self.tablero = tablero
+        self.memoria = memoria
+        self.datos = memoria.buf[:1 << tablero.num_huecos]
+
+    # Menor número de fichas alcanzable desde una máscara (bit i = ficha en el hueco i)
+    def mejor_fichas(self, mascara: int) -> int:
+        return self.datos[mascara >> 1]
+
+    # Indica si desde la máscara se puede terminar con una sola ficha
+    def es_resoluble(self, mascara: int) -> bool:
+        return self.datos[mascara >> 1] == 1
+
+    # Cuántos estados hay de cada resultado: {mejor_fichas: cantidad}
+    def resumen(self) -> dict:
+        conteo = [0] * (self.tablero.num_huecos + 1)
+        for valor in self.datos:
+            conteo[valor] += 1
+        return {valor: cantidad for valor, cantidad in enumerate(conteo) if cantidad}
+
+    # Libera la memoria compartida
+    def cerrar(self):
+        self.datos.release()
+        self.memoria.close()
+        self.memoria.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+# Barre todos los estados del tablero con un grupo de procesos (procesos=1 lo hace en
+# este mismo proceso). informar(fichas, estados, segundos) se llama al terminar cada capa.
+def barrer(tablero: Tablero, procesos: Optional[int] = None,
+           informar: Optional[Callable[[int, int, float], None]] = None) -> ResultadoBarrido:
+    global _memoria, _saltos
+    n = tablero.num_huecos
+    memoria = shared_memory.SharedMemory(create=True, size=1 << n)
+    memoria.buf[0] = 0  # Estado vacío
+    procesos = procesos or os.cpu_count() or 1
+
+    grupo = None
+    if procesos > 1:
+        grupo = multiprocessing.Pool(procesos, _iniciar_proceso, (memoria.name, tablero.saltos))
+    else:
+        _memoria, _saltos = memoria, tablero.saltos
+
+    try:
+        for fichas in range(1, n + 1):
+            inicio = time.perf_counter()
+            tareas = tareas_capa(n, fichas)
+            if grupo is not None:
+                # La capa entera debe terminar antes de empezar la siguiente
+                estados = sum(grupo.imap_unordered(_calcular_trozo, tareas))
+            else:
+                estados = sum(map(_calcular_trozo, tareas))
+            if informar:
+                informar(fichas, estados, time.perf_counter() - inicio)
+    except BaseException:
+        memoria.close()
+        memoria.unlink()
+        raise
+    finally:
+        if grupo is not None:
+            grupo.close()
+            grupo.join()
+        _memoria = _saltos = None
+
+    return ResultadoBarrido(tablero, memoria)
+
+
+# Guarda el resultado de un barrido en el formato de tablabase.py (1 o 2 bits por estado)
+def guardar_tablabase(resultado: ResultadoBarrido, ruta: str, bits_por_estado: int = 1):
+    if bits_por_estado not in (1, 2):
+        raise ValueError("bits_por_estado debe ser 1 o 2")
+    tablero = resultado.tablero
+    por_byte = 8 // bits_por_estado
+    datos = bytearray(((1 << tablero.num_huecos) * bits_por_estado + 7) // 8)
+    for indice, mejor in enumerate(resultado.datos):
+        if bits_por_estado == 1:
+            valor = 1 if mejor == 1 else 0
+        else:
+            valor = min(mejor, 4) - 1 if mejor else 0
+        if valor:
+            datos[indice // por_byte] |= valor << ((indice % por_byte) * bits_por_estado)
+
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    cabecera = struct.pack(FORMATO_CABECERA, FIRMA, VERSION_FORMATO, bits_por_estado, tablero.num_huecos,
+                           zlib.crc32(datos), len(datos), tablero.identificador.encode()[:32])
+    temporal = ruta + ".construyendo"
+    with open(temporal, "wb") as archivo:
+        archivo.write(cabecera.ljust(TAM_CABECERA, b"\0"))
+        archivo.write(datos)
+    os.replace(temporal, ruta)
+
+
+# Órdenes de línea de comandos:
+#   python barrido.py triangulo6 [--procesos 8] [--tabla] [--bits 2] [--ruta archivo.tb]
+# Muestra el tiempo de cada capa y el resumen; con --tabla guarda el resultado como tabla
+def main():
+    parser = argparse.ArgumentParser(description="Barrido completo de los estados de un tablero de Comesolo")
+    parser.add_argument("tablero", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("--procesos", type=int, help="procesos a usar (por defecto, uno por núcleo)")
+    parser.add_argument("--tabla", action="store_true", help="guardar el resultado como tabla (tablabase.py)")
+    parser.add_argument("--bits", type=int, default=1, choices=[1, 2], help="bits por estado de la tabla")
+    parser.add_argument("--ruta", help="archivo de la tabla (por defecto en ~/.comesolo_tablas)")
+    argumentos = parser.parse_args()
+
+    tablero = cargar_tablero(argumentos.tablero)
+    print(f"Barriendo {tablero.nombre} ({1 << tablero.num_huecos:,} estados)...")
+
+    def informar(fichas, estados, segundos):
+        velocidad = estados / segundos if segundos > 0 else 0
+        print(f"   Capa de {fichas:2d} fichas: {estados:>11,} estados en {segundos:7.2f} s ({velocidad:,.0f}/s)")
+
+    inicio = time.time()
+    with barrer(tablero, argumentos.procesos, informar) as resultado:
+        print(f"Barrido terminado en {time.time() - inicio:.1f} s")
+        for mejor, cantidad in resultado.resumen().items():
+            if mejor:
+                print(f"   Mejor resultado {mejor:2d} ficha(s): {cantidad:,} estados")
+        if argumentos.tabla:
+            ruta = argumentos.ruta or ruta_por_defecto(tablero)
+            guardar_tablabase(resultado, ruta, argumentos.bits)
+            print(f"Tabla escrita en {ruta}")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
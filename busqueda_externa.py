@@ -0,0 +1,520 @@
+import argparse # Para las órdenes de línea de comandos
+import heapq # Para mezclar las corridas ordenadas
+import itertools # Para codificar y decodificar los bloques por diferencias
+import json # Para el archivo del punto de control
+import operator # Para restar cada estado del anterior al codificar
+import os # Para las rutas y el tamaño de los archivos
+import shutil # Para borrar la carpeta de trabajo
+import tempfile # Para crear la carpeta de trabajo
+import time # Para limitar el tiempo que el solucionador trabaja en cada llamada
+import zlib # Para comprimir los bloques de estados y firmar los saltos del punto de control
+from array import array # Estados empaquetados en enteros de 64 bits
+from bisect import bisect_left, bisect_right # Para buscar un estado en un archivo ordenado
+from typing import Iterator, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from cache_soluciones import guardar_resultado, obtener_cache
+from solucionador import Salto, contar_fichas, salto_entre
+from tableros import Tablero, cargar_tablero
+
+# Estados por bloque comprimido: un bloque es lo que se lee de disco de una vez
+TAM_BLOQUE = 1 << 14
+
+# Estados nuevos que se juntan en memoria antes de volcarlos a disco como una corrida
+# (un conjunto de Python con 2 millones de enteros ocupa unos 150 MB)
+LIMITE_MEMORIA = 2000000
+
+# Archivo del punto de control dentro de la carpeta de una búsqueda, y versión de su formato
+ARCHIVO_CONTROL = "control.json"
+VERSION_CONTROL = 1
+
+# Segundos como máximo entre dos puntos de control (además de uno al volcar cada corrida
+# y otro al terminar cada nivel)
+INTERVALO_CONTROL = 300
+
+
+# Archivo de estados ordenados y sin repetir. Se escribe en orden creciente y se guarda
+# en bloques de TAM_BLOQUE estados: cada bloque guarda la diferencia con el estado
+# anterior (números pequeños que se comprimen muy bien) y se comprime con zlib. En
+# memoria solo queda el primer estado y la posición de cada bloque, así que se puede
+# recorrer de principio a fin o buscar un estado leyendo un único bloque.
+# Con un índice (el de indice(), guardado en un punto de control) se abre un archivo
+# ya terminado sin leerlo; con sincronizar=True, terminar() espera a que los datos
+# estén de verdad en el disco.
+class ArchivoEstados:
+
+    def __init__(self, ruta: str, sincronizar: bool = False, indice: Optional[dict] = None):
+        self.ruta = ruta
+        self.sincronizar = sincronizar
+        self.pendiente = array("Q")
+        if indice is not None:
+            self.archivo = None
+            self.primeros = indice["primeros"]
+            self.posiciones = [tuple(posicion) for posicion in indice["posiciones"]]
+            self.total = indice["total"]
+            return
+        self.archivo = open(ruta, "wb")
+        self.primeros = []  # Primer estado de cada bloque
+        self.posiciones = []  # (desplazamiento, bytes) de cada bloque
+        self.total = 0
+
+    # Añade un estado (mayor que todos los anteriores)
+    def escribir(self, estado: int):
+        self.pendiente.append(estado)
+        if len(self.pendiente) >= TAM_BLOQUE:
+            self.volcar_bloque()
+
+    def volcar_bloque(self):
+        bloque = self.pendiente
+        if not bloque:
+            return
+        diferencias = array("Q", map(operator.sub, bloque, itertools.chain((0,), bloque)))
+        datos = zlib.compress(diferencias.tobytes(), 1)
+        self.primeros.append(bloque[0])
+        self.posiciones.append((self.archivo.tell(), len(datos)))
+        self.archivo.write(datos)
+        self.total += len(bloque)
+        self.pendiente = array("Q")
+
+    # Termina la escritura; a partir de aquí el archivo solo se lee
+    def terminar(self):
+        self.volcar_bloque()
+        if self.sincronizar:
+            self.archivo.flush()
+            os.fsync(self.archivo.fileno())
+        self.archivo.close()
+
+    # Índice de bloques (con el nombre del archivo) para volver a abrirlo sin leerlo
+    def indice(self) -> dict:
+        return {"archivo": os.path.basename(self.ruta), "primeros": self.primeros,
+                "posiciones": self.posiciones, "total": self.total}
+
+    def leer_bloque(self, archivo, indice: int) -> array:
+        desplazamiento, tam = self.posiciones[indice]
+        archivo.seek(desplazamiento)
+        diferencias = array("Q")
+        diferencias.frombytes(zlib.decompress(archivo.read(tam)))
+        return array("Q", itertools.accumulate(diferencias))
+
+    # Recorre los estados en orden creciente, leyendo un bloque cada vez
+    def __iter__(self) -> Iterator[int]:
+        with open(self.ruta, "rb") as archivo:
+            for indice in range(len(self.posiciones)):
+                yield from self.leer_bloque(archivo, indice)
+
+    # Indica si un estado está en el archivo (lee como mucho un bloque)
+    def contiene(self, estado: int) -> bool:
+        indice = bisect_right(self.primeros, estado) - 1
+        if indice < 0:
+            return False
+        with open(self.ruta, "rb") as archivo:
+            bloque = self.leer_bloque(archivo, indice)
+        posicion = bisect_left(bloque, estado)
+        return posicion < len(bloque) and bloque[posicion] == estado
+
+    def bytes_en_disco(self) -> int:
+        return sum(tam for desplazamiento, tam in self.posiciones)
+
+    def borrar(self):
+        os.remove(self.ruta)
+
+
+# Firma de una lista de saltos: un punto de control solo se reanuda con los mismos saltos
+def firma_saltos(saltos: List[Salto]) -> int:
+    return zlib.crc32(repr([salto[:3] for salto in saltos]).encode())
+
+# Escribe un archivo JSON de forma que, pase lo que pase, en disco quede el anterior o
+# el nuevo completo: se escribe aparte, se espera a que llegue al disco y se cambia por
+# el anterior con os.replace (también se sincroniza la carpeta donde el sistema lo permite)
+def escribir_json_seguro(ruta: str, datos: dict):
+    temporal = ruta + ".escribiendo"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(datos, archivo)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+    if hasattr(os, "O_DIRECTORY"):
+        descriptor = os.open(os.path.dirname(ruta) or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+# Solucionador por niveles (como SolucionadorIncremental) para los tableros en los que
+# un nivel no cabe en memoria: triángulos de 8 filas y cruces de 33 y 37 huecos.
+# Cada nivel (todos los estados con el mismo número de fichas) es un ArchivoEstados en
+# disco. Al expandir un nivel, los hijos se juntan en un conjunto de como mucho
+# limite_memoria estados; cada vez que se llena se escribe ordenado como una corrida, y
+# al acabar el nivel las corridas se mezclan en un único archivo quitando los repetidos.
+# No se guardan los padres: el camino se reconstruye hacia atrás buscando, en el
+# archivo del nivel anterior, un estado desde el que se llegue con un salto.
+# La memoria usada no depende del tamaño de los niveles (solo el índice de bloques).
+#
+# Con una carpeta de control, la búsqueda guarda puntos de control para sobrevivir a un
+# cierre inesperado: cada vez que vuelca una corrida, al terminar cada nivel y como
+# mucho cada intervalo_control segundos. Los archivos de estados nunca se reescriben,
+# así que un punto de control solo añade los archivos nuevos y cambia el pequeño
+# ARCHIVO_CONTROL (índices de los niveles, corridas del nivel en curso, cuántos estados
+# del nivel ya tienen sus hijos en ellas y estadísticas) con escribir_json_seguro.
+# Si la carpeta ya tiene un punto de control, la búsqueda sigue desde él sin repetir
+# los niveles terminados ni la parte del nivel en curso ya volcada. En ese modo la
+# carpeta solo se borra cuando la búsqueda termina (no al cancelar ni al fallar).
+class SolucionadorExterno:
+
+    # carpeta: dónde crear la carpeta de trabajo (None = carpeta temporal del sistema)
+    # control: carpeta fija con puntos de control (se crea o se reanuda; None = sin ellos)
+    # nombre_tablero: se guarda en el punto de control para reanudar con reanudar_solucionador_externo
+    def __init__(self, estado_inicial: int, saltos: List[Salto], num_huecos: int, objetivo_fichas: int = 1,
+                 carpeta: Optional[str] = None, limite_memoria: int = LIMITE_MEMORIA,
+                 control: Optional[str] = None, nombre_tablero: Optional[str] = None,
+                 intervalo_control: float = INTERVALO_CONTROL):
+        if num_huecos > 63:
+            raise ValueError("La búsqueda externa admite tableros de hasta 63 huecos")
+        self.estado_inicial = estado_inicial
+        self.saltos = saltos
+        self.objetivo_fichas = objetivo_fichas
+        self.limite_memoria = limite_memoria
+        self.control = control
+        self.nombre_tablero = nombre_tablero
+        self.intervalo_control = intervalo_control
+        if control is not None:
+            os.makedirs(control, exist_ok=True)
+            self.carpeta = control
+        else:
+            self.carpeta = tempfile.mkdtemp(prefix="comesolo_", dir=carpeta)
+
+        # Niveles en disco: niveles[k] tiene los estados con fichas_iniciales - k fichas
+        self.niveles = []
+        self.corridas = 0  # Corridas escritas (para nombrar los archivos)
+        self.corridas_nivel = []  # Corridas ya volcadas del nivel en curso
+        self.expandidos_nivel = 0  # Estados ya expandidos del último nivel
+        self.volcados_nivel = 0  # De ellos, los que tienen sus hijos en corridas_nivel
+
+        # Estadísticas y resultado
+        self.fichas_iniciales = contar_fichas(estado_inicial)
+        self.niveles_totales = max(1, self.fichas_iniciales - objetivo_fichas)
+        self.niveles_completados = 0
+        self.nodos_expandidos = 0
+        self.mejor_estado = estado_inicial
+        self.estado_objetivo = None
+        self.padre_objetivo = None
+        self.terminado = self.fichas_iniciales <= objetivo_fichas
+        self.cancelado = False
+        if self.terminado:
+            self.estado_objetivo = estado_inicial
+
+        if control is not None and os.path.exists(self.ruta_control()):
+            self.cargar_control()
+        else:
+            inicial = ArchivoEstados(self.ruta_nivel(0), self.control is not None)
+            inicial.escribir(estado_inicial)
+            inicial.terminar()
+            self.niveles = [inicial]
+            self.guardar_control()
+        self.proximo_control = time.monotonic() + intervalo_control
+        self.trabajo = self.recorrer()
+
+    def ruta_nivel(self, nivel: int) -> str:
+        return os.path.join(self.carpeta, f"nivel{nivel:03d}.est")
+
+    def ruta_control(self) -> str:
+        return os.path.join(self.carpeta, ARCHIVO_CONTROL)
+
+    # Guarda el punto de control (solo con carpeta de control); los archivos a los que
+    # apunta ya están terminados y sincronizados
+    def guardar_control(self):
+        if self.control is None:
+            return
+        escribir_json_seguro(self.ruta_control(), {
+            "version": VERSION_CONTROL, "tablero": self.nombre_tablero, "estado_inicial": self.estado_inicial,
+            "objetivo_fichas": self.objetivo_fichas, "firma_saltos": firma_saltos(self.saltos),
+            "niveles": [nivel.indice() for nivel in self.niveles], "corridas": self.corridas,
+            "corridas_nivel": [corrida.indice() for corrida in self.corridas_nivel],
+            "volcados_nivel": self.volcados_nivel, "nodos_expandidos": self.nodos_expandidos,
+            "terminado": self.terminado and not self.cancelado, "estado_objetivo": self.estado_objetivo,
+            "padre_objetivo": self.padre_objetivo, "mejor_estado": self.mejor_estado})
+        self.proximo_control = time.monotonic() + self.intervalo_control
+
+    # Sigue desde el punto de control de la carpeta y borra lo que se escribió después
+    # de él (corridas o mezclas a medias, que se volverán a hacer)
+    def cargar_control(self):
+        with open(self.ruta_control(), encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+        if (datos["version"] != VERSION_CONTROL or datos["estado_inicial"] != self.estado_inicial
+                or datos["objetivo_fichas"] != self.objetivo_fichas
+                or datos["firma_saltos"] != firma_saltos(self.saltos)):
+            raise ValueError(f"El punto de control de {self.carpeta} es de otra búsqueda")
+
+        def abrir(indice):
+            return ArchivoEstados(os.path.join(self.carpeta, indice["archivo"]), True, indice)
+
+        self.niveles = [abrir(indice) for indice in datos["niveles"]]
+        self.corridas_nivel = [abrir(indice) for indice in datos["corridas_nivel"]]
+        self.corridas = datos["corridas"]
+        self.expandidos_nivel = self.volcados_nivel = datos["volcados_nivel"]
+        self.nodos_expandidos = datos["nodos_expandidos"]
+        self.niveles_completados = len(self.niveles) - 1
+        self.mejor_estado = datos["mejor_estado"]
+        self.estado_objetivo = datos["estado_objetivo"]
+        self.padre_objetivo = datos["padre_objetivo"]
+        self.terminado = datos["terminado"]
+
+        en_uso = {ARCHIVO_CONTROL} | {os.path.basename(archivo.ruta) for archivo in self.niveles + self.corridas_nivel}
+        for nombre in os.listdir(self.carpeta):
+            if nombre not in en_uso and (nombre.endswith(".est") or nombre.endswith(".mezclando")):
+                os.remove(os.path.join(self.carpeta, nombre))
+
+    # Escribe un conjunto de estados como una corrida ordenada
+    def volcar_corrida(self, estados) -> ArchivoEstados:
+        corrida = ArchivoEstados(os.path.join(self.carpeta, f"corrida{self.corridas:05d}.est"), self.control is not None)
+        self.corridas += 1
+        for estado in sorted(estados):
+            corrida.escribir(estado)
+        corrida.terminar()
+        return corrida
+
+    # La búsqueda como generador: cede el control cada pocos estados para que avanzar
+    # pueda repartir el trabajo en trozos, también en mitad de una mezcla
+    def recorrer(self):
+        saltos = self.saltos
+        contador = 0
+        while not self.terminado:
+            nivel = self.niveles[-1]
+            fichas_hijo = self.fichas_iniciales - len(self.niveles)
+            nuevos = set()
+            corridas = self.corridas_nivel
+
+            # Los primeros volcados_nivel estados (de un punto de control) ya tienen sus hijos en disco
+            for estado in itertools.islice(nivel, self.volcados_nivel, None):
+                self.nodos_expandidos += 1
+                self.expandidos_nivel += 1
+                for desde, sobre, hasta, requerida, cambio in saltos:
+                    if estado & requerida == requerida and not estado >> hasta & 1:
+                        hijo = estado ^ cambio
+                        if fichas_hijo <= self.objetivo_fichas:
+                            self.estado_objetivo = self.mejor_estado = hijo
+                            self.padre_objetivo = estado
+                            self.terminado = True
+                            self.guardar_control()
+                            return
+                        nuevos.add(hijo)
+                if nuevos and (len(nuevos) >= self.limite_memoria
+                               or self.control is not None and time.monotonic() >= self.proximo_control):
+                    corridas.append(self.volcar_corrida(nuevos))
+                    nuevos = set()
+                    self.volcados_nivel = self.expandidos_nivel
+                    self.guardar_control()
+                contador += 1
+                if contador & 63 == 0:
+                    yield
+
+            if not nuevos and not corridas:
+                self.terminado = True  # Ningún estado del último nivel tiene saltos
+                self.guardar_control()
+                return
+            if nuevos:
+                corridas.append(self.volcar_corrida(nuevos))
+                nuevos = None
+
+            # Mezcla las corridas quitando los estados repetidos
+            # (con una sola corrida, la corrida ya es el nivel y se queda con su nombre)
+            if len(corridas) == 1:
+                siguiente = corridas[0]
+            else:
+                siguiente = ArchivoEstados(self.ruta_nivel(len(self.niveles)) + ".mezclando", self.control is not None)
+                anterior = None
+                for estado in heapq.merge(*corridas):
+                    if estado != anterior:
+                        siguiente.escribir(estado)
+                        anterior = estado
+                    contador += 1
+                    if contador & 4095 == 0:
+                        yield
+                siguiente.terminar()
+                os.replace(siguiente.ruta, self.ruta_nivel(len(self.niveles)))
+                siguiente.ruta = self.ruta_nivel(len(self.niveles))
+
+            self.niveles.append(siguiente)
+            self.niveles_completados += 1
+            self.mejor_estado = siguiente.primeros[0]
+            self.corridas_nivel = []
+            self.expandidos_nivel = self.volcados_nivel = 0
+            self.guardar_control()
+
+            # Las corridas se borran cuando el punto de control ya no las necesita
+            if len(corridas) > 1:
+                for corrida in corridas:
+                    corrida.borrar()
+
+    # Trabaja como máximo presupuesto_ms milisegundos (None = hasta terminar)
+    # Devuelve True cuando la búsqueda ha terminado (con o sin éxito)
+    def avanzar(self, presupuesto_ms: Optional[float] = None) -> bool:
+        if self.terminado:
+            return True
+        limite = None if presupuesto_ms is None else time.perf_counter() + presupuesto_ms / 1000
+        for _ in self.trabajo:
+            if limite is not None and time.perf_counter() >= limite:
+                return False
+        self.terminado = True
+        return True
+
+    # Fracción de la búsqueda completada (0.0 - 1.0), según la frontera explorada
+    def progreso(self) -> float:
+        if self.terminado:
+            return 1.0
+        fraccion_nivel = min(1.0, self.expandidos_nivel / max(1, self.niveles[-1].total))
+        return min(1.0, (self.niveles_completados + fraccion_nivel) / self.niveles_totales)
+
+    # Estados guardados en disco y lo que ocupan
+    def estados_en_disco(self) -> int:
+        return sum(nivel.total for nivel in self.niveles)
+
+    def bytes_en_disco(self) -> int:
+        return sum(nivel.bytes_en_disco() for nivel in self.niveles)
+
+    # Detiene la búsqueda y borra los archivos (con carpeta de control se conservan para
+    # poder reanudarla); las siguientes llamadas a avanzar no hacen nada
+    def cancelar(self):
+        self.cancelado = True
+        self.terminado = True
+        self.trabajo.close()
+        self.cerrar()
+
+    # Borra la carpeta de trabajo (después ya no se puede reconstruir el camino).
+    # Una carpeta de control se conserva mientras la búsqueda no haya terminado, y al
+    # borrarla solo se quitan los archivos de la búsqueda (puede tener otros del usuario)
+    def cerrar(self):
+        if self.control is None:
+            shutil.rmtree(self.carpeta, ignore_errors=True)
+            return
+        if self.cancelado or not self.terminado:
+            return
+        for nombre in os.listdir(self.carpeta):
+            if nombre == ARCHIVO_CONTROL or nombre.endswith(".est") or nombre.endswith(".mezclando"):
+                os.remove(os.path.join(self.carpeta, nombre))
+        try:
+            os.rmdir(self.carpeta)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+    # Reconstruye el camino hasta un estado del nivel indicado buscando, nivel a nivel,
+    # un estado anterior del que salga con un salto (ficha en 'hasta', huecos en 'desde' y 'sobre')
+    def camino_hasta(self, estado: int, nivel: int) -> List[int]:
+        camino = [estado]
+        for anterior in range(nivel - 1, -1, -1):
+            for desde, sobre, hasta, requerida, cambio in self.saltos:
+                if estado >> hasta & 1 and not estado & requerida:
+                    padre = estado ^ cambio
+                    if self.niveles[anterior].contiene(padre):
+                        estado = padre
+                        break
+            camino.append(estado)
+        camino.reverse()
+        return camino
+
+    # Devuelve la solución (lista de máscaras desde el inicio) o lista vacía
+    def solucion(self) -> List[int]:
+        if self.cancelado or self.estado_objetivo is None:
+            return []
+        if self.padre_objetivo is None:
+            return [self.estado_objetivo]
+        return self.camino_hasta(self.padre_objetivo, len(self.niveles) - 1) + [self.estado_objetivo]
+
+    # Devuelve el mejor camino encontrado (el que deja menos fichas)
+    def mejor_camino(self) -> List[int]:
+        if self.cancelado:
+            return []
+        if self.estado_objetivo is not None:
+            return self.solucion()
+        return self.camino_hasta(self.mejor_estado, len(self.niveles) - 1)
+
+
+# Crea el solucionador externo de una posición de un tablero, con la cota de paridad
+# del tablero como objetivo (igual que Tablero.nuevo_solucionador)
+def nuevo_solucionador_externo(tablero: Tablero, mascara: int, carpeta: Optional[str] = None,
+                               limite_memoria: int = LIMITE_MEMORIA, control: Optional[str] = None,
+                               nombre_tablero: Optional[str] = None) -> SolucionadorExterno:
+    return SolucionadorExterno(mascara, tablero.saltos, tablero.num_huecos, tablero.cota_fichas(mascara),
+                               carpeta, limite_memoria, control, nombre_tablero or tablero.identificador)
+
+# Reanuda la búsqueda de una carpeta de control: el tablero y la posición salen del
+# punto de control. Devuelve (tablero, solucionador)
+def reanudar_solucionador_externo(control: str, limite_memoria: int = LIMITE_MEMORIA) -> Tuple[Tablero, SolucionadorExterno]:
+    ruta = os.path.join(control, ARCHIVO_CONTROL)
+    if not os.path.exists(ruta):
+        raise ValueError(f"{control} no tiene ningún punto de control")
+    with open(ruta, encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+    tablero = cargar_tablero(datos["tablero"])
+    return tablero, nuevo_solucionador_externo(tablero, datos["estado_inicial"], None, limite_memoria, control,
+                                               datos["tablero"])
+
+
+# Busca con un solucionador externo mostrando el progreso, guarda el resultado en la
+# caché y muestra la solución
+def resolver_y_mostrar(tablero: Tablero, etiqueta: str, solucionador: SolucionadorExterno):
+    cache = obtener_cache(tablero)
+    inicio = time.time()
+    with solucionador:
+        while not solucionador.avanzar(1000):
+            print(f"\r{etiqueta}: {solucionador.progreso():6.1%}  nivel {solucionador.niveles_completados + 1}  "
+                  f"{solucionador.nodos_expandidos:,} nodos  {solucionador.estados_en_disco():,} estados en disco "
+                  f"({solucionador.bytes_en_disco() / 2 ** 20:,.1f} MB)", end="", flush=True)
+        camino = solucionador.mejor_camino()
+        if cache is not None:
+            guardar_resultado(cache, solucionador)
+
+    saltos = [salto_entre(antes, despues, tablero.saltos) for antes, despues in zip(camino, camino[1:])]
+    print(f"\r{etiqueta}: {contar_fichas(camino[-1])} ficha(s) en {time.time() - inicio:.1f} s, "
+          f"{solucionador.nodos_expandidos:,} nodos" + " " * 40)
+    print("   " + " ".join(f"{tablero.etiquetas[d]}→{tablero.etiquetas[h]}" for d, s, h in saltos))
+
+
+# Órdenes de línea de comandos:
+#   python busqueda_externa.py triangulo8 [a1 c3 ...] [--memoria 2000000] [--carpeta /disco/grande]
+#                              [--control /disco/comesolo8]
+#   python busqueda_externa.py --reanudar /disco/comesolo8/a1 [--memoria 2000000]
+# Resuelve cada posición inicial vacía (la primera si no se indica ninguna) con la
+# búsqueda por niveles en disco y guarda el resultado en la caché de soluciones, de
+# modo que después el juego lo encuentra al instante. Con --control cada posición
+# guarda puntos de control en una subcarpeta con su nombre (si ya los tiene, sigue
+# desde ellos); --reanudar continúa la búsqueda de una de esas subcarpetas.
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda por niveles en disco para tableros grandes de Comesolo")
+    parser.add_argument("tablero", nargs="?", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("inicios", nargs="*", help="posiciones vacías iniciales (por defecto, la primera)")
+    parser.add_argument("--memoria", type=int, default=LIMITE_MEMORIA, help="estados como máximo en memoria")
+    parser.add_argument("--carpeta", help="carpeta para los archivos de trabajo (por defecto, la temporal)")
+    parser.add_argument("--control", help="carpeta para guardar puntos de control y poder reanudar")
+    parser.add_argument("--reanudar", help="carpeta de control de una búsqueda a continuar")
+    argumentos = parser.parse_args()
+
+    if argumentos.reanudar:
+        tablero, solucionador = reanudar_solucionador_externo(argumentos.reanudar, argumentos.memoria)
+        etiquetas = [tablero.etiquetas[h] for h in range(1, tablero.num_huecos + 1)
+                     if not solucionador.estado_inicial >> h & 1]
+        print(f"Reanudando desde el nivel {solucionador.niveles_completados + 1} "
+              f"({solucionador.nodos_expandidos:,} nodos ya expandidos)")
+        resolver_y_mostrar(tablero, " ".join(etiquetas), solucionador)
+        return
+    if not argumentos.tablero:
+        parser.error("falta el tablero (o --reanudar)")
+
+    tablero = cargar_tablero(argumentos.tablero)
+    for etiqueta in argumentos.inicios or [tablero.etiquetas[1]]:
+        mascara = tablero.mascara_llena() & ~(1 << tablero.numeros[etiqueta])
+        control = os.path.join(argumentos.control, etiqueta) if argumentos.control else None
+        resolver_y_mostrar(tablero, etiqueta, nuevo_solucionador_externo(tablero, mascara, argumentos.carpeta,
+                                                                         argumentos.memoria, control,
+                                                                         argumentos.tablero))
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import argparse # Para las órdenes de línea de comandos
+import heapq # Cola de prioridad de la búsqueda
+import time # Para limitar el tiempo que el solucionador trabaja en cada llamada
+from typing import Callable, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from solucionador import Salto, SolucionadorIncremental, contar_fichas
+from tableros import Tablero, cargar_tablero
+
+# Peso de cada ficha aislada y de cada ficha en una esquina en la estimación de las fichas finales
+PESO_AISLADAS = 4.0
+PESO_ESQUINAS = 1.0
+
+
+# Vecinos de cada hueco como máscara: las fichas sobre las que puede saltar
+def mascaras_vecinos(saltos: List[Salto], num_huecos: int) -> List[int]:
+    vecinos = [0] * (num_huecos + 1)
+    for desde, sobre, hasta, requerida, cambio in saltos:
+        vecinos[desde] |= 1 << sobre
+    return vecinos
+
+# Huecos sobre los que no se puede saltar nunca (las esquinas del triángulo): una ficha
+# ahí no se puede comer, solo sale de ahí saltando ella misma
+def mascara_esquinas(saltos: List[Salto], num_huecos: int) -> int:
+    saltables = 0
+    for desde, sobre, hasta, requerida, cambio in saltos:
+        saltables |= 1 << sobre
+    return ((1 << (num_huecos + 1)) - 2) & ~saltables
+
+# Fichas de una máscara sin ninguna ficha vecina
+def contar_aisladas(mascara: int, vecinos: List[int]) -> int:
+    cuenta, resto = 0, mascara
+    while resto:
+        bit = resto & -resto
+        if not mascara & vecinos[bit.bit_length() - 1]:
+            cuenta += 1
+        resto ^= bit
+    return cuenta
+
+
+# Solucionador de mejor primero (cola de prioridad) que se puede pausar y reanudar.
+# Todas las soluciones tienen el mismo número de saltos (uno por ficha menos), así que
+# el coste del camino no distingue unas ramas de otras: la cola se ordena por una
+# estimación de las fichas que quedarán al final (fichas + fichas aisladas + fichas en
+# esquinas), que lleva antes a las ramas prometedoras. Para podar se usa solo una cota
+# admisible (la paridad del tablero: nunca quedarán menos fichas que 'cota'), de modo que
+# una rama se descarta solo si no puede mejorar el mejor resultado ya encontrado.
+# Si la cola se vacía sin llegar al objetivo, el mejor camino deja el menor número de
+# fichas posible y queda demostrado que no se puede hacer mejor.
+class SolucionadorInformado:
+
+    # cota(mascara) -> menor número de fichas alcanzable según la paridad (Tablero.cota_fichas)
+    def __init__(self, estado_inicial: int, saltos: List[Salto], num_huecos: int, objetivo_fichas: int = 1,
+                 cota: Optional[Callable[[int], int]] = None):
+        self.estado_inicial = estado_inicial
+        self.saltos = saltos
+        self.objetivo_fichas = objetivo_fichas
+        self.cota = cota if cota is not None else (lambda mascara: objetivo_fichas)
+        self.vecinos = mascaras_vecinos(saltos, num_huecos)
+        self.esquinas = mascara_esquinas(saltos, num_huecos)
+
+        # Estructuras de la búsqueda
+        self.padres = {estado_inicial: None}  # {estado: estado_padre}, también los ya vistos
+        self.cola = [(self.estimacion(estado_inicial), 0, estado_inicial)]  # (prioridad, orden, estado)
+        self.orden = 1  # Desempate: a igual prioridad, el primero que entró
+
+        # Estadísticas y resultado
+        self.fichas_iniciales = contar_fichas(estado_inicial)
+        self.nodos_expandidos = 0
+        self.nodos_podados = 0
+        self.mejor_fichas = self.fichas_iniciales
+        self.mejor_estado = estado_inicial
+        self.terminado = self.fichas_iniciales <= objetivo_fichas
+        self.cancelado = False
+
+    # Fichas que se espera que queden al final desde un estado (menor = más prometedor)
+    def estimacion(self, mascara: int) -> float:
+        return (contar_fichas(mascara) + PESO_AISLADAS * contar_aisladas(mascara, self.vecinos)
+                + PESO_ESQUINAS * contar_fichas(mascara & self.esquinas))
+
+    # Trabaja como máximo presupuesto_ms milisegundos (None = hasta terminar)
+    # Devuelve True cuando la búsqueda ha terminado (con o sin éxito)
+    def avanzar(self, presupuesto_ms: Optional[float] = None) -> bool:
+        if self.terminado:
+            return True
+
+        limite = None if presupuesto_ms is None else time.perf_counter() + presupuesto_ms / 1000
+        cola = self.cola
+        padres = self.padres
+        saltos = self.saltos
+        cota = self.cota
+        contador = 0
+
+        while cola:
+            prioridad, orden, estado = heapq.heappop(cola)
+            # El mejor resultado puede haber mejorado desde que el estado entró en la cola
+            if cota(estado) >= self.mejor_fichas:
+                self.nodos_podados += 1
+                continue
+            self.nodos_expandidos += 1
+            fichas_hijo = contar_fichas(estado) - 1
+
+            for desde, sobre, hasta, requerida, cambio in saltos:
+                if estado & requerida == requerida and not estado >> hasta & 1:
+                    hijo = estado ^ cambio
+                    if hijo in padres:
+                        continue
+                    padres[hijo] = estado
+                    if fichas_hijo < self.mejor_fichas:
+                        self.mejor_fichas = fichas_hijo
+                        self.mejor_estado = hijo
+                        if fichas_hijo <= self.objetivo_fichas:
+                            self.terminado = True
+                            return True
+                    # Solo entra en la cola si todavía puede dejar menos fichas que el mejor
+                    if cota(hijo) < self.mejor_fichas:
+                        heapq.heappush(cola, (self.estimacion(hijo), self.orden, hijo))
+                        self.orden += 1
+                    else:
+                        self.nodos_podados += 1
+
+            # Consulta el reloj cada 8 expansiones: con más, en el tablero europeo una
+            # llamada de 8 ms se pasaba hasta los 17 ms
+            contador += 1
+            if limite is not None and contador & 7 == 0 and time.perf_counter() >= limite:
+                return False
+
+        self.terminado = True
+        return True
+
+    # Fracción de la búsqueda completada (0.0 - 1.0), según las fichas que faltan por quitar
+    def progreso(self) -> float:
+        if self.terminado:
+            return 1.0
+        return (self.fichas_iniciales - self.mejor_fichas) / max(1, self.fichas_iniciales - self.objetivo_fichas)
+
+    # Detiene la búsqueda; las siguientes llamadas a avanzar no hacen nada
+    def cancelar(self):
+        self.cancelado = True
+        self.terminado = True
+        self.cola = []
+
+    # Reconstruye el camino hasta un estado siguiendo los padres
+    def camino_hasta(self, estado: int) -> List[int]:
+        camino = []
+        while estado is not None:
+            camino.append(estado)
+            estado = self.padres[estado]
+        camino.reverse()
+        return camino
+
+    # Devuelve la solución (lista de máscaras desde el inicio) o lista vacía
+    def solucion(self) -> List[int]:
+        if self.cancelado or self.mejor_fichas > self.objetivo_fichas:
+            return []
+        return self.camino_hasta(self.mejor_estado)
+
+    # Devuelve el mejor camino encontrado (el que deja menos fichas)
+    def mejor_camino(self) -> List[int]:
+        if self.cancelado:
+            return []
+        return self.camino_hasta(self.mejor_estado)
+
+    # Indica si la búsqueda ha demostrado que no hay solución (recorrió o podó todo)
+    def sin_solucion(self) -> bool:
+        return self.terminado and not self.cancelado and self.mejor_fichas > self.objetivo_fichas
+
+
+# Crea el solucionador informado de una posición de un tablero, con la cota de paridad
+# del tablero como objetivo (igual que Tablero.nuevo_solucionador)
+def nuevo_solucionador_informado(tablero: Tablero, mascara: int) -> SolucionadorInformado:
+    return SolucionadorInformado(mascara, tablero.saltos, tablero.num_huecos, tablero.cota_fichas(mascara),
+                                 tablero.cota_fichas)
+
+
+# Resuelve una posición con la búsqueda informada y con la búsqueda por niveles (con el
+# mismo objetivo) y devuelve (fichas, nodos informada, nodos por niveles, segundos de cada
+# una). La búsqueda por niveles se corta al pasar de limite_niveles nodos (None = sin límite);
+# entonces su cuenta es solo el mínimo que habría necesitado.
+def comparar_con_niveles(tablero: Tablero, mascara: int,
+                         limite_niveles: Optional[int] = None) -> Tuple[int, int, int, float, float]:
+    inicio = time.perf_counter()
+    informado = nuevo_solucionador_informado(tablero, mascara)
+    informado.avanzar()
+    medio = time.perf_counter()
+    niveles = SolucionadorIncremental(mascara, tablero.saltos, informado.objetivo_fichas)
+    while not niveles.avanzar(100):
+        if limite_niveles is not None and niveles.nodos_expandidos >= limite_niveles:
+            break
+    fin = time.perf_counter()
+    return informado.mejor_fichas, informado.nodos_expandidos, niveles.nodos_expandidos, medio - inicio, fin - medio
+
+
+# Órdenes de línea de comandos:
+#   python busqueda_informada.py triangulo5 [a1 c3 ...]
+# Resuelve cada posición inicial vacía (todas si no se indica ninguna) con la búsqueda
+# informada y con la búsqueda por niveles, y muestra cuántos nodos se ahorran
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda informada frente a búsqueda por niveles en Comesolo")
+    parser.add_argument("tablero", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("inicios", nargs="*", help="posiciones vacías iniciales (por defecto, todas)")
+    parser.add_argument("--limite", type=int, default=5000000, help="nodos como máximo de la búsqueda por niveles")
+    argumentos = parser.parse_args()
+
+    tablero = cargar_tablero(argumentos.tablero)
+    inicios = argumentos.inicios or [tablero.etiquetas[h] for h in range(1, tablero.num_huecos + 1)]
+    total_informado = total_niveles = 0
+    for etiqueta in inicios:
+        mascara = tablero.mascara_llena() & ~(1 << tablero.numeros[etiqueta])
+        fichas, informado, niveles, s_informado, s_niveles = comparar_con_niveles(tablero, mascara, argumentos.limite)
+        total_informado += informado
+        total_niveles += niveles
+        cortada = ">" if niveles >= argumentos.limite else " "
+        print(f"{etiqueta:>4}: {fichas} ficha(s)  informada {informado:>10,} nodos ({s_informado:7.3f} s)  "
+              f"por niveles {cortada}{niveles:>10,} nodos ({s_niveles:7.3f} s)  ahorro {1 - informado / max(1, niveles):6.1%}")
+    print(f"Total: informada {total_informado:,} nodos, por niveles {total_niveles:,} "
+          f"({total_niveles - total_informado:,} nodos ahorrados, {1 - total_informado / max(1, total_niveles):.1%})")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+import argparse # Para las órdenes de línea de comandos
+import math # Para la fórmula UCT
+import multiprocessing # Para repartir las simulaciones entre varios procesos
+import random # Para las partidas al azar de cada simulación
+import time # Para limitar el tiempo que el motor trabaja en cada llamada
+from typing import Callable, Dict, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from solucionador import Salto, contar_fichas, hijos, salto_entre
+from tableros import Tablero, cargar_tablero
+
+Movimiento = Tuple[int, int, int]
+
+# Constante de exploración de UCT (con recompensas entre 0 y 1)
+EXPLORACION = 0.7
+
+# Peso del mejor resultado visto bajo un nodo frente a su recompensa media al elegir
+# el siguiente salto. En un juego de un solo jugador importa la mejor partida, no la
+# media, así que se mezclan las dos (la media sola tiende a evitar ramas con trampas)
+PESO_MEJOR = 0.5
+
+# Nodos como máximo en la tabla; al llenarse, el árbol deja de crecer y el motor
+# sigue haciendo simulaciones desde las hojas que ya tiene
+LIMITE_NODOS = 2000000
+
+# Estadísticas de los saltos desde la raíz: {estado hijo: (visitas, suma de recompensas, menos fichas vistas)}
+EstadisticasRaiz = Dict[int, Tuple[int, float, int]]
+
+
+# Nodo de la tabla de búsqueda (uno por estado, aunque se llegue a él por varios caminos)
+#   visitas   -> simulaciones que han pasado por el estado
+#   suma      -> suma de sus recompensas (la media es suma / visitas)
+#   minimo    -> menos fichas que ha dejado una simulación que pasó por él
+#   hijos     -> estados a un salto (None = todavía sin expandir)
+#   agotado   -> ya no queda nada por explorar debajo (sin saltos o todos los hijos agotados)
+class NodoMontecarlo:
+    __slots__ = ("visitas", "suma", "minimo", "hijos", "agotado")
+
+    def __init__(self, fichas: int):
+        self.visitas = 0
+        self.suma = 0.0
+        self.minimo = fichas
+        self.hijos = None
+        self.agotado = False
+
+
+# Motor de búsqueda de Monte Carlo (MCTS con UCT) que se puede pausar y reanudar, para
+# tableros en los que la búsqueda exhaustiva no termina a tiempo. Cada simulación baja
+# por el árbol eligiendo saltos con UCT, añade un estado nuevo a la tabla y acaba la
+# partida con saltos al azar; la recompensa es la fracción de fichas quitadas respecto a
+# lo máximo posible (la cota de paridad). La tabla está indexada por estado, así que las
+# transposiciones comparten estadísticas. Es un motor "anytime": en cualquier momento
+# mejor_camino() devuelve la mejor partida completa vista hasta entonces. Termina solo si
+# llega al objetivo o si agota el árbol (en tableros pequeños, con eso queda demostrado
+# que el mejor resultado es el mínimo posible).
+class SolucionadorMontecarlo:
+
+    # cota(mascara) -> menor número de fichas alcanzable según la paridad (Tablero.cota_fichas)
+    def __init__(self, estado_inicial: int, saltos: List[Salto], objetivo_fichas: int = 1,
+                 cota: Optional[Callable[[int], int]] = None, semilla: Optional[int] = None,
+                 limite_nodos: int = LIMITE_NODOS):
+        self.estado_inicial = estado_inicial
+        self.saltos = saltos
+        self.objetivo_fichas = objetivo_fichas
+        self.cota = cota if cota is not None else (lambda mascara: objetivo_fichas)
+        self.aleatorio = random.Random(semilla)
+        self.limite_nodos = limite_nodos
+
+        # Tabla de la búsqueda: {estado: nodo}
+        self.fichas_iniciales = contar_fichas(estado_inicial)
+        self.tabla = {estado_inicial: NodoMontecarlo(self.fichas_iniciales)}
+
+        # Estadísticas y resultado
+        self.simulaciones = 0
+        self.nodos_expandidos = 0
+        self.mejor_fichas = self.fichas_iniciales
+        self.mejor = [estado_inicial]  # Mejor partida vista (lista de máscaras desde el inicio)
+        self.terminado = self.fichas_iniciales <= objetivo_fichas
+        self.cancelado = False
+
+    # Recompensa de una partida que acaba con 'fichas' fichas (1.0 = llegó al objetivo)
+    def recompensa(self, fichas: int) -> float:
+        return (self.fichas_iniciales - fichas) / max(1, self.fichas_iniciales - self.objetivo_fichas)
+
+    # Elige el hijo por el que seguir bajando con UCT (los no visitados primero);
+    # devuelve None si todos están agotados
+    def seleccionar(self, nodo: NodoMontecarlo) -> Optional[int]:
+        tabla = self.tabla
+        logaritmo_padre = math.log(nodo.visitas + 1)
+        elegido, mejor_valor = None, -1.0
+        for hijo in nodo.hijos:
+            datos = tabla[hijo]
+            if datos.agotado:
+                continue
+            if datos.visitas == 0:
+                return hijo
+            explotacion = ((1 - PESO_MEJOR) * datos.suma / datos.visitas
+                           + PESO_MEJOR * self.recompensa(datos.minimo))
+            valor = explotacion + EXPLORACION * math.sqrt(logaritmo_padre / datos.visitas)
+            if valor > mejor_valor:
+                elegido, mejor_valor = hijo, valor
+        return elegido
+
+    # Juega al azar desde un estado hasta que no quedan saltos; devuelve los estados recorridos
+    def partida_al_azar(self, estado: int) -> List[int]:
+        saltos = self.saltos
+        eleccion = self.aleatorio.choice
+        recorrido = []
+        while True:
+            cambios = [cambio for desde, sobre, hasta, requerida, cambio in saltos
+                       if estado & requerida == requerida and not estado >> hasta & 1]
+            if not cambios:
+                return recorrido
+            estado ^= eleccion(cambios)
+            recorrido.append(estado)
+
+    # Una simulación completa: selección, expansión, partida al azar y actualización
+    def simular(self):
+        tabla = self.tabla
+        estado = self.estado_inicial
+        nodo = tabla[estado]
+        camino = [estado]
+        nodos = [nodo]
+
+        # Selección: baja por los nodos ya expandidos
+        while nodo.hijos is not None:
+            hijo = self.seleccionar(nodo)
+            if hijo is None:
+                break
+            estado, nodo = hijo, tabla[hijo]
+            camino.append(estado)
+            nodos.append(nodo)
+
+        # Expansión: añade a la tabla los hijos de la hoja y baja a uno de ellos
+        if nodo.hijos is None and len(tabla) < self.limite_nodos:
+            nodo.hijos = hijos(estado, self.saltos)
+            fichas_hijo = contar_fichas(estado) - 1
+            for hijo in nodo.hijos:
+                if hijo not in tabla:
+                    tabla[hijo] = NodoMontecarlo(fichas_hijo)
+                    self.nodos_expandidos += 1
+            hijo = self.seleccionar(nodo) if nodo.hijos else None
+            if hijo is not None:
+                estado, nodo = hijo, tabla[hijo]
+                camino.append(estado)
+                nodos.append(nodo)
+
+        # Partida al azar hasta el final
+        recorrido = self.partida_al_azar(estado)
+        fichas = contar_fichas(recorrido[-1] if recorrido else estado)
+        self.simulaciones += 1
+        if fichas < self.mejor_fichas:
+            self.mejor_fichas = fichas
+            self.mejor = camino + recorrido
+            if fichas <= self.objetivo_fichas:
+                self.terminado = True
+
+        # Actualización: la recompensa sube por los nodos del camino
+        recompensa = self.recompensa(fichas)
+        for datos in nodos:
+            datos.visitas += 1
+            datos.suma += recompensa
+            if fichas < datos.minimo:
+                datos.minimo = fichas
+
+        # Un estado sin saltos está agotado; y un nodo con todos sus hijos agotados, también
+        if not recorrido and nodo.hijos is not None and not nodo.hijos:
+            nodo.agotado = True
+        for datos in reversed(nodos):
+            if datos.hijos is None or not all(tabla[hijo].agotado for hijo in datos.hijos):
+                break
+            datos.agotado = True
+        if nodos[0].agotado:
+            self.terminado = True
+
+    # Trabaja como máximo presupuesto_ms milisegundos (None = hasta terminar)
+    # Devuelve True cuando la búsqueda ha terminado (llegó al objetivo o agotó el árbol)
+    def avanzar(self, presupuesto_ms: Optional[float] = None) -> bool:
+        limite = None if presupuesto_ms is None else time.perf_counter() + presupuesto_ms / 1000
+        while not self.terminado:
+            self.simular()
+
+            # Cada simulación juega una partida entera, mucho más que consultar el reloj
+            if limite is not None and time.perf_counter() >= limite:
+                return False
+        return True
+
+    # Fracción de la búsqueda completada (0.0 - 1.0), según las fichas ya quitadas
+    def progreso(self) -> float:
+        if self.terminado:
+            return 1.0
+        return (self.fichas_iniciales - self.mejor_fichas) / max(1, self.fichas_iniciales - self.objetivo_fichas)
+
+    # Detiene la búsqueda; las siguientes llamadas a avanzar no hacen nada
+    def cancelar(self):
+        self.cancelado = True
+        self.terminado = True
+
+    # Devuelve la solución (lista de máscaras desde el inicio) o lista vacía
+    def solucion(self) -> List[int]:
+        if self.cancelado or self.mejor_fichas > self.objetivo_fichas:
+            return []
+        return list(self.mejor)
+
+    # Devuelve la mejor partida encontrada (la que deja menos fichas)
+    def mejor_camino(self) -> List[int]:
+        if self.cancelado:
+            return []
+        return list(self.mejor)
+
+    # Estadísticas de los saltos desde la raíz (para juntar las de varios procesos)
+    def estadisticas_raiz(self) -> EstadisticasRaiz:
+        raiz = self.tabla[self.estado_inicial]
+        return {hijo: (self.tabla[hijo].visitas, self.tabla[hijo].suma, self.tabla[hijo].minimo)
+                for hijo in raiz.hijos or []}
+
+    # Saltos desde la raíz ordenados de mejor a peor (más visitados primero)
+    def clasificar(self) -> List[Tuple[Movimiento, int, float, int]]:
+        return clasificar_estadisticas(self.estado_inicial, self.saltos, self.estadisticas_raiz())
+
+
+# Pasa las estadísticas de la raíz a una lista de (salto, visitas, recompensa media,
+# menos fichas vistas), de mejor a peor: UCT visita más los saltos que más prometen,
+# así que las visitas son la valoración más estable; empates, por menos fichas
+def clasificar_estadisticas(estado: int, saltos: List[Salto],
+                            estadisticas: EstadisticasRaiz) -> List[Tuple[Movimiento, int, float, int]]:
+    clasificados = [(salto_entre(estado, hijo, saltos), visitas, suma / visitas if visitas else 0.0, minimo)
+                    for hijo, (visitas, suma, minimo) in estadisticas.items()]
+    clasificados.sort(key=lambda fila: (-fila[1], fila[3]))
+    return clasificados
+
+
+# Crea el motor de Monte Carlo de una posición de un tablero, con la cota de paridad
+# del tablero como objetivo (igual que Tablero.nuevo_solucionador)
+def nuevo_solucionador_montecarlo(tablero: Tablero, mascara: int, semilla: Optional[int] = None) -> SolucionadorMontecarlo:
+    return SolucionadorMontecarlo(mascara, tablero.saltos, tablero.cota_fichas(mascara), tablero.cota_fichas, semilla)
+
+
+# Resultado de una búsqueda repartida entre procesos: la mejor partida de todas y las
+# estadísticas de la raíz sumadas
+class ResultadoMontecarlo:
+    def __init__(self, estado: int, saltos: List[Salto]):
+        self.estado = estado
+        self.saltos = saltos
+        self.mejor_camino: List[int] = [estado]
+        self.mejor_fichas = contar_fichas(estado)
+        self.estadisticas: EstadisticasRaiz = {}
+        self.simulaciones = 0
+        self.nodos_expandidos = 0
+
+    # Suma el resultado de un proceso
+    def juntar(self, camino: List[int], estadisticas: EstadisticasRaiz, simulaciones: int, nodos: int):
+        fichas = contar_fichas(camino[-1])
+        if fichas < self.mejor_fichas:
+            self.mejor_camino, self.mejor_fichas = camino, fichas
+        for hijo, (visitas, suma, minimo) in estadisticas.items():
+            visitas_antes, suma_antes, minimo_antes = self.estadisticas.get(hijo, (0, 0.0, minimo))
+            self.estadisticas[hijo] = (visitas_antes + visitas, suma_antes + suma, min(minimo_antes, minimo))
+        self.simulaciones += simulaciones
+        self.nodos_expandidos += nodos
+
+    def clasificar(self) -> List[Tuple[Movimiento, int, float, int]]:
+        return clasificar_estadisticas(self.estado, self.saltos, self.estadisticas)
+
+
+# Tablero propio de cada proceso del grupo (se carga una vez por proceso)
+_tablero_proceso = None
+
+def _iniciar_proceso(nombre_tablero: str):
+    global _tablero_proceso
+    _tablero_proceso = cargar_tablero(nombre_tablero)
+
+def _buscar_en_proceso(tarea: Tuple[int, float, int]) -> Tuple[List[int], EstadisticasRaiz, int, int]:
+    mascara, segundos, semilla = tarea
+    motor = nuevo_solucionador_montecarlo(_tablero_proceso, mascara, semilla)
+    motor.avanzar(segundos * 1000)
+    return motor.mejor_camino(), motor.estadisticas_raiz(), motor.simulaciones, motor.nodos_expandidos
+
+
+# Grupo de procesos para buscar con Monte Carlo en paralelo. Cada proceso hace su propia
+# búsqueda desde la misma posición con otra semilla (paralelismo de raíz: no hay que
+# compartir el árbol) y al final se juntan la mejor partida y las visitas de cada salto.
+# El grupo se crea una vez y sirve para muchas consultas, así que una pista solo paga
+# el tiempo de búsqueda, no el de arrancar los procesos.
+class GrupoMontecarlo:
+
+    def __init__(self, nombre_tablero: str, procesos: Optional[int] = None):
+        self.tablero = cargar_tablero(nombre_tablero)
+        self.procesos = procesos or multiprocessing.cpu_count()
+        self.grupo = None
+        if self.procesos > 1:
+            self.grupo = multiprocessing.Pool(self.procesos, _iniciar_proceso, (nombre_tablero,))
+
+    # Empieza una búsqueda de 'segundos' sin esperar a que termine (ver BusquedaMontecarlo)
+    def iniciar(self, mascara: int, segundos: float, semilla: int = 0) -> "BusquedaMontecarlo":
+        return BusquedaMontecarlo(self, mascara, segundos, semilla)
+
+    # Busca durante 'segundos' en todos los procesos a la vez
+    def buscar(self, mascara: int, segundos: float, semilla: int = 0) -> ResultadoMontecarlo:
+        resultado = ResultadoMontecarlo(mascara, self.tablero.saltos)
+        if self.grupo is None:
+            motor = nuevo_solucionador_montecarlo(self.tablero, mascara, semilla)
+            motor.avanzar(segundos * 1000)
+            resultado.juntar(motor.mejor_camino(), motor.estadisticas_raiz(), motor.simulaciones, motor.nodos_expandidos)
+            return resultado
+        tareas = [(mascara, segundos, semilla * self.procesos + i) for i in range(self.procesos)]
+        for parcial in self.grupo.imap_unordered(_buscar_en_proceso, tareas):
+            resultado.juntar(*parcial)
+        return resultado
+
+    def cerrar(self):
+        if self.grupo is not None:
+            self.grupo.terminate()
+            self.grupo.join()
+            self.grupo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+# Búsqueda de Monte Carlo que no bloquea a quien la pide, con la misma interfaz avanzar()
+# que los solucionadores: con grupo de procesos, los procesos trabajan por su cuenta y
+# avanzar() solo mira si ya han terminado; sin grupo, el motor trabaja en este proceso
+# en los trozos de presupuesto_ms que se le den, hasta sumar 'segundos'.
+class BusquedaMontecarlo:
+
+    def __init__(self, grupo: GrupoMontecarlo, mascara: int, segundos: float, semilla: int = 0):
+        self.resultado = ResultadoMontecarlo(mascara, grupo.tablero.saltos)
+        self.terminado = False
+        self.pendiente = None  # Respuesta de los procesos (con grupo)
+        self.motor = None  # Motor local (sin grupo)
+        if grupo.grupo is not None:
+            tareas = [(mascara, segundos, semilla * grupo.procesos + i) for i in range(grupo.procesos)]
+            self.pendiente = grupo.grupo.map_async(_buscar_en_proceso, tareas)
+        else:
+            self.motor = nuevo_solucionador_montecarlo(grupo.tablero, mascara, semilla)
+            self.restante_ms = segundos * 1000
+
+    # Trabaja (o espera) como máximo presupuesto_ms milisegundos; devuelve True al terminar
+    def avanzar(self, presupuesto_ms: float) -> bool:
+        if self.terminado:
+            return True
+        if self.pendiente is not None:
+            if not self.pendiente.ready():
+                return False
+            for parcial in self.pendiente.get():
+                self.resultado.juntar(*parcial)
+        else:
+            inicio = time.perf_counter()
+            motor_terminado = self.motor.avanzar(min(presupuesto_ms, self.restante_ms))
+            self.restante_ms -= (time.perf_counter() - inicio) * 1000
+            if not motor_terminado and self.restante_ms > 0:
+                return False
+            motor = self.motor
+            self.resultado.juntar(motor.mejor_camino(), motor.estadisticas_raiz(), motor.simulaciones,
+                                  motor.nodos_expandidos)
+            self.motor = None
+        self.terminado = True
+        return True
+
+
+# Órdenes de línea de comandos:
+#   python busqueda_montecarlo.py europeo [d4 ...] [--segundos 1] [--procesos 4] [--semilla 0]
+# Busca desde cada posición inicial vacía indicada (por defecto, la habitual del tablero)
+# durante el tiempo dado y muestra la mejor partida encontrada y los saltos mejor valorados
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda de Monte Carlo para tableros grandes de Comesolo")
+    parser.add_argument("tablero", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("inicios", nargs="*", help="posiciones vacías iniciales (por defecto, la habitual)")
+    parser.add_argument("--segundos", type=float, default=1.0, help="tiempo de búsqueda por posición")
+    parser.add_argument("--procesos", type=int, help="procesos a usar (por defecto, uno por núcleo)")
+    parser.add_argument("--semilla", type=int, default=0, help="semilla para repetir los mismos resultados")
+    argumentos = parser.parse_args()
+
+    with GrupoMontecarlo(argumentos.tablero, argumentos.procesos) as grupo:
+        tablero = grupo.tablero
+        etiquetas = tablero.etiquetas
+        for etiqueta in argumentos.inicios or [etiquetas[tablero.vacio_inicial]]:
+            mascara = tablero.mascara_llena() & ~(1 << tablero.numeros[etiqueta])
+            inicio = time.perf_counter()
+            resultado = grupo.buscar(mascara, argumentos.segundos, argumentos.semilla)
+            duracion = time.perf_counter() - inicio
+            print(f"{etiqueta:>4}: {resultado.mejor_fichas} ficha(s) (cota {tablero.cota_fichas(mascara)}), "
+                  f"{resultado.simulaciones:,} simulaciones, {resultado.nodos_expandidos:,} nodos, "
+                  f"{grupo.procesos} proceso(s), {duracion:.2f} s")
+            camino = resultado.mejor_camino
+            pasos = [salto_entre(a, b, tablero.saltos) for a, b in zip(camino, camino[1:])]
+            print("      " + " ".join(f"{etiquetas[d]}-{etiquetas[h]}" for d, s, h in pasos))
+            for (desde, sobre, hasta), visitas, media, minimo in resultado.clasificar()[:5]:
+                print(f"      {etiquetas[desde]}-{etiquetas[hasta]}: {visitas:,} visitas, "
+                      f"recompensa media {media:.3f}, mejor {minimo} ficha(s)")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
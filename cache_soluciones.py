@@ -0,0 +1,208 @@
+import os # Para ubicar el archivo de la caché y apartar archivos dañados
+import sqlite3 # Base de datos en un solo archivo, incluida en Python
+import zlib # Para calcular la suma de control (CRC32) de cada registro
+from typing import List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from busqueda_informada import nuevo_solucionador_informado
+from solucionador import Salto, salto_entre
+from tableros import Tablero
+
+# Versión del formato de la caché; si cambia, la caché antigua se descarta
+VERSION_FORMATO = 1
+
+# Archivo por defecto (se puede cambiar con la variable de entorno COMESOLO_CACHE)
+RUTA_POR_DEFECTO = os.environ.get(
+    "COMESOLO_CACHE", os.path.join(os.path.expanduser("~"), ".comesolo_cache.sqlite3"))
+
+# Segundos que se espera si otro proceso tiene la caché bloqueada (ventana, consola y
+# los procesos de simulacion.py o evaluacion_lotes.py la comparten)
+ESPERA_BLOQUEO = 5.0
+
+Movimiento = Tuple[int, int, int]
+
+
+# Aplica una permutación de huecos a una máscara de bits
+def permutar_mascara(mascara: int, permutacion: List[int]) -> int:
+    resultado = 0
+    for i in range(1, len(permutacion)):
+        if mascara >> i & 1:
+            resultado |= 1 << permutacion[i]
+    return resultado
+
+# Devuelve la forma canónica de un estado (la menor de sus simetrías) y la simetría usada
+def canonizar(mascara: int, permutaciones: List[List[int]]) -> Tuple[int, int]:
+    mejor, indice = mascara, -1
+    for k, permutacion in enumerate(permutaciones):
+        candidata = permutar_mascara(mascara, permutacion)
+        if candidata < mejor:
+            mejor, indice = candidata, k
+    return mejor, indice
+
+# Aplica una lista de movimientos a una máscara y devuelve todos los estados recorridos
+def aplicar_movimientos(mascara: int, movimientos: List[Movimiento]) -> List[int]:
+    camino = [mascara]
+    for desde, sobre, hasta in movimientos:
+        mascara ^= (1 << desde) | (1 << sobre) | (1 << hasta)
+        camino.append(mascara)
+    return camino
+
+# Convierte un camino de estados en la lista de movimientos que lo produce
+def movimientos_de_camino(camino: List[int], saltos: List[Salto]) -> List[Movimiento]:
+    return [salto_entre(camino[i], camino[i + 1], saltos) for i in range(len(camino) - 1)]
+
+
+# Resultado guardado para un estado: veredicto, mejor número de fichas y una solución
+class ResultadoCache:
+    def __init__(self, resoluble: bool, mejor_fichas: int, movimientos: List[Movimiento]):
+        self.resoluble = resoluble
+        self.mejor_fichas = mejor_fichas
+        self.movimientos = movimientos  # En las coordenadas del estado consultado
+
+
+# Caché persistente en disco (SQLite) de veredictos y soluciones.
+# Las claves son estados canónicos, así que las posiciones simétricas comparten registro.
+# Cada registro lleva un CRC32 y la base guarda la versión del formato: un registro
+# dañado se borra y se trata como fallo de caché, y un archivo ilegible se aparta.
+class CacheSoluciones:
+
+    # Abre (o crea) la caché para un tablero concreto
+    def __init__(self, tablero: Tablero, ruta: str = RUTA_POR_DEFECTO):
+        self.ruta = ruta
+        self.tablero_id = tablero.identificador
+        self.permutaciones = tablero.simetrias
+        self.aciertos = 0
+        self.fallos = 0
+        try:
+            self.conexion = self.abrir()
+        except sqlite3.OperationalError:
+            # Bloqueada (u otro fallo de acceso) pero no dañada: no se toca el archivo
+            raise
+        except sqlite3.DatabaseError:
+            # El archivo no es una base de datos válida: se aparta y se crea uno nuevo
+            os.replace(ruta, ruta + ".danado")
+            self.conexion = self.abrir()
+
+    # Abre la conexión, comprueba la integridad y la versión, y crea las tablas
+    def abrir(self) -> sqlite3.Connection:
+        conexion = sqlite3.connect(self.ruta, timeout=ESPERA_BLOQUEO)
+        if conexion.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+            conexion.close()
+            raise sqlite3.DatabaseError("caché dañada")
+
+        conexion.execute("CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)")
+        fila = conexion.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+        if fila is None or int(fila[0]) != VERSION_FORMATO:
+            # Formato desconocido o antiguo: se empieza de cero
+            conexion.execute("DROP TABLE IF EXISTS estados")
+            conexion.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(VERSION_FORMATO),))
+        conexion.execute(
+            "CREATE TABLE IF NOT EXISTS estados ("
+            "tablero TEXT, estado INTEGER, resoluble INTEGER, mejor_fichas INTEGER, "
+            "solucion TEXT, control INTEGER, PRIMARY KEY (tablero, estado))")
+        conexion.commit()
+        return conexion
+
+    # Suma de control de un registro
+    def control(self, estado: int, resoluble: int, mejor_fichas: int, solucion: str) -> int:
+        texto = f"{self.tablero_id}|{estado}|{resoluble}|{mejor_fichas}|{solucion}"
+        return zlib.crc32(texto.encode())
+
+    # Pasa movimientos de las coordenadas originales a las canónicas (o al revés)
+    def transformar(self, movimientos: List[Movimiento], indice: int, inversa: bool) -> List[Movimiento]:
+        if indice < 0:
+            return list(movimientos)
+        permutacion = self.permutaciones[indice]
+        if inversa:
+            inversa_p = [0] * len(permutacion)
+            for i, j in enumerate(permutacion):
+                inversa_p[j] = i
+            permutacion = inversa_p
+        return [(permutacion[d], permutacion[s], permutacion[h]) for d, s, h in movimientos]
+
+    # Busca un estado en la caché; devuelve None si no está o el registro está dañado
+    def buscar(self, mascara: int) -> Optional[ResultadoCache]:
+        canonica, indice = canonizar(mascara, self.permutaciones)
+        fila = self.conexion.execute(
+            "SELECT resoluble, mejor_fichas, solucion, control FROM estados "
+            "WHERE tablero = ? AND estado = ?", (self.tablero_id, canonica)).fetchone()
+        if fila is None:
+            self.fallos += 1
+            return None
+
+        resoluble, mejor_fichas, solucion, control = fila
+        if control != self.control(canonica, resoluble, mejor_fichas, solucion):
+            # Registro dañado: se elimina y se vuelve a calcular
+            self.conexion.execute("DELETE FROM estados WHERE tablero = ? AND estado = ?",
+                                  (self.tablero_id, canonica))
+            self.conexion.commit()
+            self.fallos += 1
+            return None
+
+        movimientos = [tuple(int(x) for x in paso.split(",")) for paso in solucion.split(";") if paso]
+        self.aciertos += 1
+        return ResultadoCache(bool(resoluble), mejor_fichas, self.transformar(movimientos, indice, True))
+
+    # Guarda el resultado de un estado (los movimientos en sus coordenadas originales)
+    def guardar(self, mascara: int, resoluble: bool, mejor_fichas: int, movimientos: List[Movimiento]):
+        self.guardar_lote([(mascara, resoluble, mejor_fichas, movimientos)])
+
+    # Guarda varios resultados (mascara, resoluble, mejor_fichas, movimientos) con una
+    # sola confirmación en disco para todo el lote
+    def guardar_lote(self, resultados: List[Tuple[int, bool, int, List[Movimiento]]]):
+        for mascara, resoluble, mejor_fichas, movimientos in resultados:
+            canonica, indice = canonizar(mascara, self.permutaciones)
+            canonicos = self.transformar(movimientos, indice, False)
+            solucion = ";".join(f"{d},{s},{h}" for d, s, h in canonicos)
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO estados VALUES (?, ?, ?, ?, ?, ?)",
+                (self.tablero_id, canonica, int(resoluble), mejor_fichas, solucion,
+                 self.control(canonica, int(resoluble), mejor_fichas, solucion)))
+        self.conexion.commit()
+
+    # Cierra la conexión con la base de datos
+    def cerrar(self):
+        self.conexion.close()
+
+
+# Instancias compartidas por todo el proceso, una por tablero (se abren la primera vez)
+_caches = {}
+
+# Devuelve la caché del proceso para un tablero, o None si no se puede usar el disco
+def obtener_cache(tablero: Tablero) -> Optional[CacheSoluciones]:
+    if tablero.identificador not in _caches:
+        try:
+            _caches[tablero.identificador] = CacheSoluciones(tablero)
+        except (sqlite3.Error, OSError):
+            return None
+    return _caches[tablero.identificador]
+
+# Resultado de un solucionador que ya terminó, como lo espera CacheSoluciones.guardar_lote
+def datos_resultado(solucionador) -> Tuple[int, bool, int, List[Movimiento]]:
+    camino = solucionador.mejor_camino()
+    fichas = bin(camino[-1]).count("1")
+    return camino[0], fichas == 1, fichas, movimientos_de_camino(camino, solucionador.saltos)
+
+# Guarda en la caché el resultado de un solucionador que ya terminó
+def guardar_resultado(cache: CacheSoluciones, solucionador):
+    if solucionador.cancelado:
+        return
+    cache.guardar(*datos_resultado(solucionador))
+
+# Devuelve el mejor camino (lista de máscaras) consultando primero la caché;
+# si no está, resuelve con el solucionador adecuado (o con la búsqueda informada
+# si informado=True) y guarda el resultado
+def resolver_con_cache(tablero: Tablero, mascara: int, informado: bool = False) -> List[int]:
+    cache = obtener_cache(tablero)
+    if cache is not None:
+        resultado = cache.buscar(mascara)
+        if resultado is not None:
+            return aplicar_movimientos(mascara, resultado.movimientos)
+
+    if informado:
+        solucionador = nuevo_solucionador_informado(tablero, mascara)
+    else:
+        solucionador = tablero.nuevo_solucionador(mascara)
+    solucionador.avanzar()
+    if cache is not None:
+        guardar_resultado(cache, solucionador)
+    return solucionador.mejor_camino()
@@ -1,9 +1,25 @@
+import logging
 import pygame
 import sys
 import time
+from collections import deque
+from solucionador import contar_fichas, lista_a_mascara, mascara_a_lista, salto_entre
+from cache_soluciones import aplicar_movimientos, guardar_resultado, obtener_cache, resolver_con_cache
+from busqueda_informada import nuevo_solucionador_informado
+from tableros import cargar_tablero, tablero_triangular
+from tablabase import abrir_tablabase
+from analisis import AnalizadorEstados, LIMITE_HUECOS_EXACTO
+from pistas import MotorPistas
+from busqueda_montecarlo import GrupoMontecarlo
+from especulacion import PrecalculoEspeculativo
+from registro import configurar_desde_argumentos, obtener_registro
+from grabaciones import obtener_grabador
+from historial import HistorialPartida
+from movimientos_minimos import agrupar_movimientos, nuevo_solucionador_movimientos
+from saltos_legales import SaltosLegales
 
-# Inicializar Pygame
-pygame.init()
+# Mensajes de la partida (los muestra main(); al importar el módulo no se escribe nada)
+registro = obtener_registro("ventana")
 
 # Constantes de colores y dimensiones
 ANCHO, ALTO = 1000, 800
@@ -19,52 +35,192 @@ BLANCO = (255, 255, 255)
 ROJO = (244, 67, 54)
 NEGRO = (0, 0, 0)
 
-# Configuración de fuentes
-pygame.font.init()
-FUENTE_CLARA = pygame.font.Font(None, 32)
-FUENTE_MEDIANA = pygame.font.Font(None, 40)
-FUENTE_GRANDE = pygame.font.Font(None, 56)
-FUENTE_PEQUEÑA = pygame.font.Font(None, 24)
-
-# Mapeo de posiciones numéricas (1-15) a etiquetas alfanuméricas
-POSICIONES_ETIQUETAS = {
-    1: 'a1',   # Fila 1
-    2: 'a2', 3: 'b2',   # Fila 2
-    4: 'a3', 5: 'b3', 6: 'c3',   # Fila 3
-    7: 'a4', 8: 'b4', 9: 'c4', 10: 'd4',   # Fila 4
-    11: 'a5', 12: 'b5', 13: 'c5', 14: 'd5', 15: 'e5'   # Fila 5
-}
+# Fuentes y ventana: las crea iniciar_ventana() desde main(), nunca al importar el
+# módulo (los procesos de Monte Carlo lo vuelven a importar y no deben abrir ventanas)
+FUENTE_CLARA = FUENTE_MEDIANA = FUENTE_GRANDE = FUENTE_PEQUEÑA = None
+pantalla = None
+
+# Número de filas del triángulo (se elige con: python comesolo.py --filas 6)
+FILAS = int(sys.argv[sys.argv.index("--filas") + 1]) if "--filas" in sys.argv else 5
+
+# Geometría del tablero generada automáticamente (5 filas = 15 huecos, 6 = 21, 7 = 28, 8 = 36)
+# o cargada de una definición (python comesolo.py --tablero ingles / europeo / archivo.json)
+if "--tablero" in sys.argv:
+    NOMBRE_TABLERO = sys.argv[sys.argv.index("--tablero") + 1]
+    TABLERO = cargar_tablero(NOMBRE_TABLERO)
+else:
+    NOMBRE_TABLERO = f"triangulo{FILAS}"
+    TABLERO = tablero_triangular(FILAS)
+NUM_HUECOS = TABLERO.num_huecos
+
+# Mapeo de posiciones numéricas (1-N) a etiquetas alfanuméricas
+POSICIONES_ETIQUETAS = TABLERO.etiquetas
 
 # Mapeo inverso: de etiquetas alfanuméricas a posiciones numéricas
 ETIQUETAS_POSICIONES = {v: k for k, v in POSICIONES_ETIQUETAS.items()}
 
-# Coordenadas de las posiciones en el tablero triangular (15 posiciones)
-POSICIONES = {
-    1: (500, 150),   # Fila 1
-    2: (450, 220), 3: (550, 220),   # Fila 2  
-    4: (400, 290), 5: (500, 290), 6: (600, 290),   # Fila 3
-    7: (350, 360), 8: (450, 360), 9: (550, 360), 10: (650, 360),   # Fila 4
-    11: (300, 430), 12: (400, 430), 13: (500, 430), 14: (600, 430), 15: (700, 430)   # Fila 5
-}
+def calcular_posiciones_pantalla(tablero, centro_x=500, arriba=150, alto_max=300, ancho_max=600):
+    """Escala las coordenadas del tablero a la pantalla (100 px entre vecinos como máximo)"""
+    xs = [x for x, y in tablero.coordenadas.values()]
+    ys = [y for x, y in tablero.coordenadas.values()]
+    ancho = max(xs) - min(xs) or 1
+    alto = max(ys) - min(ys) or 1
+    escala = min(100, alto_max / alto, ancho_max / ancho)
+    centro = (max(xs) + min(xs)) / 2
+    posiciones = {n: (int(round(centro_x + (x - centro) * escala)), int(round(arriba + (y - min(ys)) * escala)))
+                  for n, (x, y) in tablero.coordenadas.items()}
+    return posiciones, escala
+
+# Coordenadas de las posiciones en pantalla (con 5 filas: las mismas del diseño original)
+POSICIONES, ESCALA_TABLERO = calcular_posiciones_pantalla(TABLERO)
+
+# Radio de las fichas y distancia máxima para considerar un clic sobre ellas
+RADIO_CLAVIJA = min(25, int(ESCALA_TABLERO * 0.36))
+RADIO_CLIC = RADIO_CLAVIJA + 10
 
 # Movimientos posibles - cada entrada representa (ficha_saltada, destino)
-MOVIMIENTOS_POSIBLES = {
-    1: [(2, 4), (3, 6)],
-    2: [(4, 7), (5, 9)],
-    3: [(5, 8), (6, 10)],
-    4: [(2, 1), (5, 6), (7, 11), (8, 13)],
-    5: [(8, 12), (9, 14)],
-    6: [(3, 1), (5, 4), (9, 13), (10, 15)],
-    7: [(4, 2), (8, 9)],
-    8: [(5, 3), (9, 10)],
-    9: [(5, 2), (8, 7)],
-    10: [(6, 3), (9, 8)],
-    11: [(7, 4), (12, 13)],
-    12: [(8, 5), (13, 14)],
-    13: [(8, 4), (9, 6), (12, 11), (14, 15)],
-    14: [(9, 5), (13, 12)],
-    15: [(10, 6), (14, 13)]
-}
+MOVIMIENTOS_POSIBLES = TABLERO.movimientos_posibles
+
+# Movimientos compilados a máscaras de bits para el solucionador incremental
+SALTOS = TABLERO.saltos
+
+# Milisegundos de trabajo de fondo en cada fotograma (el fotograma dura ~16 ms), entre
+# la búsqueda, el análisis para las pistas y la especulación juntos
+PRESUPUESTO_BUSQUEDA_MS = 8
+
+# Motor de pistas con el análisis de estados compartido (y la tabla en disco si existe);
+# en los tableros grandes main() le añade un grupo de procesos de Monte Carlo
+MOTOR_PISTAS = MotorPistas(TABLERO, AnalizadorEstados(TABLERO, abrir_tablabase(TABLERO)))
+
+# Segundos de búsqueda de Monte Carlo para una pista en un tablero grande (por detrás:
+# la pista se muestra al momento con la paridad y se mejora cuando termina)
+SEGUNDOS_PISTA_MONTECARLO = 0.5
+
+class MonitorRendimiento:
+    """
+    Panel de rendimiento que se muestra y oculta con F3: FPS, tiempos de fotograma,
+    tiempo y nodos de la última búsqueda y pista, y aciertos de las cachés.
+    Mientras está oculto no se mide nada (el bucle principal solo consulta 'activo').
+    """
+    def __init__(self):
+        self.activo = False
+        self.tiempos_fotograma = deque(maxlen=300)  # Milisegundos de trabajo de los últimos fotogramas
+        self.busqueda_tipo = None  # Tipo de la búsqueda en curso o de la última
+        self.busqueda_ms = 0.0  # Tiempo dentro del solucionador (acumulado entre fotogramas)
+        self.busqueda_nodos = 0
+        self.pista_ms = None  # Duración de la última llamada a obtener_pista
+
+    def alternar(self):
+        """Muestra u oculta el panel"""
+        self.activo = not self.activo
+        self.tiempos_fotograma.clear()
+
+    def percentil(self, fraccion):
+        """Tiempo de fotograma por debajo del cual queda la fracción indicada"""
+        ordenados = sorted(self.tiempos_fotograma)
+        return ordenados[min(len(ordenados) - 1, int(fraccion * len(ordenados)))] if ordenados else 0.0
+
+    def dibujar(self, reloj, juego):
+        """Dibuja el panel en la esquina superior izquierda"""
+        lineas = [f"FPS: {reloj.get_fps():.0f}",
+                  f"Fotograma p50/p95/p99: {self.percentil(0.5):.1f} / {self.percentil(0.95):.1f} / "
+                  f"{self.percentil(0.99):.1f} ms"]
+        if self.busqueda_tipo:
+            estado = "en curso" if juego.solucionador is not None else "última"
+            lineas.append(f"Búsqueda {self.busqueda_tipo} ({estado}): {self.busqueda_ms:.0f} ms, {self.busqueda_nodos:,} nodos")
+        if self.pista_ms is not None:
+            lineas.append(f"Última pista: {self.pista_ms:.2f} ms")
+        analizador = MOTOR_PISTAS.analizador
+        lineas.append(f"Análisis: {analizador.nodos_expandidos:,} nodos, {analizador.tasa_aciertos():.0%} aciertos")
+        cache = obtener_cache(TABLERO)
+        if cache is not None:
+            consultas = cache.aciertos + cache.fallos
+            tasa = cache.aciertos / consultas if consultas else 0.0
+            lineas.append(f"Caché en disco: {cache.aciertos}/{consultas} aciertos ({tasa:.0%})")
+
+        panel = pygame.Surface((430, 10 + 22 * len(lineas)))
+        panel.set_alpha(190)
+        panel.fill(NEGRO)
+        pantalla.blit(panel, (10, 10))
+        for i, linea in enumerate(lineas):
+            pantalla.blit(FUENTE_PEQUEÑA.render(linea, True, BLANCO), (18, 16 + 22 * i))
+
+# Panel de rendimiento compartido por el juego y el bucle principal
+MONITOR = MonitorRendimiento()
+
+class RejillaClics:
+    """
+    Rejilla de la pantalla para saber qué hueco hay bajo un punto sin recorrerlos todos.
+    Se construye una vez al arrancar: cada celda (de lado igual al radio de clic) guarda
+    los huecos cuyo círculo de clic la toca, así que cada consulta mira una sola celda
+    y, como mucho, un par de huecos.
+    """
+    def __init__(self, posiciones, radio):
+        self.radio = radio
+        self.lado = max(1, radio)
+        self.celdas = {}  # {(columna, fila): [(hueco, x, y)]}, en el orden de posiciones
+        for pos, (px, py) in posiciones.items():
+            for columna in range((px - radio) // self.lado, (px + radio) // self.lado + 1):
+                for fila in range((py - radio) // self.lado, (py + radio) // self.lado + 1):
+                    self.celdas.setdefault((columna, fila), []).append((pos, px, py))
+
+    def buscar(self, x, y):
+        """Devuelve el hueco cuyo círculo de clic contiene el punto (x, y), o None"""
+        radio2 = self.radio * self.radio
+        for pos, px, py in self.celdas.get((x // self.lado, y // self.lado), ()):
+            if (x - px) ** 2 + (y - py) ** 2 <= radio2:
+                return pos
+        return None
+
+class TablaMovimientos:
+    """
+    Saltos legales de cada ficha en cada estado del tablero, calculados una vez por estado.
+    Los saltos de cada hueco se agrupan al arrancar; la primera consulta de un estado
+    reparte sus saltos legales por ficha de origen (con el conjunto de destinos de cada
+    una) y las siguientes, al hacer clic, al dibujar los destinos o al pedir una pista,
+    son una búsqueda en un diccionario.
+    """
+    LIMITE_ESTADOS = 4096  # Estados recordados; al llegar al límite se empieza de nuevo
+
+    def __init__(self, saltos, num_huecos):
+        self.saltos_desde = {h: [] for h in range(1, num_huecos + 1)}  # {desde: [(sobre, hasta, requerida)]}
+        for desde, sobre, hasta, requerida, cambio in saltos:
+            self.saltos_desde[desde].append((sobre, hasta, requerida))
+        self.estados = {}  # {mascara: {desde: ([(desde, sobre, hasta)], destinos)}}
+
+    def por_ficha(self, mascara):
+        """Saltos legales de un estado agrupados por la ficha que salta"""
+        tabla = self.estados.get(mascara)
+        if tabla is None:
+            if len(self.estados) >= self.LIMITE_ESTADOS:
+                self.estados.clear()
+            tabla = {}
+            for desde, saltos in self.saltos_desde.items():
+                if mascara >> desde & 1:
+                    movimientos = [(desde, sobre, hasta) for sobre, hasta, requerida in saltos
+                                   if mascara & requerida == requerida and not mascara >> hasta & 1]
+                    if movimientos:
+                        tabla[desde] = (movimientos, frozenset(hasta for d, s, hasta in movimientos))
+            self.estados[mascara] = tabla
+        return tabla
+
+    def desde(self, mascara, posicion):
+        """Saltos legales (desde, sobre, hasta) de la ficha de una posición"""
+        movimientos, destinos = self.por_ficha(mascara).get(posicion, ((), frozenset()))
+        return list(movimientos)
+
+    def destinos(self, mascara, posicion):
+        """Conjunto de huecos a los que puede saltar la ficha de una posición"""
+        movimientos, destinos = self.por_ficha(mascara).get(posicion, ((), frozenset()))
+        return destinos
+
+    def todos(self, mascara):
+        """Todos los saltos legales del estado, ficha a ficha"""
+        return [movimiento for movimientos, destinos in self.por_ficha(mascara).values() for movimiento in movimientos]
+
+# Saltos legales por estado y rejilla de clics, compartidos por el juego y el bucle principal
+TABLA_MOVIMIENTOS = TablaMovimientos(SALTOS, NUM_HUECOS)
+REJILLA_CLICS = RejillaClics(POSICIONES, RADIO_CLIC)
 
 class Cola:
     """
@@ -113,6 +269,7 @@ class Comesolo:
         self.ficha_seleccionada = None  # Ficha actualmente seleccionada
         self.movimientos_validos = []  # Movimientos válidos desde la ficha seleccionada
         self.pista_mostrada = None  # Pista actualmente mostrada
+        self.pistas_clasificadas = []  # Saltos legales ordenados por el motor de pistas
         
         # Sistema de resolución automática
         self.solucion_pasos = []  # Pasos de la solución encontrada
@@ -124,16 +281,43 @@ class Comesolo:
         self.posicion_hover = None  # Posición bajo el cursor
         self.mensaje_resolucion = ""  # Mensaje de estado de resolución
         self.solucion_existe = None  # Si existe solución para la configuración actual
+        
+        # Búsqueda incremental que avanza un poco en cada fotograma
+        self.solucionador = None  # Solucionador en curso (por niveles o en profundidad) o None
+        self.tipo_busqueda = None  # 'verificar', 'resolver' o 'minima' (menos movimientos)
+        self.menos_movimientos = False  # Si la resolución en curso cuenta las cadenas de saltos
+
+        # Grabador de partidas (grabaciones.py); None = no se graba
+        self.grabador = None
+
+        # Historial para deshacer y rehacer, con lo ya calculado de cada posición
+        self.historial = HistorialPartida()
+        self.entrada_busqueda = None  # Posición del historial que se está buscando
+
+        # Saltos legales y fichas del tablero actual, al día después de cada salto
+        self.saltos_legales = SaltosLegales(SALTOS, NUM_HUECOS)
+
+        # Pistas y veredictos de las posiciones a uno o dos saltos, preparados mientras el jugador piensa
+        self.especulacion = PrecalculoEspeculativo(MOTOR_PISTAS)
+
+        # Búsqueda de Monte Carlo de la última pista en un tablero grande: (entrada, saltos puntuados, búsqueda)
+        self.pista_montecarlo = None
     
     def establecer_posicion_inicial(self, posicion_vacia):
         """Establece la posición inicial vacía y configura el juego"""
+        # Estado inicial: todas las posiciones ocupadas excepto una vacía
+        self.establecer_disposicion(TABLERO.mascara_llena() & ~(1 << posicion_vacia), posicion_vacia)
+
+    def establecer_disposicion(self, disposicion, posicion_vacia=None):
+        """Configura el juego con cualquier disposición de fichas (etiquetas, cadena de 0/1, lista o máscara)"""
+        mascara = TABLERO.disposicion_a_mascara(disposicion)  # Lanza ValueError si no es válida
         self.posicion_inicial_vacia = posicion_vacia
         self.modo_seleccion = False
-        
-        # Estado inicial: todas las posiciones ocupadas excepto una vacía
-        self.raiz = [1] * 16  # Índice 0 no se usa, posiciones 1-15
-        self.raiz[posicion_vacia] = 0
-        self.raiz[0] = -1  # Marcador para ignorar índice 0
+        self.raiz = mascara_a_lista(mascara, NUM_HUECOS)  # Índice 0 no se usa, posiciones 1-N
+        self.historial.iniciar(mascara)
+        self.saltos_legales.reiniciar(mascara)
+        if self.grabador is not None:
+            self.grabador.nueva_partida(mascara)
         
         # Reiniciar árbol de búsqueda
         self.arbol_busqueda = {0: [set(), self.raiz.copy(), -1]}
@@ -149,49 +333,142 @@ class Comesolo:
         self.ficha_seleccionada = None
         self.movimientos_validos = []
         self.pista_mostrada = None
+        self.pistas_clasificadas = []
+        self.pista_montecarlo = None
         self.solucion_pasos = []
         self.resolviendo = False
         self.mensaje_resolucion = ""
         self.solucion_existe = None
-        
-        print(f"\n{'='*60}")
-        print(f"JUEGO INICIADO - Posición inicial vacía: {POSICIONES_ETIQUETAS[posicion_vacia]}")
-        print(f"{'='*60}")
-        
-        # Verificar inmediatamente si existe solución
+        self.cancelar_busqueda()
+
+        if posicion_vacia is not None:
+            registro.info("\n%s\nJUEGO INICIADO - Posición inicial vacía: %s\n%s", "=" * 60,
+                          POSICIONES_ETIQUETAS[posicion_vacia], "=" * 60,
+                          extra={"evento": "partida_nueva", "datos": {"vacia": POSICIONES_ETIQUETAS[posicion_vacia]}})
+        else:
+            registro.info("\n%s\nJUEGO INICIADO - Disposición personalizada (%d fichas)\n%s", "=" * 60,
+                          contar_fichas(mascara), "=" * 60,
+                          extra={"evento": "partida_nueva", "datos": {"fichas": contar_fichas(mascara)}})
+
+        # Verificar inmediatamente si existe solución (avanza en segundo plano)
         self.verificar_solucion_existe()
-    
+        # Una disposición con una sola ficha o sin saltos ya es un final de partida
+        self.verificar_fin_juego()
+
+    def iniciar_busqueda(self, tipo):
+        """Prepara una búsqueda incremental desde el estado actual del tablero"""
+        self.cancelar_busqueda()
+        mascara = lista_a_mascara(self.raiz)
+        self.entrada_busqueda = self.historial.actual()
+
+        # Consultar primero la caché en disco: una posición conocida no se vuelve a buscar
+        # (salvo para la solución con menos movimientos, que la caché no guarda)
+        cache = obtener_cache(TABLERO) if tipo != 'minima' else None
+        resultado = cache.buscar(mascara) if cache is not None else None
+        if resultado is not None:
+            solucion = [mascara_a_lista(m, NUM_HUECOS) for m in aplicar_movimientos(mascara, resultado.movimientos)]
+            if tipo == 'verificar':
+                self.finalizar_verificacion(solucion)
+            else:
+                self.finalizar_resolucion(solucion)
+            return
+
+        if tipo == 'minima':
+            self.solucionador = nuevo_solucionador_movimientos(TABLERO, mascara)
+        else:
+            self.solucionador = nuevo_solucionador_informado(TABLERO, mascara)
+        self.tipo_busqueda = tipo
+        MONITOR.busqueda_tipo = tipo
+        MONITOR.busqueda_ms = 0.0
+        MONITOR.busqueda_nodos = 0
+
+    def cancelar_busqueda(self):
+        """Cancela la búsqueda incremental en curso, si la hay"""
+        if self.solucionador is not None:
+            self.solucionador.cancelar()
+        self.solucionador = None
+        self.tipo_busqueda = None
+
+    def avanzar_busqueda(self, presupuesto_ms):
+        """Avanza la búsqueda en curso durante como máximo presupuesto_ms milisegundos"""
+        if self.solucionador is None or presupuesto_ms <= 0:
+            return
+
+        # Con el panel de rendimiento visible se mide el tiempo pasado en el solucionador
+        if MONITOR.activo:
+            inicio = time.perf_counter()
+            terminado = self.solucionador.avanzar(presupuesto_ms)
+            MONITOR.busqueda_ms += (time.perf_counter() - inicio) * 1000
+            MONITOR.busqueda_nodos = self.solucionador.nodos_expandidos
+        else:
+            terminado = self.solucionador.avanzar(presupuesto_ms)
+
+        if not terminado:
+            # Todavía no termina: mostrar el progreso
+            if self.tipo_busqueda in ('resolver', 'minima'):
+                self.mensaje_resolucion = f"Buscando solución... {int(self.solucionador.progreso() * 100)}%"
+            return
+
+        # La búsqueda terminó: guardarla en la caché y convertir el mejor camino a listas
+        cache = obtener_cache(TABLERO)
+        if cache is not None:
+            guardar_resultado(cache, self.solucionador)
+        solucion = [mascara_a_lista(m, NUM_HUECOS) for m in self.solucionador.mejor_camino()]
+        tipo = self.tipo_busqueda
+        self.solucionador = None
+        self.tipo_busqueda = None
+
+        if tipo == 'verificar':
+            self.finalizar_verificacion(solucion)
+        elif tipo in ('resolver', 'minima'):
+            self.finalizar_resolucion(solucion)
+
     def verificar_solucion_existe(self):
-        """Verifica si existe una solución para la posición inicial actual"""
-        print("\n🔍 VERIFICANDO SI EXISTE SOLUCIÓN...")
-        print("-" * 40)
-        
-        # Buscar solución completa
-        solucion = self.buscar_solucion(25)  # Mayor profundidad para buscar solución completa
-        
+        """Inicia la verificación de solución para la posición inicial actual"""
+        registro.info("\n🔍 VERIFICANDO SI EXISTE SOLUCIÓN...\n%s", "-" * 40)
+
+        # La búsqueda avanza un poco en cada fotograma desde el bucle principal
+        self.iniciar_busqueda('verificar')
+
+    def anotar_resultado(self, solucion):
+        """Guarda en la posición buscada del historial si tiene solución y cuántas fichas deja;
+        devuelve si esa posición sigue siendo la actual"""
+        entrada = self.entrada_busqueda
+        self.entrada_busqueda = None
+        if entrada is not None and solucion:
+            entrada.mejor_fichas = sum(1 for i in range(1, NUM_HUECOS + 1) if solucion[-1][i] == 1)
+            entrada.resoluble = entrada.mejor_fichas == 1
+        return entrada is None or entrada is self.historial.actual()
+
+    def finalizar_verificacion(self, solucion):
+        """Muestra el resultado de la verificación de solución"""
+        if not self.anotar_resultado(solucion):
+            # El jugador movió o deshizo mientras se verificaba: el resultado queda en su
+            # posición del historial (se verá al volver a ella), no en la actual
+            return
         if solucion and len(solucion) > 1:
             # Verificar que la última posición tenga solo una ficha
             estado_final = solucion[-1]
-            fichas_finales = sum(1 for i in range(1, 16) if estado_final[i] == 1)
+            fichas_finales = sum(1 for i in range(1, NUM_HUECOS + 1) if estado_final[i] == 1)
             
             if fichas_finales == 1:
                 self.solucion_existe = True
-                posicion_final = next(i for i in range(1, 16) if estado_final[i] == 1)
-                print(f"✅ ¡SOLUCIÓN ENCONTRADA!")
-                print(f"   Número de movimientos necesarios: {len(solucion) - 1}")
-                print(f"   Ficha final quedará en posición: {POSICIONES_ETIQUETAS[posicion_final]}")
-                print("\n📋 SECUENCIA DE SOLUCIÓN:")
-                print("-" * 40)
+                posicion_final = next(i for i in range(1, NUM_HUECOS + 1) if estado_final[i] == 1)
+                registro.info("✅ ¡SOLUCIÓN ENCONTRADA!\n   Número de movimientos necesarios: %d\n"
+                              "   Ficha final quedará en posición: %s\n\n📋 SECUENCIA DE SOLUCIÓN:\n%s",
+                              len(solucion) - 1, POSICIONES_ETIQUETAS[posicion_final], "-" * 40,
+                              extra={"evento": "verificacion", "datos": {"resoluble": True, "movimientos": len(solucion) - 1,
+                                                                         "ficha_final": posicion_final}})
                 
-                # Mostrar la secuencia de solución paso a paso
-                for i in range(1, len(solucion)):
+                # Mostrar la secuencia de solución paso a paso (solo si alguien la va a leer)
+                for i in range(1, len(solucion) if registro.isEnabledFor(logging.INFO) else 1):
                     estado_anterior = solucion[i-1]
                     estado_actual = solucion[i]
                     
                     # Encontrar el movimiento realizado
                     desde = sobre = hasta = None
                     
-                    for pos in range(1, 16):
+                    for pos in range(1, NUM_HUECOS + 1):
                         if estado_anterior[pos] == 1 and estado_actual[pos] == 0:
                             if desde is None:
                                 desde = pos
@@ -201,24 +478,27 @@ class Comesolo:
                             hasta = pos
                     
                     if desde and sobre and hasta:
-                        print(f"   Paso {i}: Ficha {POSICIONES_ETIQUETAS[sobre]} salta sobre ficha {POSICIONES_ETIQUETAS[desde]} → posición {POSICIONES_ETIQUETAS[hasta]}")
+                        registro.info("   Paso %d: Ficha %s salta sobre ficha %s → posición %s", i, POSICIONES_ETIQUETAS[sobre],
+                                      POSICIONES_ETIQUETAS[desde], POSICIONES_ETIQUETAS[hasta])
                 
             else:
                 self.solucion_existe = False
-                print(f"❌ NO HAY SOLUCIÓN PERFECTA")
-                print(f"   Mejor resultado posible: {fichas_finales} fichas restantes")
+                registro.info("❌ NO HAY SOLUCIÓN PERFECTA\n   Mejor resultado posible: %d fichas restantes", fichas_finales,
+                              extra={"evento": "verificacion", "datos": {"resoluble": False, "mejor_fichas": fichas_finales}})
         else:
             self.solucion_existe = False
-            print(f"❌ NO HAY SOLUCIÓN desde la posición inicial {POSICIONES_ETIQUETAS[self.posicion_inicial_vacia]}")
+            registro.info("❌ NO HAY SOLUCIÓN desde la posición inicial %s",
+                          POSICIONES_ETIQUETAS.get(self.posicion_inicial_vacia, "personalizada"),
+                          extra={"evento": "verificacion", "datos": {"resoluble": False}})
         
-        print("-" * 40)
+        registro.info("-" * 40)
     
     def generar_movimientos(self, b):
         """Genera todos los movimientos posibles desde un estado dado del tablero"""
         lista_movimientos = []
         
         # Para cada posición en el tablero
-        for desde in range(1, 16):
+        for desde in range(1, NUM_HUECOS + 1):
             if b[desde] == 1:  # Si hay ficha en esta posición
                 # Revisar todos los movimientos posibles desde esta posición
                 for sobre, hasta in MOVIMIENTOS_POSIBLES.get(desde, []):
@@ -259,7 +539,7 @@ class Comesolo:
                         arbol_nuevo[self.nodo_numero] = [set(), movimiento, id]
                         
                         # Verificar si es estado objetivo (solo una ficha)
-                        if sum(1 for i in range(1, 16) if movimiento[i] == 1) == 1:
+                        if sum(1 for i in range(1, NUM_HUECOS + 1) if movimiento[i] == 1) == 1:
                             self.nodo_objetivo = self.nodo_numero
                             objetivo_encontrado = True
                             break
@@ -274,7 +554,7 @@ class Comesolo:
                 
             profundidad_actual += 1
             if objetivo_encontrado:
-                print(f'🎯 Objetivo encontrado a profundidad {profundidad_actual}')
+                registro.info('🎯 Objetivo encontrado a profundidad %d', profundidad_actual)
         
         return self.nodo_objetivo
     
@@ -296,62 +576,42 @@ class Comesolo:
         return solucion
     
     def buscar_solucion(self, max_profundidad=20):
-        """Busca una solución usando el mismo enfoque que 8-puzzle (BFS)"""
-        # Reiniciar el árbol de búsqueda con el estado actual
-        self.arbol_busqueda = {0: [set(), self.raiz.copy(), -1]}
-        self.nodo_numero = 1
-        self.nodo_objetivo = -100
-        
-        # Generar árbol hasta la profundidad máxima
-        self.generar_arbol(max_profundidad)
-        
-        # Devolver la solución si se encontró
-        return self.imprimir_solucion()
+        """Busca una solución con la búsqueda informada (consultando primero la caché en disco)"""
+        camino = resolver_con_cache(TABLERO, lista_a_mascara(self.raiz), informado=True)
+        return [mascara_a_lista(m, NUM_HUECOS) for m in camino]
     
+    def mascara_actual(self):
+        """Máscara de bits del tablero actual (la guarda el historial, no hace falta recorrer self.raiz)"""
+        return self.historial.actual().mascara
+
     def obtener_movimientos_desde_posicion(self, posicion):
         """Obtiene todos los movimientos posibles desde una posición específica"""
-        movimientos = []
-        
-        # Verificar que haya una ficha en la posición
-        if self.raiz and self.raiz[posicion] == 1:
-            # Revisar todos los movimientos posibles desde esta posición
-            for sobre, hasta in MOVIMIENTOS_POSIBLES.get(posicion, []):
-                # Verificar si el movimiento es válido
-                if self.raiz[sobre] == 1 and self.raiz[hasta] == 0:
-                    movimientos.append((posicion, sobre, hasta))
-                    
-        return movimientos
+        if not self.raiz:
+            return []
+        return TABLA_MOVIMIENTOS.desde(self.mascara_actual(), posicion)
     
     def obtener_destinos_validos(self):
-        """Obtiene solo las posiciones de destino válidas para la ficha seleccionada"""
-        destinos = []
-        
+        """Obtiene solo las posiciones de destino válidas para la ficha seleccionada (como conjunto)"""
         if self.ficha_seleccionada and self.movimientos_validos:
-            for desde, sobre, hasta in self.movimientos_validos:
-                destinos.append(hasta)
-                
-        return destinos
+            return TABLA_MOVIMIENTOS.destinos(self.mascara_actual(), self.ficha_seleccionada)
+        return frozenset()
     
     def hacer_movimiento(self, desde, hasta):
         """Realiza un movimiento si es válido"""
         if self.resolviendo:
             return False
         
-        print(f"\n🎯 INTENTANDO MOVIMIENTO: Ficha {POSICIONES_ETIQUETAS[desde]} → Posición {POSICIONES_ETIQUETAS[hasta]}")
+        registro.info("\n🎯 INTENTANDO MOVIMIENTO: Ficha %s → Posición %s", POSICIONES_ETIQUETAS[desde], POSICIONES_ETIQUETAS[hasta])
         
-        # Verificar si el movimiento está en la lista de movimientos válidos
-        movimiento_valido = None
-        for mov_desde, mov_sobre, mov_hasta in self.movimientos_validos:
-            if mov_desde == desde and mov_hasta == hasta:
-                movimiento_valido = (mov_desde, mov_sobre, mov_hasta)
-                break
+        # Verificar si el movimiento es uno de los saltos legales del tablero actual
+        movimiento_valido = self.saltos_legales.buscar(desde, hasta)
         
         if movimiento_valido:
             mov_desde, mov_sobre, mov_hasta = movimiento_valido
             
-            print(f"✅ MOVIMIENTO VÁLIDO:")
-            print(f"   • Ficha {POSICIONES_ETIQUETAS[mov_desde]} se mueve a posición {POSICIONES_ETIQUETAS[mov_hasta]}")
-            print(f"   • Elimina ficha {POSICIONES_ETIQUETAS[mov_sobre]}")
+            registro.info("✅ MOVIMIENTO VÁLIDO:\n   • Ficha %s se mueve a posición %s\n   • Elimina ficha %s",
+                          POSICIONES_ETIQUETAS[mov_desde], POSICIONES_ETIQUETAS[mov_hasta], POSICIONES_ETIQUETAS[mov_sobre],
+                          extra={"evento": "movimiento", "datos": {"desde": mov_desde, "sobre": mov_sobre, "hasta": mov_hasta}})
             
             # Realizar el movimiento
             self.raiz[mov_desde] = 0  # Quitar ficha original
@@ -359,15 +619,19 @@ class Comesolo:
             self.raiz[mov_hasta] = 1   # Colocar ficha en destino
             
             self.movimientos_jugador += 1
+            if self.grabador is not None:
+                self.grabador.movimiento(mov_desde, mov_hasta)
+            self.anotar_movimiento(movimiento_valido)
             self.verificar_fin_juego()
             
             # Mostrar estado del tablero
-            fichas_restantes = sum(1 for i in range(1, 16) if self.raiz[i] == 1)
-            print(f"   • Fichas restantes: {fichas_restantes}")
+            if registro.isEnabledFor(logging.INFO):
+                registro.info("   • Fichas restantes: %d", self.saltos_legales.fichas)
             
             return True
         else:
-            print(f"❌ MOVIMIENTO NO VÁLIDO: No existe ruta de {POSICIONES_ETIQUETAS[desde]} a {POSICIONES_ETIQUETAS[hasta]}")
+            registro.warning("❌ MOVIMIENTO NO VÁLIDO: No existe ruta de %s a %s", POSICIONES_ETIQUETAS[desde], POSICIONES_ETIQUETAS[hasta],
+                             extra={"evento": "movimiento_invalido", "datos": {"desde": desde, "hasta": hasta}})
             return False
     
     def verificar_fin_juego(self):
@@ -375,104 +639,169 @@ class Comesolo:
         if not self.raiz:
             return
             
-        # Contar fichas restantes
-        fichas_restantes = sum(1 for i in range(1, 16) if self.raiz[i] == 1)
+        # Fichas restantes (se llevan al día en cada salto)
+        fichas_restantes = self.saltos_legales.fichas
         
         # Verificar victoria (solo una ficha)
         if fichas_restantes == 1:
             self.juego_terminado = True
             self.ganado = True
             self.tiempo_transcurrido = time.time() - self.tiempo_inicio
-            posicion_final = next(i for i in range(1, 16) if self.raiz[i] == 1)
-            print(f"\n🎉 ¡FELICIDADES! ¡GANASTE!")
-            print(f"   • Ficha final en posición: {POSICIONES_ETIQUETAS[posicion_final]}")
-            print(f"   • Movimientos realizados: {self.movimientos_jugador}")
-            print(f"   • Tiempo: {int(self.tiempo_transcurrido//60):02d}:{int(self.tiempo_transcurrido%60):02d}")
+            posicion_final = self.saltos_legales.ultima_ficha()
+            registro.info("\n🎉 ¡FELICIDADES! ¡GANASTE!\n   • Ficha final en posición: %s\n   • Movimientos realizados: %d\n"
+                          "   • Tiempo: %02d:%02d", POSICIONES_ETIQUETAS[posicion_final], self.movimientos_jugador,
+                          self.tiempo_transcurrido // 60, self.tiempo_transcurrido % 60,
+                          extra={"evento": "victoria", "datos": {"ficha_final": posicion_final, "movimientos": self.movimientos_jugador,
+                                                                 "segundos": round(self.tiempo_transcurrido, 1)}})
             return
         
         # Verificar si hay movimientos disponibles
-        movimientos_disponibles = self.generar_movimientos(self.raiz)
-        if not movimientos_disponibles:
+        if not self.saltos_legales.hay_saltos():
             self.juego_terminado = True
             self.ganado = False
             self.tiempo_transcurrido = time.time() - self.tiempo_inicio
-            print(f"\n🔚 JUEGO TERMINADO")
-            print(f"   • Fichas restantes: {fichas_restantes}")
-            print(f"   • Movimientos realizados: {self.movimientos_jugador}")
-            print(f"   • No hay más movimientos posibles")
+            registro.info("\n🔚 JUEGO TERMINADO\n   • Fichas restantes: %d\n   • Movimientos realizados: %d\n"
+                          "   • No hay más movimientos posibles", fichas_restantes, self.movimientos_jugador,
+                          extra={"evento": "fin_sin_movimientos", "datos": {"fichas": fichas_restantes,
+                                                                            "movimientos": self.movimientos_jugador}})
     
+    def precalcular_pistas(self, presupuesto_ms):
+        """Analiza la posición actual en segundo plano para que las pistas sean instantáneas"""
+        if (presupuesto_ms > 0 and self.raiz and not self.modo_seleccion and self.solucionador is None
+                and NUM_HUECOS <= LIMITE_HUECOS_EXACTO):
+            MOTOR_PISTAS.analizador.precalcular(self.mascara_actual(), presupuesto_ms)
+
+    def especular(self, presupuesto_ms, hay_entrada):
+        """Mientras el jugador piensa, prepara las pistas y veredictos de las posiciones a uno o dos saltos"""
+        if (presupuesto_ms <= 0 or not self.raiz or self.modo_seleccion or self.solucionador is not None
+                or self.resolviendo or self.juego_terminado):
+            return
+        mascara = self.mascara_actual()
+        # En tableros pequeños, primero se termina el análisis de la posición (precalcular_pistas)
+        if NUM_HUECOS <= LIMITE_HUECOS_EXACTO and not MOTOR_PISTAS.analizador.conocido(mascara):
+            return
+        self.especulacion.avanzar(mascara, presupuesto_ms, hay_entrada)
+
+    def completar_entrada(self, entrada):
+        """Copia a una posición del historial lo que el precálculo especulativo ya sabe de ella"""
+        pistas, mejor_fichas = self.especulacion.consultar(entrada.mascara)
+        if entrada.pistas is None:
+            entrada.pistas = pistas
+        if entrada.resoluble is None and mejor_fichas is not None:
+            entrada.mejor_fichas = mejor_fichas
+            entrada.resoluble = mejor_fichas == 1
+
     def obtener_pista(self):
-        """Obtiene una pista usando el árbol de búsqueda"""
-        if not self.raiz or self.resolviendo:
+        """Obtiene una pista puntuando todos los saltos legales con el motor de pistas"""
+        if not self.raiz or self.resolviendo or self.juego_terminado:
             return None
-            
-        # Buscar solución con profundidad limitada
-        objetivo = self.generar_arbol(5)
-        if objetivo > 0:
-            # Reconstruir el primer movimiento de la solución
-            camino = []
-            nodo_actual = objetivo
-            while nodo_actual != -1:
-                camino.append(self.arbol_busqueda[nodo_actual][1])
-                nodo_actual = self.arbol_busqueda[nodo_actual][2]
-            
-            camino.reverse()
-            
-            if len(camino) > 1:
-                # Encontrar la diferencia entre el estado actual y el primer paso
-                estado_actual = camino[0]
-                primer_paso = camino[1]
-                
-                # Encontrar qué ficha se movió
-                for i in range(1, 16):
-                    if estado_actual[i] == 1 and primer_paso[i] == 0:
-                        desde = i
-                    elif estado_actual[i] == 0 and primer_paso[i] == 1:
-                        hasta = i
-                
-                # Encontrar qué ficha se saltó
-                for sobre in range(1, 16):
-                    if estado_actual[sobre] == 1 and primer_paso[sobre] == 0 and sobre != desde:
-                        return (desde, sobre, hasta)
-        
-        return None
+
+        # Reunir los saltos legales de todas las fichas
+        movimientos = TABLA_MOVIMIENTOS.todos(self.mascara_actual())
+
+        # Ordenarlos de mejor a peor según el valor del estado al que llevan (una sola vez
+        # por posición: al volver a ella con deshacer o rehacer se usan los ya puntuados).
+        # Aquí nunca se analiza nada: si la posición aún no está analizada se ordena con lo
+        # que se sepa (o la paridad) y precalcular_pistas termina el análisis por detrás.
+        # En los tableros grandes, que no se analizan, una búsqueda de Monte Carlo la
+        # mejora por detrás (avanzar_pista_montecarlo) sin parar la ventana.
+        entrada = self.historial.actual()
+        self.completar_entrada(entrada)
+        if entrada.pistas is not None:
+            self.pistas_clasificadas = entrada.pistas
+        else:
+            self.pistas_clasificadas = MOTOR_PISTAS.clasificar(entrada.mascara, movimientos, calcular=False)
+            if all(evaluacion.exacta for movimiento, evaluacion in self.pistas_clasificadas):
+                entrada.pistas = self.pistas_clasificadas
+            elif NUM_HUECOS > LIMITE_HUECOS_EXACTO and (self.pista_montecarlo is None
+                                                        or self.pista_montecarlo[0] is not entrada):
+                busqueda = MOTOR_PISTAS.iniciar_montecarlo(entrada.mascara, self.pistas_clasificadas,
+                                                          SEGUNDOS_PISTA_MONTECARLO)
+                if busqueda is None:
+                    entrada.pistas = self.pistas_clasificadas  # No hay nada más que averiguar
+                else:
+                    self.pista_montecarlo = (entrada, self.pistas_clasificadas, busqueda)
+                    registro.info("\n🎲 Mejorando la pista con Monte Carlo...")
+        if not self.pistas_clasificadas:
+            return None
+
+        self.registrar_pistas()
+        return self.pistas_clasificadas[0][0]
+
+    def registrar_pistas(self):
+        """Anuncia los saltos puntuados de mejor a peor (la lista solo se prepara si se va a ver)"""
+        if registro.isEnabledFor(logging.INFO):
+            registro.info("\n💡 PISTAS (de mejor a peor):")
+            for i, ((desde, sobre, hasta), evaluacion) in enumerate(self.pistas_clasificadas, 1):
+                registro.info("   %d. %s → %s: mejor resultado %d ficha(s)%s", i, POSICIONES_ETIQUETAS[desde],
+                              POSICIONES_ETIQUETAS[hasta], evaluacion.mejor_fichas,
+                              "" if evaluacion.soluciones is None else ", %d soluciones" % evaluacion.soluciones)
+
+    def avanzar_pista_montecarlo(self, presupuesto_ms):
+        """Avanza la búsqueda de Monte Carlo de la última pista y, al terminar, guarda la
+        clasificación mejorada y la muestra si el jugador sigue en esa posición esperándola"""
+        if self.pista_montecarlo is None or presupuesto_ms <= 0:
+            return
+        entrada, puntuados, busqueda = self.pista_montecarlo
+        if not busqueda.avanzar(presupuesto_ms):
+            return
+        self.pista_montecarlo = None
+        entrada.pistas = MOTOR_PISTAS.completar_montecarlo(entrada.mascara, puntuados, busqueda)
+        if entrada is self.historial.actual() and self.pista_mostrada is not None and entrada.pistas:
+            self.pistas_clasificadas = entrada.pistas
+            self.pista_mostrada = entrada.pistas[0][0]
+            self.registrar_pistas()
     
-    def resolver_automaticamente(self):
-        """Inicia la resolución automática usando el árbol de búsqueda"""
-        if not self.juego_terminado:
+    def resolver_automaticamente(self, menos_movimientos=False):
+        """Inicia la resolución automática (con menos_movimientos, la de menos cadenas de saltos)"""
+        if not self.juego_terminado and self.tipo_busqueda not in ('resolver', 'minima'):
             self.resolviendo = True
             self.ficha_seleccionada = None
             self.movimientos_validos = []
             self.pista_mostrada = None
             
-            print(f"\n🤖 INICIANDO RESOLUCIÓN AUTOMÁTICA...")
-            print("-" * 40)
-            
-            # Buscar solución desde el estado actual
-            solucion = self.buscar_solucion(25)
+            registro.info("\n🤖 INICIANDO RESOLUCIÓN AUTOMÁTICA...\n%s", "-" * 40)
+
+            # Buscar solución desde el estado actual (avanza en cada fotograma)
+            self.mensaje_resolucion = "Buscando solución... 0%"
+            self.menos_movimientos = menos_movimientos
+            self.iniciar_busqueda('minima' if menos_movimientos else 'resolver')
+
+    def finalizar_resolucion(self, solucion):
+        """Prepara la reproducción paso a paso de la solución encontrada"""
+        self.anotar_resultado(solucion)
+        if solucion and len(solucion) > 1:
+            # Verificar que sea solución completa
+            estado_final = solucion[-1]
+            fichas_finales = sum(1 for i in range(1, NUM_HUECOS + 1) if estado_final[i] == 1)
             
-            if solucion and len(solucion) > 1:
-                # Verificar que sea solución completa
-                estado_final = solucion[-1]
-                fichas_finales = sum(1 for i in range(1, 16) if estado_final[i] == 1)
+            if fichas_finales == 1:
+                self.solucion_pasos = solucion[1:]  # Saltar el estado actual
+                self.mensaje_resolucion = f"Solución encontrada ({len(self.solucion_pasos)} movimientos)"
+                registro.info("✅ Solución encontrada con %d movimientos", len(self.solucion_pasos),
+                              extra={"evento": "resolucion", "datos": {"movimientos": len(self.solucion_pasos)}})
+                if self.menos_movimientos:
+                    # Los saltos seguidos de la misma ficha cuentan como un solo movimiento
+                    cadenas = agrupar_movimientos([lista_a_mascara(estado) for estado in solucion], SALTOS)
+                    self.mensaje_resolucion = f"Solución: {len(self.solucion_pasos)} saltos en {len(cadenas)} movimientos"
+                    registro.info("   Agrupados en %d movimientos de una misma ficha (el mínimo posible)", len(cadenas),
+                                  extra={"evento": "resolucion_minima", "datos": {"saltos": len(self.solucion_pasos),
+                                                                                "movimientos": len(cadenas)}})
                 
-                if fichas_finales == 1:
-                    self.solucion_pasos = solucion[1:]  # Saltar el estado actual
-                    self.mensaje_resolucion = f"Solución encontrada ({len(self.solucion_pasos)} movimientos)"
-                    print(f"✅ Solución encontrada con {len(self.solucion_pasos)} movimientos")
-                    
-                    self.paso_solucion_actual = 0
-                    self.tiempo_ultimo_paso = time.time()
-                else:
-                    self.mensaje_resolucion = "Solución parcial encontrada"
-                    print(f"⚠️  Solución parcial: quedaran {fichas_finales} fichas")
-                    self.solucion_pasos = solucion[1:]
-                    self.paso_solucion_actual = 0
-                    self.tiempo_ultimo_paso = time.time()
+                self.paso_solucion_actual = 0
+                self.tiempo_ultimo_paso = time.time()
             else:
-                self.mensaje_resolucion = "No se encontró solución"
-                print("❌ No se encontró solución desde el estado actual")
-                self.resolviendo = False
+                self.mensaje_resolucion = "Solución parcial encontrada"
+                registro.info("⚠️  Solución parcial: quedaran %d fichas", fichas_finales,
+                              extra={"evento": "resolucion", "datos": {"fichas": fichas_finales}})
+                self.solucion_pasos = solucion[1:]
+                self.paso_solucion_actual = 0
+                self.tiempo_ultimo_paso = time.time()
+        else:
+            self.mensaje_resolucion = "No se encontró solución"
+            registro.info("❌ No se encontró solución desde el estado actual",
+                          extra={"evento": "resolucion", "datos": {"fichas": None}})
+            self.resolviendo = False
     
     def actualizar_resolucion_automatica(self):
         """Actualiza la resolución automática paso a paso"""
@@ -484,7 +813,7 @@ class Comesolo:
                 
                 # Encontrar qué movimiento se hizo
                 desde = sobre = hasta = None
-                for pos in range(1, 16):
+                for pos in range(1, NUM_HUECOS + 1):
                     if estado_anterior[pos] == 1 and self.raiz[pos] == 0:
                         if desde is None:
                             desde = pos
@@ -493,8 +822,14 @@ class Comesolo:
                     elif estado_anterior[pos] == 0 and self.raiz[pos] == 1:
                         hasta = pos
                 
+                salto = salto_entre(lista_a_mascara(estado_anterior), lista_a_mascara(self.raiz), SALTOS)
+                if self.grabador is not None:
+                    self.grabador.movimiento(salto[0], salto[2], solucionador=True)
+                self.anotar_movimiento(salto)
+                
                 if desde and sobre and hasta:
-                    print(f"🤖 Paso {self.paso_solucion_actual + 1}: Ficha {POSICIONES_ETIQUETAS[sobre]} salta sobre {POSICIONES_ETIQUETAS[desde]} → {POSICIONES_ETIQUETAS[hasta]}")
+                    registro.info("🤖 Paso %d: Ficha %s salta sobre %s → %s", self.paso_solucion_actual + 1,
+                                  POSICIONES_ETIQUETAS[sobre], POSICIONES_ETIQUETAS[desde], POSICIONES_ETIQUETAS[hasta])
                 
                 self.movimientos_jugador += 1
                 self.paso_solucion_actual += 1
@@ -506,11 +841,73 @@ class Comesolo:
             else:
                 self.resolviendo = False
     
+    def anotar_movimiento(self, salto):
+        """Añade al historial la posición a la que lleva un salto ya hecho en self.raiz"""
+        anterior = self.historial.actual()
+        desde, sobre, hasta = salto
+        entrada = self.historial.avanzar(anterior.mascara ^ ((1 << desde) | (1 << sobre) | (1 << hasta)), salto)
+        self.saltos_legales.cambiar(entrada.mascara)
+        # Si las pistas de la posición anterior ya puntuaron este salto, la nueva ya se conoce
+        for movimiento, evaluacion in anterior.pistas or []:
+            if movimiento == salto and evaluacion.exacta:
+                entrada.resoluble = evaluacion.resoluble
+                entrada.mejor_fichas = evaluacion.mejor_fichas
+        self.completar_entrada(entrada)
+        self.pistas_clasificadas = []
+        self.solucion_existe = entrada.resoluble
+
+    def restaurar_posicion(self):
+        """Deja la interfaz como corresponde a la posición actual del historial"""
+        entrada = self.historial.actual()
+        self.saltos_legales.cambiar(entrada.mascara)
+        self.completar_entrada(entrada)
+        self.ficha_seleccionada = None
+        self.movimientos_validos = []
+        self.pista_mostrada = None
+        self.pistas_clasificadas = entrada.pistas or []
+        self.solucion_existe = entrada.resoluble
+        self.juego_terminado = False
+        self.ganado = False
+
+    def deshacer(self):
+        """Vuelve a la posición anterior (instantáneo: no repite ninguna búsqueda)"""
+        if self.modo_seleccion or self.resolviendo or not self.historial.puede_deshacer():
+            return False
+        desde, sobre, hasta = self.historial.deshacer().salto
+        self.raiz[desde] = 1
+        self.raiz[sobre] = 1
+        self.raiz[hasta] = 0
+        self.movimientos_jugador -= 1
+        if self.grabador is not None:
+            self.grabador.deshacer()
+        self.restaurar_posicion()
+        registro.info("\n↩️  DESHECHO: Ficha %s vuelve a %s", POSICIONES_ETIQUETAS[hasta], POSICIONES_ETIQUETAS[desde],
+                      extra={"evento": "deshacer", "datos": {"desde": desde, "sobre": sobre, "hasta": hasta}})
+        return True
+
+    def rehacer(self):
+        """Vuelve a hacer el último salto deshecho"""
+        if self.modo_seleccion or self.resolviendo or not self.historial.puede_rehacer():
+            return False
+        desde, sobre, hasta = self.historial.rehacer().salto
+        self.raiz[desde] = 0
+        self.raiz[sobre] = 0
+        self.raiz[hasta] = 1
+        self.movimientos_jugador += 1
+        if self.grabador is not None:
+            self.grabador.movimiento(desde, hasta)
+        self.restaurar_posicion()
+        registro.info("\n↪️  REHECHO: Ficha %s → Posición %s", POSICIONES_ETIQUETAS[desde], POSICIONES_ETIQUETAS[hasta],
+                      extra={"evento": "rehacer", "datos": {"desde": desde, "sobre": sobre, "hasta": hasta}})
+        self.verificar_fin_juego()
+        return True
+
     def reiniciar_seleccion(self):
         """Reinicia el juego al modo de selección de posición inicial"""
         self.modo_seleccion = True
         self.posicion_inicial_vacia = None
         self.raiz = None
+        self.historial = HistorialPartida()
         self.arbol_busqueda = {0: [set(), None, -1]}
         self.nodo_numero = 1
         self.nodo_objetivo = -100
@@ -522,37 +919,63 @@ class Comesolo:
         self.ficha_seleccionada = None
         self.movimientos_validos = []
         self.pista_mostrada = None
+        self.pistas_clasificadas = []
         self.solucion_pasos = []
         self.resolviendo = False
         self.mensaje_resolucion = ""
         self.solucion_existe = None
-        print(f"\n🔄 REINICIANDO JUEGO...")
-        print("Selecciona una nueva posición inicial vacía")
+        self.cancelar_busqueda()  # El botón "Nuevo" cancela cualquier búsqueda en curso
+        registro.info("\n🔄 REINICIANDO JUEGO...\nSelecciona una nueva posición inicial vacía")
 
 # Crear instancia del juego
 juego = Comesolo(None)
 
-# Configurar ventana
-pantalla = pygame.display.set_mode((ANCHO, ALTO))
-pygame.display.set_caption("Comesolo (Solitario de Clavijas) - Basado en 8-puzzle")
-
 # Botones modernos para la interfaz
 ancho_boton, alto_boton = 150, 50
 espaciado_botones = 20
 boton_y = 550
 
 # Definir rectángulos para los botones
-nuevo_btn = pygame.Rect((ANCHO - 3 * ancho_boton - 2 * espaciado_botones) // 2, boton_y, ancho_boton, alto_boton)
-resolver_btn = pygame.Rect(nuevo_btn.right + espaciado_botones, boton_y, ancho_boton, alto_boton)
+nuevo_btn = pygame.Rect((ANCHO - 4 * ancho_boton - 3 * espaciado_botones) // 2, boton_y, ancho_boton, alto_boton)
+pista_btn = pygame.Rect(nuevo_btn.right + espaciado_botones, boton_y, ancho_boton, alto_boton)
+resolver_btn = pygame.Rect(pista_btn.right + espaciado_botones, boton_y, ancho_boton, alto_boton)
 salir_btn = pygame.Rect(resolver_btn.right + espaciado_botones, boton_y, ancho_boton, alto_boton)
 
+def iniciar_ventana():
+    """Inicializa Pygame y crea la ventana y las fuentes (solo desde main)"""
+    global pantalla, FUENTE_CLARA, FUENTE_MEDIANA, FUENTE_GRANDE, FUENTE_PEQUEÑA
+    pygame.init()
+    pygame.font.init()
+    FUENTE_CLARA = pygame.font.Font(None, 32)
+    FUENTE_MEDIANA = pygame.font.Font(None, 40)
+    FUENTE_GRANDE = pygame.font.Font(None, 56)
+    FUENTE_PEQUEÑA = pygame.font.Font(None, 24)
+    pantalla = pygame.display.set_mode((ANCHO, ALTO))
+    pygame.display.set_caption(f"Comesolo (Solitario de Clavijas) - Basado en 8-puzzle - {TABLERO.nombre}")
+
 def obtener_posicion_desde_coord(x, y):
     """Convierte coordenadas de pantalla a posición del tablero"""
-    for pos, (px, py) in POSICIONES.items():
-        # Calcular distancia entre el punto clickeado y la posición
-        if ((x - px) ** 2 + (y - py) ** 2) ** 0.5 <= 35:
-            return pos
-    return None
+    return REJILLA_CLICS.buscar(x, y)
+
+def registrar_seleccion(posicion, movimientos):
+    """Anuncia la ficha seleccionada y sus saltos (la lista solo se prepara si se va a ver)"""
+    if not registro.isEnabledFor(logging.INFO):
+        return
+    registro.info("\n👆 FICHA %s SELECCIONADA", POSICIONES_ETIQUETAS[posicion])
+    if movimientos:
+        registro.info("   Movimientos disponibles: %d", len(movimientos))
+        for i, (desde, sobre, hasta) in enumerate(movimientos, 1):
+            registro.info("   %d. Saltar ficha %s → posición %s", i, POSICIONES_ETIQUETAS[sobre], POSICIONES_ETIQUETAS[hasta])
+    else:
+        registro.info("   ❌ Sin movimientos válidos")
+
+def restante_ms(limite):
+    """Milisegundos que quedan hasta un instante de time.perf_counter() (0 si ya pasó)"""
+    return max(0.0, (limite - time.perf_counter()) * 1000)
+
+def hay_entrada():
+    """Indica si el jugador ha hecho clic, pulsado una tecla o cerrado la ventana (sin sacar el evento de la cola)"""
+    return pygame.event.peek((pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.QUIT))
 
 def dibujar_boton_moderno(rect, color, texto, hover=False, activo=True):
     """Dibuja un botón con estilo moderno"""
@@ -648,10 +1071,15 @@ def dibujar_tablero():
         pantalla.blit(texto_mensaje, rect_mensaje)
     
     # Obtener destinos válidos para resaltar
-    destinos_validos = juego.obtener_destinos_validos() if juego.ficha_seleccionada else []
+    destinos_validos = juego.obtener_destinos_validos() if juego.ficha_seleccionada else frozenset()
+
+    # Detectar hover (una consulta a la rejilla por fotograma)
+    posicion_hover = obtener_posicion_desde_coord(*pygame.mouse.get_pos())
+    if posicion_hover:
+        juego.posicion_hover = posicion_hover
     
     # Dibujar todas las posiciones del tablero
-    for pos in range(1, 16):
+    for pos in range(1, NUM_HUECOS + 1):
         x, y = POSICIONES[pos]
         etiqueta = POSICIONES_ETIQUETAS[pos]
         tiene_ficha = not juego.modo_seleccion and juego.raiz and juego.raiz[pos] == 1
@@ -677,20 +1105,15 @@ def dibujar_tablero():
         elif pos in destinos_validos:
             estado = 'valid_move'
         
-        # Detectar hover
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        if ((mouse_x - x) ** 2 + (mouse_y - y) ** 2) ** 0.5 <= 35:
-            juego.posicion_hover = pos
-        
         # Dibujar la clavija/hueco
-        dibujar_clavija_moderna(x, y, 25, tiene_ficha, estado, etiqueta)
+        dibujar_clavija_moderna(x, y, RADIO_CLAVIJA, tiene_ficha, estado, etiqueta)
     
     # Dibujar información del juego si no estamos en modo selección
     if not juego.modo_seleccion:
         info_y = 620
         if juego.raiz:
             # Contar fichas restantes
-            fichas_restantes = sum(1 for i in range(1, 16) if juego.raiz[i] == 1)
+            fichas_restantes = juego.saltos_legales.fichas
             
             # Mostrar contador de movimientos
             texto_movimientos = FUENTE_MEDIANA.render(f"Movimientos: {juego.movimientos_jugador}", True, BLANCO)
@@ -733,115 +1156,186 @@ def dibujar_tablero():
         # Dibujar botones
         dibujar_boton_moderno(nuevo_btn, (70, 130, 180), "Nuevo", nuevo_btn.collidepoint(posicion_raton))
         
+        pista_activa = not juego.juego_terminado and not juego.resolviendo
+        dibujar_boton_moderno(pista_btn, (0, 150, 136), "Pista",
+                            pista_btn.collidepoint(posicion_raton), pista_activa)
+        
         resolver_activo = not juego.juego_terminado
         dibujar_boton_moderno(resolver_btn, (156, 39, 176), "Resolver",
                             resolver_btn.collidepoint(posicion_raton), resolver_activo)
         
         dibujar_boton_moderno(salir_btn, (244, 67, 54), "Salir", salir_btn.collidepoint(posicion_raton))
 
-# Bucle principal del juego
-ejecutando = True
-reloj = pygame.time.Clock()
-
-# Mensaje de bienvenida en consola
-print("=" * 60)
-print("         COMESOLO (SOLITARIO DE CLAVIJAS) - BASADO EN 8-PUZZLE")
-print("=" * 60)
-print("🎯 OBJETIVO: Eliminar todas las fichas excepto una")
-print("📋 REGLAS: Salta sobre una ficha adyacente a un espacio vacío")
-print("=" * 60)
-print("📖 INSTRUCCIONES:")
-print("1. Haz clic en una posición para comenzar (será la posición vacía)")
-print("2. Selecciona fichas y muévelas a posiciones válidas (verdes)")
-print("3. Usa 'Resolver' para ver la solución usando el algoritmo de 8-puzzle")
-print("4. El programa verificará automáticamente si existe solución")
-print("=" * 60)
-
-# Bucle principal del juego
-while ejecutando:
-    # Procesar eventos
-    for evento in pygame.event.get():
-        if evento.type == pygame.QUIT:
-            ejecutando = False
-        
-        if evento.type == pygame.MOUSEBUTTONDOWN:
-            x, y = pygame.mouse.get_pos()
+# Bucle principal del juego (solo al ejecutar este archivo; al importarlo, por ejemplo
+# desde renderizador.py, se pueden usar las funciones de dibujo sin abrir la partida)
+def main():
+    """Bucle principal de la ventana del juego"""
+    # Mensajes de la partida en la consola (--silencioso los oculta, --eventos archivo.jsonl los guarda)
+    configurar_desde_argumentos()
+    iniciar_ventana()
+
+    # Cada partida de la ventana se graba (se analiza después con grabaciones.py)
+    juego.grabador = obtener_grabador(TABLERO)
+
+    # En los tableros grandes las pistas salen de Monte Carlo en varios procesos, que se
+    # arrancan ahora una sola vez para que cada pista pague solo su búsqueda
+    if NUM_HUECOS > LIMITE_HUECOS_EXACTO:
+        MOTOR_PISTAS.montecarlo = GrupoMontecarlo(NOMBRE_TABLERO)
+
+    # Disposición inicial opcional: python comesolo.py --fichas "a1 b2 c3" (o cadena de 0/1 por hueco)
+    if "--fichas" in sys.argv:
+        try:
+            juego.establecer_disposicion(sys.argv[sys.argv.index("--fichas") + 1])
+        except IndexError:
+            registro.error("❌ Falta la disposición después de --fichas; se empieza la partida normal")
+        except ValueError as e:
+            registro.error("❌ Disposición no válida (%s); se empieza la partida normal", e)
+
+    ejecutando = True
+    reloj = pygame.time.Clock()
+
+    # Mensaje de bienvenida en consola
+    registro.info("\n".join([
+        "=" * 60,
+        "         COMESOLO (SOLITARIO DE CLAVIJAS) - BASADO EN 8-PUZZLE",
+        "=" * 60,
+        "🎯 OBJETIVO: Eliminar todas las fichas excepto una",
+        "📋 REGLAS: Salta sobre una ficha adyacente a un espacio vacío",
+        "=" * 60,
+        "📖 INSTRUCCIONES:",
+        "1. Haz clic en una posición para comenzar (será la posición vacía)",
+        "2. Selecciona fichas y muévelas a posiciones válidas (verdes)",
+        "3. Usa 'Resolver' para ver la solución usando el algoritmo de 8-puzzle",
+        "4. El programa verificará automáticamente si existe solución",
+        "5. Z deshace el último movimiento e Y lo vuelve a hacer",
+        "6. M resuelve con el menor número de movimientos (saltos seguidos de una ficha = 1)",
+        "=" * 60]))
+
+    # Bucle principal del juego
+    while ejecutando:
+        # Inicio del trabajo del fotograma (solo se mide con el panel de rendimiento visible)
+        inicio_fotograma = time.perf_counter() if MONITOR.activo else None
+
+        # Procesar eventos
+        for evento in pygame.event.get():
+            if evento.type == pygame.QUIT:
+                ejecutando = False
             
-            # Modo selección de posición inicial vacía
-            if juego.modo_seleccion:
-                posicion_clic = obtener_posicion_desde_coord(x, y)
-                if posicion_clic:
-                    juego.establecer_posicion_inicial(posicion_clic)
+            # F3 muestra u oculta el panel de rendimiento
+            if evento.type == pygame.KEYDOWN and evento.key == pygame.K_F3:
+                MONITOR.alternar()
+
+            # Z deshace el último salto e Y lo vuelve a hacer
+            if evento.type == pygame.KEYDOWN and evento.key == pygame.K_z:
+                juego.deshacer()
+            if evento.type == pygame.KEYDOWN and evento.key == pygame.K_y:
+                juego.rehacer()
+
+            # M resuelve con el menor número de movimientos (saltos seguidos de una ficha = 1)
+            if evento.type == pygame.KEYDOWN and evento.key == pygame.K_m and juego.raiz and not juego.modo_seleccion:
+                juego.resolver_automaticamente(menos_movimientos=True)
+        
+            if evento.type == pygame.MOUSEBUTTONDOWN:
+                x, y = pygame.mouse.get_pos()
             
-            # Modo juego normal
-            else:
-                # Botón "Nuevo"
-                if nuevo_btn.collidepoint(x, y):
-                    juego.reiniciar_seleccion()
+                # Modo selección de posición inicial vacía
+                if juego.modo_seleccion:
+                    posicion_clic = obtener_posicion_desde_coord(x, y)
+                    if posicion_clic:
+                        juego.establecer_posicion_inicial(posicion_clic)
+            
+                # Modo juego normal
+                else:
+                    # Botón "Nuevo"
+                    if nuevo_btn.collidepoint(x, y):
+                        juego.reiniciar_seleccion()
                 
-                # Botón "Resolver"
-                elif resolver_btn.collidepoint(x, y) and not juego.juego_terminado:
-                    juego.resolver_automaticamente()
+                    # Botón "Pista": resalta el mejor salto con el efecto de pulso
+                    elif pista_btn.collidepoint(x, y) and not juego.juego_terminado and not juego.resolviendo:
+                        juego.ficha_seleccionada = None
+                        juego.movimientos_validos = []
+                        inicio_pista = time.perf_counter()
+                        juego.pista_mostrada = juego.obtener_pista()
+                        MONITOR.pista_ms = (time.perf_counter() - inicio_pista) * 1000
                 
-                # Botón "Salir"
-                elif salir_btn.collidepoint(x, y):
-                    print(f"\n👋 ¡Gracias por jugar!")
-                    ejecutando = False
+                    # Botón "Resolver"
+                    elif resolver_btn.collidepoint(x, y) and not juego.juego_terminado:
+                        juego.resolver_automaticamente()
                 
-                # Interacción con el tablero
-                else:
-                    posicion_clic = obtener_posicion_desde_coord(x, y)
-                    if posicion_clic and not juego.resolviendo and not juego.juego_terminado:
-                        juego.pista_mostrada = None
+                    # Botón "Salir"
+                    elif salir_btn.collidepoint(x, y):
+                        registro.info("\n👋 ¡Gracias por jugar!")
+                        ejecutando = False
+                
+                    # Interacción con el tablero
+                    else:
+                        posicion_clic = obtener_posicion_desde_coord(x, y)
+                        if posicion_clic and not juego.resolviendo and not juego.juego_terminado:
+                            juego.pista_mostrada = None
                         
-                        # Si no hay ficha seleccionada
-                        if juego.ficha_seleccionada is None:
-                            # Seleccionar una ficha
-                            if juego.raiz[posicion_clic] == 1:
-                                juego.ficha_seleccionada = posicion_clic
-                                juego.movimientos_validos = juego.obtener_movimientos_desde_posicion(posicion_clic)
-                                print(f"\n👆 FICHA {POSICIONES_ETIQUETAS[posicion_clic]} SELECCIONADA")
-                                if juego.movimientos_validos:
-                                    print(f"   Movimientos disponibles: {len(juego.movimientos_validos)}")
-                                    for i, (desde, sobre, hasta) in enumerate(juego.movimientos_validos, 1):
-                                        print(f"   {i}. Saltar ficha {POSICIONES_ETIQUETAS[sobre]} → posición {POSICIONES_ETIQUETAS[hasta]}")
-                                else:
-                                    print("   ❌ Sin movimientos válidos")
-                            else:
-                                print(f"\n❌ No hay ficha en posición {POSICIONES_ETIQUETAS[posicion_clic]}")
-                        else:
-                            # Ya hay una ficha seleccionada
-                            if posicion_clic == juego.ficha_seleccionada:
-                                # Deseleccionar
-                                print(f"\n↩️  Ficha {POSICIONES_ETIQUETAS[juego.ficha_seleccionada]} deseleccionada")
-                                juego.ficha_seleccionada = None
-                                juego.movimientos_validos = []
-                            elif juego.raiz[posicion_clic] == 1:
-                                # Seleccionar otra ficha
-                                juego.ficha_seleccionada = posicion_clic
-                                juego.movimientos_validos = juego.obtener_movimientos_desde_posicion(posicion_clic)
-                                print(f"\n👆 FICHA {POSICIONES_ETIQUETAS[posicion_clic]} SELECCIONADA")
-                                if juego.movimientos_validos:
-                                    print(f"   Movimientos disponibles: {len(juego.movimientos_validos)}")
-                                    for i, (desde, sobre, hasta) in enumerate(juego.movimientos_validos, 1):
-                                        print(f"   {i}. Saltar ficha {POSICIONES_ETIQUETAS[sobre]} → posición {POSICIONES_ETIQUETAS[hasta]}")
+                            # Si no hay ficha seleccionada
+                            if juego.ficha_seleccionada is None:
+                                # Seleccionar una ficha
+                                if juego.raiz[posicion_clic] == 1:
+                                    juego.ficha_seleccionada = posicion_clic
+                                    juego.movimientos_validos = juego.obtener_movimientos_desde_posicion(posicion_clic)
+                                    registrar_seleccion(posicion_clic, juego.movimientos_validos)
                                 else:
-                                    print("   ❌ Sin movimientos válidos")
+                                    registro.info("\n❌ No hay ficha en posición %s", POSICIONES_ETIQUETAS[posicion_clic])
                             else:
-                                # Intentar mover a una posición vacía
-                                if juego.hacer_movimiento(juego.ficha_seleccionada, posicion_clic):
+                                # Ya hay una ficha seleccionada
+                                if posicion_clic == juego.ficha_seleccionada:
+                                    # Deseleccionar
+                                    registro.info("\n↩️  Ficha %s deseleccionada", POSICIONES_ETIQUETAS[juego.ficha_seleccionada])
                                     juego.ficha_seleccionada = None
                                     juego.movimientos_validos = []
+                                elif juego.raiz[posicion_clic] == 1:
+                                    # Seleccionar otra ficha
+                                    juego.ficha_seleccionada = posicion_clic
+                                    juego.movimientos_validos = juego.obtener_movimientos_desde_posicion(posicion_clic)
+                                    registrar_seleccion(posicion_clic, juego.movimientos_validos)
+                                else:
+                                    # Intentar mover a una posición vacía
+                                    if juego.hacer_movimiento(juego.ficha_seleccionada, posicion_clic):
+                                        juego.ficha_seleccionada = None
+                                        juego.movimientos_validos = []
+    
+        # Avanzar la búsqueda en curso sin pasarse del presupuesto del fotograma, que es
+        # uno solo para todo el trabajo de fondo: cada paso usa lo que dejó el anterior
+        limite_fondo = time.perf_counter() + PRESUPUESTO_BUSQUEDA_MS / 1000
+        juego.avanzar_busqueda(restante_ms(limite_fondo))
+
+        # La pista de Monte Carlo pedida por el jugador (con procesos, solo mira si ha llegado)
+        juego.avanzar_pista_montecarlo(restante_ms(limite_fondo))
     
-    # Actualizar resolución automática si está activa
-    if juego.resolviendo:
-        juego.actualizar_resolucion_automatica()
+        # Si no hay búsqueda, aprovechar el fotograma para dejar listas las pistas
+        juego.precalcular_pistas(restante_ms(limite_fondo))
+
+        # Y con la posición ya analizada, preparar las siguientes; se deja en cuanto hay
+        # un clic o una tecla en la cola, que se atienden en el próximo fotograma
+        juego.especular(restante_ms(limite_fondo), hay_entrada)
+    
+        # Actualizar resolución automática si está activa
+        if juego.resolviendo:
+            juego.actualizar_resolucion_automatica()
     
-    # Dibujar el tablero y actualizar la pantalla
-    dibujar_tablero()
-    pygame.display.flip()
-    reloj.tick(60)  # Limitar a 60 FPS
-
-# Salir del juego
-pygame.quit()
-sys.exit()
\ No newline at end of file
+        # Dibujar el tablero y actualizar la pantalla
+        dibujar_tablero()
+        if MONITOR.activo:
+            if inicio_fotograma is not None:
+                MONITOR.tiempos_fotograma.append((time.perf_counter() - inicio_fotograma) * 1000)
+            MONITOR.dibujar(reloj, juego)
+        pygame.display.flip()
+        reloj.tick(60)  # Limitar a 60 FPS
+
+    # Salir del juego (guardando lo que la especulación aún no había escrito en la caché)
+    juego.especulacion.guardar_pendientes()
+    if MOTOR_PISTAS.montecarlo is not None:
+        MOTOR_PISTAS.montecarlo.cerrar()
+    pygame.quit()
+    sys.exit()
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,52 @@
+import logging # Para consultar el nivel del registro antes de preparar mensajes
 import time # Para pausar el programa cuando muestra la solución paso a paso
-from typing import List, Tuple # Para decir qué tipo de datos usan las funciones
+from typing import List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+from solucionador import lista_a_mascara, mascara_a_lista, salto_entre
+from cache_soluciones import aplicar_movimientos, guardar_resultado, obtener_cache, resolver_con_cache
+from busqueda_informada import nuevo_solucionador_informado
+from movimientos_minimos import agrupar_movimientos, nuevo_solucionador_movimientos
+from saltos_legales import SaltosLegales
+from tableros import cargar_tablero, tablero_triangular, tableros_disponibles
+from registro import configurar_desde_argumentos, obtener_registro
+from grabaciones import obtener_grabador
+from segundo_plano import BusquedaSegundoPlano, seguir_progreso
+
+# Mensajes de la partida (los muestra main(); usado como biblioteca no escribe nada)
+registro = obtener_registro("consola")
 
 # Clase principal que implementa el juego Comesolo.
 class Comesolo:
     
-    # Inicializa el juego con una posición vacía
-    def __init__(self, posicion_vacia: str = None):
+    # Inicializa el juego con una posición vacía en un triángulo de n filas (5 por defecto)
+    # o en un tablero definido en un archivo (nombre como 'ingles' o ruta a un .json).
+    # Si se da un grabador (grabaciones.py), cada partida y cada salto quedan grabados.
+    def __init__(self, posicion_vacia: str = None, filas: int = 5, tablero: str = None, grabador=None):
+
+        # Geometría del tablero: generada para el número de filas o cargada de su definición
+        self.geometria = cargar_tablero(tablero) if tablero else tablero_triangular(filas)
+        self.num_huecos = self.geometria.num_huecos
 
-        # Diccionario que convierte posiciones del tablero (a1, b3, etc.) a números internos (1-15)
-        self.posiciones = {
-            'a1': 1, 'a2': 2, 'b2': 3, 'a3': 4, 'b3': 5, 'c3': 6,
-            'a4': 7, 'b4': 8, 'c4': 9, 'd4': 10, 'a5': 11, 'b5': 12,
-            'c5': 13, 'd5': 14, 'e5': 15
-        }
+        # Diccionario que convierte posiciones del tablero (a1, b3, etc.) a números internos (1-N)
+        self.posiciones = dict(self.geometria.numeros)
         
-        # Diccionario inverso que convierte números internos (1-15) a posiciones (a1, b3, etc.)
+        # Diccionario inverso que convierte números internos (1-N) a posiciones (a1, b3, etc.)
         self.numeros_a_posiciones = {v: k for k, v in self.posiciones.items()}
         
         # Define los movimientos válidos desde cada posición
         # Formato: posicion_origen: [(ficha_que_salta, posicion_destino)]
-        self.movimientos_posibles = {
-            1: [(2, 4), (3, 6)],
-            2: [(4, 7), (5, 9)],
-            3: [(5, 8), (6, 10)],
-            4: [(2, 1), (5, 6), (7, 11), (8, 13)],
-            5: [(8, 12), (9, 14)],
-            6: [(3, 1), (5, 4), (9, 13), (10, 15)],
-            7: [(4, 2), (8, 9)],
-            8: [(5, 3), (9, 10)],
-            9: [(5, 2), (8, 7)],
-            10: [(6, 3), (9, 8)],
-            11: [(7, 4), (12, 13)],
-            12: [(8, 5), (13, 14)],
-            13: [(8, 4), (9, 6), (12, 11), (14, 15)],
-            14: [(9, 5), (13, 12)],
-            15: [(10, 6), (14, 13)]
-        }
+        self.movimientos_posibles = self.geometria.movimientos_posibles
+
+        # Los mismos movimientos compilados a máscaras de bits para el solucionador
+        self.saltos = self.geometria.saltos
+
+        # Saltos legales y fichas del tablero actual, al día después de cada salto
+        self.saltos_legales = SaltosLegales(self.saltos, self.num_huecos)
+
+        # Grabador de partidas (None = no se graba)
+        self.grabador = grabador
+
+        # Búsqueda que avanza en otro hilo mientras se sigue jugando (None = ninguna)
+        self.busqueda = None
         
         # Limpia completamente todos los datos del juego
         self.reiniciar_completamente()
@@ -59,17 +70,17 @@ class Comesolo:
         self.nodo_objetivo = -100  # ID del estado objetivo (cuando solo queda 1 ficha)
         self.solucion_pasos = []  # Lista que almacena la secuencia de pasos de la solución
     
-    # Convierte una posición en formato letra+número a su número interno (1-15)
+    # Convierte una posición en formato letra+número a su número interno (1-N)
     def convertir_a_numero(self, posicion: str) -> int:
         # Busca la posición en el diccionario
         if posicion.lower() in self.posiciones:
             return self.posiciones[posicion.lower()]
         raise ValueError(f"Posición '{posicion}' no válida")
     
-    # Convierte un número interno (1-15) a su posición en formato letra+número
+    # Convierte un número interno (1-N) a su posición en formato letra+número
     def convertir_a_posicion(self, numero: int) -> str:
         # Verifica que el número esté en el rango válido
-        if 1 <= numero <= 15:
+        if 1 <= numero <= self.num_huecos:
             return self.numeros_a_posiciones[numero]
         raise ValueError(f"Número '{numero}' fuera de rango")
     
@@ -81,10 +92,22 @@ class Comesolo:
         pos_vacia_num = self.convertir_a_numero(posicion_vacia)
         
         # Se crea el tablero inicial: todas las posiciones ocupadas (1) excepto la vacía (0)
-        self.tablero = [1] * 16  # Se usa índices 1-15, el índice 0 no se usa
+        self.tablero = [1] * (self.num_huecos + 1)  # Se usa índices 1-N, el índice 0 no se usa
         self.tablero[pos_vacia_num] = 0  # Marca la posición vacía
         self.tablero[0] = -1  # Ignorar el índice 0
-        
+
+        self.preparar_partida(f"Posición inicial vacía: {posicion_vacia}")
+
+    # Inicializa el juego con cualquier disposición de fichas: etiquetas ("a1 b2 c3"),
+    # una cadena de 0 y 1 con un carácter por hueco o un tablero en forma de lista
+    def inicializar_disposicion(self, fichas):
+        mascara = self.geometria.disposicion_a_mascara(fichas)  # Lanza ValueError si no es válida
+        self.posicion_vacia = None
+        self.tablero = mascara_a_lista(mascara, self.num_huecos)
+        self.preparar_partida(f"Disposición personalizada ({sum(1 for v in self.tablero if v == 1)} fichas)")
+
+    # Reinicia las variables de la partida a partir del tablero ya colocado
+    def preparar_partida(self, descripcion: str):
         # Reinicia todas las variables del juego
         self.movimientos_realizados = 0
         self.juego_terminado = False
@@ -96,12 +119,18 @@ class Comesolo:
         self.nodo_numero = 1  
         self.nodo_objetivo = -100  
         self.solucion_pasos = []
+        self.saltos_legales.reiniciar(lista_a_mascara(self.tablero))
+
+        if self.grabador is not None:
+            self.grabador.nueva_partida(self.saltos_legales.mascara)
         
-        print(f"\n{'='*60}")
-        print(f"JUEGO INICIADO - Posición inicial vacía: {posicion_vacia}")
-        print(f"{'='*60}")
+        registro.info("\n%s\nJUEGO INICIADO - %s\n%s", "=" * 60, descripcion, "=" * 60,
+                      extra={"evento": "partida_nueva", "datos": {"descripcion": descripcion}})
+        # Una disposición con una sola ficha o sin saltos ya es un final de partida
+        self.verificar_fin_juego()
     
-    # Se dibuja el tablero en la consola con formato triangular
+    # Se dibuja el tablero en la consola con formato triangular (a través del registro:
+    # si no se va a ver, ni siquiera se preparan las líneas)
     def dibujar_tablero(self, tablero=None):
 
         # Si no se especifica tablero, usa el tablero actual del juego
@@ -110,45 +139,39 @@ class Comesolo:
             
         # Verifica que el tablero esté inicializado
         if tablero is None:
-            print("Tablero no inicializado. Primero selecciona una posición vacía.")
+            registro.warning("Tablero no inicializado. Primero selecciona una posición vacía.")
+            return
+        if not registro.isEnabledFor(logging.INFO):
             return
         
-        print("\n   TABLERO:")
-        print("   " + "=" * 35)
+        lineas = ["\n   TABLERO:", "   " + "=" * 35]
         
-        # Se dibuja el tablero triangular fila por fila
         # ○ = posición vacía, ● = ficha presente
-        
-        # Fila 1: solo la posición a1
-        print("        " + ("○" if tablero[1] == 0 else "●") + "       |||        a1")
-        
-        # Fila 2: posiciones a2 y b2
-        print("       " + ("○ " if tablero[2] == 0 else "● ") + 
-                    ("○" if tablero[3] == 0 else "●") + "      |||       a2 b2")
-        
-        # Fila 3: posiciones a3, b3 y c3
-        print("      " + ("○ " if tablero[4] == 0 else "● ") + 
-                    ("○ " if tablero[5] == 0 else "● ") + 
-                    ("○" if tablero[6] == 0 else "●") + "     |||      a3 b3 c3")
-        
-        # Fila 4: posiciones a4, b4, c4 y d4
-        print("     " + ("○ " if tablero[7] == 0 else "● ") + 
-                ("○ " if tablero[8] == 0 else "● ") + 
-                ("○ " if tablero[9] == 0 else "● ") + 
-                ("○" if tablero[10] == 0 else "●") + "    |||     a4 b4 c4 d4")
-        
-        # Fila 5: posiciones a5, b5, c5, d5 y e5
-        print("    " + ("○ " if tablero[11] == 0 else "● ") + 
-                ("○ " if tablero[12] == 0 else "● ") + 
-                ("○ " if tablero[13] == 0 else "● ") + 
-                ("○ " if tablero[14] == 0 else "● ") + 
-                ("○" if tablero[15] == 0 else "●") + "   |||    a5 b5 c5 d5 e5")
+        if self.geometria.forma == "triangulo":
+            # Se dibuja el tablero triangular fila por fila
+            total_filas = len(self.geometria.filas)
+            for r, fila in enumerate(self.geometria.filas):
+                margen = total_filas - 1 - r  # Las filas de arriba van más indentadas
+                fichas = " ".join("○" if tablero[n] == 0 else "●" for n in fila)
+                etiquetas = " ".join(self.geometria.etiquetas[n] for n in fila)
+                lineas.append(" " * (4 + margen) + fichas + " " * (3 + margen) + "|||" + " " * (4 + margen) + etiquetas)
+        else:
+            # Tablero de rejilla: cada hueco en su columna, con espacios donde no hay hueco
+            columnas = sorted({x for x, y in self.geometria.coordenadas.values()})
+            for fila in self.geometria.filas:
+                por_columna = {self.geometria.coordenadas[n][0]: n for n in fila}
+                fichas = " ".join(("○" if tablero[por_columna[x]] == 0 else "●") if x in por_columna else " "
+                                  for x in columnas)
+                etiquetas = " ".join(self.geometria.etiquetas[por_columna[x]] if x in por_columna else "  "
+                                     for x in columnas)
+                lineas.append(("    " + fichas + "   |||   " + etiquetas).rstrip())
         
         if tablero == self.tablero:
             # Se cuenta cuántas fichas quedan en el tablero
-            fichas_restantes = sum(1 for i in range(1, 16) if tablero[i] == 1)
-            print(f"\n   Fichas restantes: {fichas_restantes}")
-            print(f"   Movimientos realizados: {self.movimientos_realizados}")
+            fichas_restantes = sum(1 for i in range(1, self.num_huecos + 1) if tablero[i] == 1)
+            lineas.append(f"\n   Fichas restantes: {fichas_restantes}")
+            lineas.append(f"   Movimientos realizados: {self.movimientos_realizados}")
+        registro.info("%s", "\n".join(lineas))
     
     # Genera todos los movimientos posibles desde un estado dado del tablero.
     def generar_movimientos(self, tablero: List[int]) -> List[List[int]]:
@@ -156,7 +179,7 @@ class Comesolo:
         lista_movimientos = []
         
         # Revisa cada posición del tablero buscando fichas que se puedan mover
-        for desde in range(1, 16):
+        for desde in range(1, self.num_huecos + 1):
             if tablero[desde] == 1:
                 # Consulta todos los movimientos posibles desde esta posición
                 for sobre, hasta in self.movimientos_posibles.get(desde, []):
@@ -197,56 +220,47 @@ class Comesolo:
     def hacer_movimiento(self, desde: str, hasta: str) -> bool:
         # Verifica que el juego no haya terminado
         if self.juego_terminado:
-            print("El juego ya ha terminado. Inicia uno nuevo.")
+            registro.warning("El juego ya ha terminado. Inicia uno nuevo.")
             return False 
         
-        print(f"\nINTENTANDO MOVIMIENTO: Ficha {desde} → Posición {hasta}")
+        registro.info("\nINTENTANDO MOVIMIENTO: Ficha %s → Posición %s", desde, hasta)
         
-        # Obtiene todos los movimientos válidos desde la posición de origen
-        movimientos_validos = self.obtener_movimientos_desde_posicion(desde)
-        
-        # Busca si el movimiento solicitado está en la lista de movimientos válidos
-        movimiento_valido = None
-        for mov_desde, mov_sobre, mov_hasta in movimientos_validos:
-            if mov_desde == desde and mov_hasta == hasta:
-                movimiento_valido = (mov_desde, mov_sobre, mov_hasta)
-                break
+        # Busca el salto entre los saltos legales del tablero actual (posiciones no válidas = ninguno)
+        desde_num, hasta_num = self.posiciones.get(desde.lower()), self.posiciones.get(hasta.lower())
+        movimiento_valido = self.saltos_legales.buscar(desde_num, hasta_num) if desde_num and hasta_num else None
         
         # Si encontró el movimiento válido, lo ejecuta
         if movimiento_valido:
-            mov_desde, mov_sobre, mov_hasta = movimiento_valido
-            
-            print(f"MOVIMIENTO VÁLIDO:")
-            print(f"   • Ficha {mov_desde} se mueve a posición {mov_hasta}")
-            print(f"   • Elimina ficha {mov_sobre}")
+            mov_desde_num, mov_sobre_num, mov_hasta_num = movimiento_valido
+            mov_desde, mov_sobre, mov_hasta = (self.convertir_a_posicion(n) for n in movimiento_valido)
             
-            # Convierte las posiciones a números para actualizar el tablero
-            try:
-                mov_desde_num = self.convertir_a_numero(mov_desde)
-                mov_sobre_num = self.convertir_a_numero(mov_sobre)
-                mov_hasta_num = self.convertir_a_numero(mov_hasta)
-            except ValueError as e:
-                print(f"Error en conversión: {e}")
-                return False
+            registro.info("MOVIMIENTO VÁLIDO:\n   • Ficha %s se mueve a posición %s\n   • Elimina ficha %s",
+                          mov_desde, mov_hasta, mov_sobre,
+                          extra={"evento": "movimiento", "datos": {"desde": mov_desde, "sobre": mov_sobre, "hasta": mov_hasta}})
             
             # Ejecuta el movimiento actualizando el tablero
             self.tablero[mov_desde_num] = 0  # Quita la ficha original
             self.tablero[mov_sobre_num] = 0   # Elimina la ficha saltada
             self.tablero[mov_hasta_num] = 1   # Coloca la ficha en su nueva posición
+            self.saltos_legales.aplicar(mov_desde_num, mov_sobre_num, mov_hasta_num)
             
             # Incrementa el contador de movimientos
             self.movimientos_realizados += 1
+            if self.grabador is not None:
+                self.grabador.movimiento(mov_desde_num, mov_hasta_num)
             
-            # Muestra el tablero actualizado
-            print("\nTABLERO ACTUALIZADO:")
-            self.dibujar_tablero()
+            # Muestra el tablero actualizado (solo si el registro está activo)
+            if registro.isEnabledFor(logging.INFO):
+                registro.info("\nTABLERO ACTUALIZADO:")
+                self.dibujar_tablero()
             
             # Verifica si el juego terminó después de este movimiento
             self.verificar_fin_juego()
             
             return True
         else:
-            print(f"MOVIMIENTO NO VÁLIDO: No existe ruta de {desde} a {hasta}")
+            registro.warning("MOVIMIENTO NO VÁLIDO: No existe ruta de %s a %s", desde, hasta,
+                             extra={"evento": "movimiento_invalido", "datos": {"desde": desde, "hasta": hasta}})
             return False
     
     # Verifica si el juego ha terminado (victoria o sin movimientos)
@@ -254,30 +268,29 @@ class Comesolo:
         # Verifica que el tablero esté inicializado
         if not self.tablero:
             return
-        # Cuenta cuántas fichas quedan en el tablero
-        fichas_restantes = sum(1 for i in range(1, 16) if self.tablero[i] == 1)
+        # Fichas que quedan en el tablero (se llevan al día en cada salto)
+        fichas_restantes = self.saltos_legales.fichas
         
         # Verifica condición de victoria: solo queda una ficha
         if fichas_restantes == 1:
             self.juego_terminado = True
             self.ganado = True
             # Encuentra dónde está la ficha ganadora
-            posicion_final_num = next(i for i in range(1, 16) if self.tablero[i] == 1)
-            posicion_final = self.convertir_a_posicion(posicion_final_num)
-            print(f"\n¡FELICIDADES! ¡GANASTE!")
-            print(f"   • Ficha final en posición: {posicion_final}")
-            print(f"   • Movimientos realizados: {self.movimientos_realizados}")
+            posicion_final = self.convertir_a_posicion(self.saltos_legales.ultima_ficha())
+            registro.info("\n¡FELICIDADES! ¡GANASTE!\n   • Ficha final en posición: %s\n   • Movimientos realizados: %d",
+                          posicion_final, self.movimientos_realizados,
+                          extra={"evento": "victoria", "datos": {"ficha_final": posicion_final,
+                                                                 "movimientos": self.movimientos_realizados}})
             return
         
         # Verifica si hay movimientos disponibles (si no hay, el juego termina sin victoria)
-        movimientos_disponibles = self.generar_movimientos(self.tablero)
-        if not movimientos_disponibles:
+        if not self.saltos_legales.hay_saltos():
             self.juego_terminado = True
             self.ganado = False
-            print(f"\nJUEGO TERMINADO")
-            print(f"   • Fichas restantes: {fichas_restantes}")
-            print(f"   • Movimientos realizados: {self.movimientos_realizados}")
-            print(f"   • No hay más movimientos posibles")
+            registro.info("\nJUEGO TERMINADO\n   • Fichas restantes: %d\n   • Movimientos realizados: %d\n"
+                          "   • No hay más movimientos posibles", fichas_restantes, self.movimientos_realizados,
+                          extra={"evento": "fin_sin_movimientos", "datos": {"fichas": fichas_restantes,
+                                                                            "movimientos": self.movimientos_realizados}})
     
     # Genera el árbol de búsqueda usando BFS hasta una profundidad dada usando BFS. este algoritmo es idéntico al del 8-puzzle visto en clase
     def generar_arbol(self, profundidad: int = 20) -> int:
@@ -308,7 +321,7 @@ class Comesolo:
                         arbol_nuevo[self.nodo_numero] = [set(), movimiento, id]  # [hijos, estado, padre]
                         
                         # Verifica si este estado es el objetivo (solo una ficha)
-                        if sum(1 for i in range(1, 16) if movimiento[i] == 1) == 1:
+                        if sum(1 for i in range(1, self.num_huecos + 1) if movimiento[i] == 1) == 1:
                             self.nodo_objetivo = self.nodo_numero
                             objetivo_encontrado = True
                             break
@@ -326,7 +339,7 @@ class Comesolo:
             profundidad_actual += 1
             # Si encontró el objetivo, informa en qué profundidad
             if objetivo_encontrado:
-                print(f'Objetivo encontrado a profundidad {profundidad_actual}')
+                registro.info('Objetivo encontrado a profundidad %d', profundidad_actual)
         
         return self.nodo_objetivo
     
@@ -349,68 +362,87 @@ class Comesolo:
         solucion.reverse()
         return solucion
     
-    # Busca una solución usando BFS.
+    # Busca una solución consultando primero la caché en disco.
+    # Si la posición no está guardada, la resuelve con la búsqueda informada
+    # (busqueda_informada.py): encuentra el camino que deja menos fichas y, si no hay
+    # solución, lo demuestra (cada salto quita una ficha, así que la profundidad nunca pasa de N - 2)
     def buscar_solucion(self, max_profundidad: int = 20) -> List[List[int]]:
-        # Reinicia el árbol de búsqueda con el estado actual como raíz
-        self.arbol_busqueda = {0: [set(), self.tablero.copy(), -1]}
-        self.nodo_numero = 1
-        self.nodo_objetivo = -100
-        
-        # Ejecuta el algoritmo de búsqueda
-        self.generar_arbol(max_profundidad)
-        
-        # Retorna la solución reconstruida (o lista vacía si no se encontró)
-        return self.imprimir_solucion()
+        camino = resolver_con_cache(self.geometria, lista_a_mascara(self.tablero), informado=True)
+
+        # Retorna el mejor camino encontrado en el formato de lista del tablero
+        return [mascara_a_lista(m, self.num_huecos) for m in camino]
     
+    # Busca la solución con el menor número de movimientos, contando como uno solo los
+    # saltos seguidos de la misma ficha (movimientos_minimos.py). No usa la caché: las
+    # soluciones guardadas allí tienen el mínimo de fichas, no de movimientos
+    def buscar_solucion_minima(self) -> List[List[int]]:
+        solucionador = nuevo_solucionador_movimientos(self.geometria, lista_a_mascara(self.tablero))
+        solucionador.avanzar()
+        return [mascara_a_lista(m, self.num_huecos) for m in solucionador.mejor_camino()]
+
     # Dibuja un tablero específico de la solución con información del paso
     def dibujar_tablero_solucion(self, estado: List[int], paso: int, total_pasos: int):
-        print(f"\n{'='*60}")
-        print(f"PASO {paso}/{total_pasos}")
-        print(f"{'='*60}")
+        registro.info("\n%s\nPASO %d/%d\n%s", "=" * 60, paso, total_pasos, "=" * 60)
         self.dibujar_tablero(estado)
         
         # Calcula y muestra información adicional del paso
-        fichas_restantes = sum(1 for i in range(1, 16) if estado[i] == 1)
-        print(f"   Fichas restantes: {fichas_restantes}")
+        fichas_restantes = sum(1 for i in range(1, self.num_huecos + 1) if estado[i] == 1)
+        registro.info("   Fichas restantes: %d", fichas_restantes)
     
     # Realiza la resolución automática del juego usando el árbol de búsqueda
-    def resolver_automaticamente(self):
+    # Con menos_movimientos=True busca la solución con menos movimientos (cadenas de saltos).
+    # Si se da la solución (ya buscada en segundo plano), solo la muestra y la aplica
+    def resolver_automaticamente(self, menos_movimientos: bool = False, solucion: Optional[List[List[int]]] = None):
         # Verifica que el juego esté inicializado
         if not self.tablero:
-            print("Primero inicializa el juego con una posición vacía.")
+            registro.warning("Primero inicializa el juego con una posición vacía.")
             return
             
         # Verifica que el juego no haya terminado ya
         if self.juego_terminado:
-            print("El juego ya ha terminado. Inicia uno nuevo.")
+            registro.warning("El juego ya ha terminado. Inicia uno nuevo.")
             return
             
-        print(f"\nINICIANDO RESOLUCIÓN AUTOMÁTICA...")
-        print("-" * 40)
+        registro.info("\nINICIANDO RESOLUCIÓN AUTOMÁTICA...\n%s", "-" * 40)
         
         # Busca una solución desde el estado actual
-        solucion = self.buscar_solucion(25)  # Busca hasta profundidad 25
+        if solucion is not None:
+            pass
+        elif menos_movimientos:
+            solucion = self.buscar_solucion_minima()
+        else:
+            solucion = self.buscar_solucion(25)  # Busca hasta profundidad 25
         
         # Si encontró una solución y tiene más de un estado
         if solucion and len(solucion) > 1:
             # Verifica que sea una solución completa (solo una ficha al final)
             estado_final = solucion[-1]
-            fichas_finales = sum(1 for i in range(1, 16) if estado_final[i] == 1)
+            fichas_finales = sum(1 for i in range(1, self.num_huecos + 1) if estado_final[i] == 1)
             
             if fichas_finales == 1:
-                print(f"Solución encontrada con {len(solucion) - 1} movimientos")
-                print("\nSECUENCIA DE SOLUCIÓN:")
-                print("-" * 40)
-                
-                # Analiza cada paso de la solución para mostrar los movimientos
-                for i in range(1, len(solucion)):
+                registro.info("Solución encontrada con %d %s", len(solucion) - 1,
+                              "saltos" if menos_movimientos else "movimientos",
+                              extra={"evento": "resolucion", "datos": {"movimientos": len(solucion) - 1}})
+                if menos_movimientos and registro.isEnabledFor(logging.INFO):
+                    # Cada cadena de saltos de la misma ficha cuenta como un solo movimiento
+                    cadenas = agrupar_movimientos([lista_a_mascara(estado) for estado in solucion], self.saltos)
+                    registro.info("Agrupados en %d movimientos de una misma ficha (el mínimo posible):", len(cadenas))
+                    for numero, cadena in enumerate(cadenas, 1):
+                        recorrido = " → ".join([self.convertir_a_posicion(cadena[0][0])] +
+                                               [self.convertir_a_posicion(hasta) for desde, sobre, hasta in cadena])
+                        registro.info("   Movimiento %d: %s", numero, recorrido)
+                # Analiza cada paso de la solución para mostrar los movimientos (y, con una
+                # pausa entre pasos, cómo queda el tablero), solo si se va a ver
+                mostrar = registro.isEnabledFor(logging.INFO)
+                registro.info("\nSECUENCIA DE SOLUCIÓN:\n%s", "-" * 40)
+                for i in range(1, len(solucion) if mostrar else 1):
                     estado_anterior = solucion[i-1]
                     estado_actual = solucion[i]
                     
                     # Encuentra qué movimiento se hizo comparando los dos estados
                     desde = sobre = hasta = None
                     
-                    for pos in range(1, 16):
+                    for pos in range(1, self.num_huecos + 1):
                         # Si una posición tenía ficha y ahora no la tiene
                         if estado_anterior[pos] == 1 and estado_actual[pos] == 0:
                             if desde is None:
@@ -426,18 +458,27 @@ class Comesolo:
                         desde_str = self.convertir_a_posicion(desde)
                         sobre_str = self.convertir_a_posicion(sobre)
                         hasta_str = self.convertir_a_posicion(hasta)
-                        print(f"   Paso {i}: Ficha {desde_str} salta sobre ficha {sobre_str} → posición {hasta_str}")
+                        registro.info("   Paso %d: Ficha %s salta sobre ficha %s → posición %s",
+                                      i, desde_str, sobre_str, hasta_str)
                 
                 # Muestra la visualización paso a paso de la solución
-                print(f"\nVISUALIZACIÓN DE LA SOLUCIÓN:")
-                for i, estado in enumerate(solucion):
+                registro.info("\nVISUALIZACIÓN DE LA SOLUCIÓN:")
+                for i, estado in enumerate(solucion if mostrar else []):
                     self.dibujar_tablero_solucion(estado, i, len(solucion)-1)
                     if i < len(solucion) - 1:
                         # Pausa breve entre pasos para que se pueda seguir la secuencia
                         time.sleep(1.5)
                 
+                # Se graban los saltos del solucionador
+                if self.grabador is not None:
+                    mascaras = [lista_a_mascara(estado) for estado in solucion]
+                    for antes, despues in zip(mascaras, mascaras[1:]):
+                        desde, sobre, hasta = salto_entre(antes, despues, self.saltos)
+                        self.grabador.movimiento(desde, hasta, solucionador=True)
+
                 # Se actualiza el juego al estado final (ganado)
                 self.tablero = estado_final.copy()
+                self.saltos_legales.cambiar(lista_a_mascara(self.tablero))
                 self.movimientos_realizados += len(solucion) - 1
                 self.verificar_fin_juego()
                 
@@ -445,49 +486,145 @@ class Comesolo:
                 input("\nPresiona Enter para regresar al menú principal...")
                 return True
             else:
-                print(f"Solución parcial: quedarán {fichas_finales} fichas")
+                registro.info("Solución parcial: quedarán %d fichas", fichas_finales,
+                              extra={"evento": "resolucion", "datos": {"fichas": fichas_finales}})
         else:
-            print("No se encontró solución desde el estado actual")
+            registro.info("No se encontró solución desde el estado actual",
+                          extra={"evento": "resolucion", "datos": {"fichas": None}})
         
         return False
     
     # Verifica si existe una solución desde la posición inicial actual
-    def verificar_solucion_existe(self):
+    # (si se da la solución, ya buscada en segundo plano, solo muestra el resultado)
+    def verificar_solucion_existe(self, solucion: Optional[List[List[int]]] = None):
         # Verifica que el juego esté inicializado
         if not self.tablero:
-            print("Primero inicializa el juego con una posición vacía.")
+            registro.warning("Primero inicializa el juego con una posición vacía.")
             return
             
-        print("\nVERIFICANDO SI EXISTE SOLUCIÓN...")
-        print("-" * 40)
+        registro.info("\nVERIFICANDO SI EXISTE SOLUCIÓN...\n%s", "-" * 40)
         
         # Busca una solución completa desde el estado actual
-        solucion = self.buscar_solucion(25)
+        if solucion is None:
+            solucion = self.buscar_solucion(25)
         
         # Analiza el resultado de la búsqueda
         if solucion and len(solucion) > 1:
             # Verifica que el último estado tenga solo una ficha
             estado_final = solucion[-1]
-            fichas_finales = sum(1 for i in range(1, 16) if estado_final[i] == 1)
+            fichas_finales = sum(1 for i in range(1, self.num_huecos + 1) if estado_final[i] == 1)
             
             if fichas_finales == 1:
-                print(f"¡SOLUCIÓN EXISTE!")
-                print(f"   Número de movimientos necesarios: {len(solucion) - 1}")
                 # Encuentra dónde quedaría la ficha final
-                posicion_final_num = next(i for i in range(1, 16) if estado_final[i] == 1)
+                posicion_final_num = next(i for i in range(1, self.num_huecos + 1) if estado_final[i] == 1)
                 posicion_final = self.convertir_a_posicion(posicion_final_num)
-                print(f"   Ficha final quedará en posición: {posicion_final}")
+                registro.info("¡SOLUCIÓN EXISTE!\n   Número de movimientos necesarios: %d\n"
+                              "   Ficha final quedará en posición: %s", len(solucion) - 1, posicion_final,
+                              extra={"evento": "verificacion", "datos": {"resoluble": True, "movimientos": len(solucion) - 1,
+                                                                         "ficha_final": posicion_final}})
                 
                 # Muestra cómo se vería el tablero final
-                print(f"\nTABLERO FINAL DE LA SOLUCIÓN:")
-                self.dibujar_tablero(estado_final)
+                if registro.isEnabledFor(logging.INFO):
+                    registro.info("\nTABLERO FINAL DE LA SOLUCIÓN:")
+                    self.dibujar_tablero(estado_final)
             else:
-                print(f"NO HAY SOLUCIÓN PERFECTA")
-                print(f"   Mejor resultado posible: {fichas_finales} fichas restantes")
+                registro.info("NO HAY SOLUCIÓN PERFECTA\n   Mejor resultado posible: %d fichas restantes", fichas_finales,
+                              extra={"evento": "verificacion", "datos": {"resoluble": False, "mejor_fichas": fichas_finales}})
         else:
-            print(f"NO HAY SOLUCIÓN desde la posición inicial {self.posicion_vacia}")
+            registro.info("NO HAY SOLUCIÓN desde la posición inicial %s", self.posicion_vacia or 'personalizada',
+                          extra={"evento": "verificacion", "datos": {"resoluble": False}})
         
-        print("-" * 40)
+        registro.info("-" * 40)
+
+    # Empieza en otro hilo una búsqueda desde el tablero actual: 'verificar', 'resolver' o
+    # 'minima' (menos movimientos). Si la caché ya tiene la posición no hace falta buscar y
+    # devuelve el camino; si no, devuelve None y la búsqueda queda en self.busqueda
+    def iniciar_busqueda(self, tipo: str) -> Optional[List[int]]:
+        self.cancelar_busqueda()
+        mascara = self.saltos_legales.mascara
+        if tipo == 'minima':
+            solucionador = nuevo_solucionador_movimientos(self.geometria, mascara)
+        else:
+            cache = obtener_cache(self.geometria)
+            resultado = cache.buscar(mascara) if cache is not None else None
+            if resultado is not None:
+                return aplicar_movimientos(mascara, resultado.movimientos)
+            solucionador = nuevo_solucionador_informado(self.geometria, mascara)
+        self.busqueda = BusquedaSegundoPlano(solucionador, tipo, mascara)
+        return None
+
+    # Detiene la búsqueda en segundo plano, si la hay
+    def cancelar_busqueda(self):
+        if self.busqueda is not None:
+            self.busqueda.cancelar()
+            self.busqueda = None
+
+    # Muestra el resultado de una búsqueda y, si era para resolver y el tablero no ha
+    # cambiado desde que empezó, lo aplica. Devuelve True si la resolución terminó la partida
+    def usar_resultado(self, tipo: str, mascara: int, camino: List[int]) -> bool:
+        solucion = [mascara_a_lista(m, self.num_huecos) for m in camino]
+        cambiado = mascara != self.saltos_legales.mascara
+        if tipo == 'verificar':
+            if cambiado:
+                registro.info("\n(Resultado para la posición en la que empezó la búsqueda; el tablero ha cambiado desde entonces)")
+            self.verificar_solucion_existe(solucion)
+            return False
+        if cambiado:
+            registro.info("\nLa búsqueda terminó, pero el tablero ha cambiado desde que empezó: su solución ya no sirve.")
+            return False
+        return bool(self.resolver_automaticamente(tipo == 'minima', solucion))
+
+    # Si la búsqueda en segundo plano ya terminó, guarda su resultado en la caché y lo usa.
+    # Devuelve True si la resolución terminó la partida
+    def recoger_busqueda(self) -> bool:
+        busqueda = self.busqueda
+        if busqueda is None or not busqueda.terminada():
+            return False
+        self.busqueda = None
+        if busqueda.error is not None:
+            registro.error("La búsqueda falló: %s", busqueda.error)
+            return False
+        solucionador = busqueda.solucionador
+        registro.info("\nBúsqueda terminada en %.1f s (%d nodos)", busqueda.segundos(), solucionador.nodos_expandidos,
+                      extra={"evento": "busqueda_terminada", "datos": {"tipo": busqueda.tipo, "segundos": round(busqueda.segundos(), 1),
+                                                                       "nodos": solucionador.nodos_expandidos}})
+        cache = obtener_cache(self.geometria)
+        if cache is not None and busqueda.tipo != 'minima':
+            guardar_resultado(cache, solucionador)
+        return self.usar_resultado(busqueda.tipo, busqueda.mascara, solucionador.mejor_camino())
+
+# Busca en segundo plano ('verificar', 'resolver' o 'minima') mostrando el progreso en una
+# línea. Con 'c' se cancela y con cualquier otra tecla se vuelve al menú mientras la
+# búsqueda sigue (se puede seguir moviendo fichas). Si ya hay una búsqueda igual desde el
+# mismo tablero, vuelve a mostrar su progreso en vez de empezar otra.
+# Devuelve True si la resolución terminó la partida
+def buscar_con_progreso(juego: Comesolo, tipo: str) -> bool:
+    if tipo != 'verificar' and juego.juego_terminado:
+        print("El juego ya ha terminado. Inicia uno nuevo.")
+        return False
+    busqueda = juego.busqueda
+    if busqueda is None or busqueda.tipo != tipo or busqueda.mascara != juego.saltos_legales.mascara:
+        camino = juego.iniciar_busqueda(tipo)
+        if camino is not None:
+            return juego.usar_resultado(tipo, juego.saltos_legales.mascara, camino)
+    print("Buscando en segundo plano ('c' = cancelar, otra tecla = seguir jugando mientras busca)")
+    tecla = seguir_progreso(juego.busqueda)
+    if tecla is None:
+        return juego.recoger_busqueda()
+    if tecla.lower() == 'c':
+        juego.cancelar_busqueda()
+        print("Búsqueda cancelada.")
+    else:
+        print("La búsqueda sigue en segundo plano; el resultado aparecerá en el menú cuando termine.")
+    return False
+
+# Avisa de que el solucionador terminó la partida (después se reinicia el juego)
+def anunciar_juego_resuelto():
+    print(f"\n{'='*60}")
+    print("¡JUEGO RESUELTO AUTOMÁTICAMENTE!")
+    print("Regresando al menú principal...")
+    print("(Toda la información del juego se ha reiniciado)")
+    print(f"{'='*60}")
 
 # muestra el menú principal del juego
 def mostrar_menu_principal():
@@ -503,16 +640,28 @@ def mostrar_menu_principal():
     print("4. Mostrar tablero actual")
     print("5. Realizar movimiento")
     print("6. Salir")
+    print("7. Resolver con el menor número de movimientos (saltos seguidos de una ficha = 1)")
     print("0. Mostrar menú nuevamente")
     print("="*60)
 
 # Función principal del juego
 def main():
+    # Mensajes de la partida en la consola (--silencioso los oculta, --eventos archivo.jsonl los guarda)
+    configurar_desde_argumentos()
+
     # Variable que almacena la instancia actual del juego (None = no hay juego activo)
     juego = None
 
     # Bucle principal del programa que mantiene el menú activo
     while True:
+        # Resultado o progreso de la búsqueda en segundo plano, si hay una
+        if juego is not None and juego.busqueda is not None:
+            if not juego.busqueda.terminada():
+                print("\n" + juego.busqueda.linea_progreso())
+            elif juego.recoger_busqueda():
+                anunciar_juego_resuelto()
+                juego = None
+
         # Muestra el menú de opciones al usuario
         mostrar_menu_principal()
         
@@ -531,22 +680,51 @@ def main():
         
         if opcion == 1:
             # OPCIÓN 1: Iniciar nuevo juego - siempre crea una nueva instancia limpia
+            if juego is not None:
+                juego.cancelar_busqueda()
             try:
-                # Pide al usuario la posición inicial vacía
-                pos_vacia = input("Ingresa la posición inicial vacía (ej: a1, b3, c5): ").lower()
+                # Pide el tablero: triángulo de 5-8 filas (15, 21, 28 o 36 huecos),
+                # una de las definiciones incluidas ('ingles', 'europeo') o un archivo .json
+                eleccion = input("Tablero (5-8 filas, 'ingles', 'europeo' o archivo .json; Enter = 5): ").strip().lower()
+                filas, nombre_tablero = 5, None
+                if eleccion.isdigit():
+                    filas = int(eleccion)
+                    if not 5 <= filas <= 8:
+                        print("Número de filas no válido. Debe estar entre 5 y 8.")
+                        continue
+                elif eleccion:
+                    if eleccion not in tableros_disponibles() and not eleccion.endswith(".json"):
+                        print("Tablero no válido. Tableros disponibles:", ", ".join(tableros_disponibles()))
+                        continue
+                    nombre_tablero = eleccion
+                geometria = cargar_tablero(nombre_tablero) if nombre_tablero else tablero_triangular(filas)
+
+                # Pide al usuario la posición inicial vacía ('p' = colocar las fichas a mano)
+                pos_vacia = input(f"Ingresa la posición inicial vacía (ej: {geometria.etiquetas[geometria.vacio_inicial]}, b3, c5; 'p' = personalizada): ").lower()
+
+                if pos_vacia == 'p':
+                    # Disposición libre: lista de posiciones con ficha o cadena de 0/1 por hueco
+                    fichas = input("Posiciones con ficha (ej: a1 b2 c3) o cadena de 0/1 por hueco: ").strip()
+                    juego = Comesolo(None, filas, nombre_tablero, obtener_grabador(geometria))
+                    try:
+                        juego.inicializar_disposicion(fichas)
+                    except ValueError as e:
+                        print(f"Error: {e}")
+                        juego = None
+                        continue
+                    pos_vacia = None
                 
                 # Lista de todas las posiciones válidas en el tablero
-                posiciones_validas = ['a1', 'a2', 'b2', 'a3', 'b3', 'c3', 
-                                     'a4', 'b4', 'c4', 'd4', 'a5', 'b5', 
-                                     'c5', 'd5', 'e5']
+                posiciones_validas = list(geometria.numeros)
                 
                 # Verifica que la posición ingresada sea válida
-                if pos_vacia not in posiciones_validas:
+                if pos_vacia is not None and pos_vacia not in posiciones_validas:
                     print("Posición no válida. Posiciones válidas:", ", ".join(posiciones_validas))
                     continue
                     
                 # IMPORTANTE: Crea una nueva instancia completamente limpia del juego
-                juego = Comesolo(pos_vacia)
+                if pos_vacia is not None:
+                    juego = Comesolo(pos_vacia, filas, nombre_tablero, obtener_grabador(geometria))
                 juego.dibujar_tablero()
                 
                 # Bucle de juego: continúa hasta que el juego termine
@@ -593,7 +771,7 @@ def main():
             if juego is None or juego.tablero is None:
                 print("Primero inicia un juego con la opción 1.")
             else:
-                juego.verificar_solucion_existe()
+                buscar_con_progreso(juego, 'verificar')
         
         elif opcion == 3:
             # OPCIÓN 3: Resolver automáticamente
@@ -601,12 +779,8 @@ def main():
                 print("Primero inicia un juego con la opción 1.")
             else:
                 # Si la resolución automática fue exitosa, el juego termina
-                if juego.resolver_automaticamente():
-                    print(f"\n{'='*60}")
-                    print("¡JUEGO RESUELTO AUTOMÁTICAMENTE!")
-                    print("Regresando al menú principal...")
-                    print("(Toda la información del juego se ha reiniciado)")
-                    print(f"{'='*60}")
+                if buscar_con_progreso(juego, 'resolver'):
+                    anunciar_juego_resuelto()
                     
                     # Reinicia completamente el juego
                     juego = None
@@ -655,11 +829,23 @@ def main():
         
         elif opcion == 6:
             # OPCIÓN 6: Salir del programa
+            if juego is not None:
+                juego.cancelar_busqueda()
             print("¡Gracias por jugar!")
             break
+
+        elif opcion == 7:
+            # OPCIÓN 7: Resolver con el menor número de movimientos
+            if juego is None or juego.tablero is None:
+                print("Primero inicia un juego con la opción 1.")
+            elif buscar_con_progreso(juego, 'minima'):
+                anunciar_juego_resuelto()
+
+                # Reinicia completamente el juego
+                juego = None
         
         else:
-            print("Opción no válida. Por favor, selecciona una opción del 0 al 6.")
+            print("Opción no válida. Por favor, selecciona una opción del 0 al 7.")
 
 # Punto de entrada del programa
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+import time # Para limitar el tiempo que se trabaja en cada llamada
+from collections import deque # Para la cola de posiciones pendientes
+from typing import Callable, Dict, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from busqueda_informada import nuevo_solucionador_informado
+from cache_soluciones import datos_resultado, obtener_cache
+from pistas import MotorPistas
+from solucionador import contar_fichas, hijos
+
+# Saltos por delante de la posición actual que se preparan (1 = las posiciones a un salto)
+PROFUNDIDAD = 2
+
+# Milisegundos de cada trozo de trabajo: entre trozos se mira si ha llegado una entrada
+PASO_MS = 1
+
+# Nodos como máximo de la búsqueda del veredicto de una posición; si no basta, la
+# posición se deja sin veredicto (una búsqueda pedida por el jugador la terminará)
+LIMITE_NODOS_POSICION = 200000
+
+# Posiciones guardadas como máximo; al pasar de aquí se olvidan todas y se empieza de nuevo
+LIMITE_POSICIONES = 50000
+
+
+# Precálculo especulativo de pistas y veredictos mientras el jugador piensa. Recorre
+# las posiciones a las que se puede llegar desde la actual en hasta PROFUNDIDAD saltos
+# (las más cercanas primero) y para cada una deja puntuados sus saltos con el motor de
+# pistas y averiguado si tiene solución: con el análisis exacto si lo hay, y si no con
+# la caché en disco o una búsqueda informada cuyo resultado se guarda en la caché. Así,
+# haga el jugador el salto que haga, la pista y el veredicto siguientes ya están listos.
+# Todo el trabajo va en trozos de PASO_MS y se deja en cuanto interrumpir() dice que
+# el jugador ha hecho algo; al cambiar la posición se empieza desde la nueva. Los
+# resultados nuevos se escriben en la caché todos juntos (una sola confirmación en
+# disco) cuando ya no queda nada por preparar, o al llamar a guardar_pendientes().
+class PrecalculoEspeculativo:
+
+    def __init__(self, motor: MotorPistas, profundidad: int = PROFUNDIDAD,
+                 limite_nodos: int = LIMITE_NODOS_POSICION):
+        self.motor = motor
+        self.tablero = motor.tablero
+        self.profundidad = profundidad
+        self.limite_nodos = limite_nodos
+
+        # Resultados: {estado: saltos puntuados} y {estado: menor número de fichas alcanzable}
+        self.pistas: Dict[int, List] = {}
+        self.veredictos: Dict[int, int] = {}
+
+        # Trabajo pendiente para la posición actual
+        self.raiz = None
+        self.pendientes = deque()
+        self.solucionador = None  # Búsqueda del veredicto en curso (o None)
+        self.por_guardar = []  # Resultados terminados que aún no están en la caché en disco
+
+    # Prepara la cola de posiciones desde otra posición actual (la propia y las de
+    # uno, dos... saltos, por orden de distancia y sin repetir)
+    def reiniciar(self, mascara: int):
+        if self.solucionador is not None:
+            self.solucionador.cancelar()
+            self.solucionador = None
+        if len(self.pistas) + len(self.veredictos) > LIMITE_POSICIONES:
+            self.pistas.clear()
+            self.veredictos.clear()
+        self.raiz = mascara
+        nivel = [mascara]
+        vistos = {mascara}
+        self.pendientes = deque(nivel)
+        for _ in range(self.profundidad):
+            siguiente = []
+            for estado in nivel:
+                for hijo in hijos(estado, self.tablero.saltos):
+                    if hijo not in vistos:
+                        vistos.add(hijo)
+                        siguiente.append(hijo)
+            self.pendientes.extend(siguiente)
+            nivel = siguiente
+
+    # Trabaja para la posición actual como máximo presupuesto_ms milisegundos, o hasta
+    # que interrumpir() devuelva True. Devuelve True cuando ya no queda nada por preparar
+    # (y entonces escribe en la caché lo pendiente).
+    def avanzar(self, mascara: int, presupuesto_ms: float, interrumpir: Optional[Callable[[], bool]] = None) -> bool:
+        if mascara != self.raiz:
+            self.reiniciar(mascara)
+        limite = time.perf_counter() + presupuesto_ms / 1000
+        while self.solucionador is not None or self.pendientes:
+            if interrumpir is not None and interrumpir():
+                return False
+            restante = (limite - time.perf_counter()) * 1000
+            if restante <= 0:
+                return False
+            if self.solucionador is not None:
+                self.avanzar_veredicto(min(PASO_MS, restante))
+            else:
+                self.preparar(self.pendientes.popleft())
+        self.guardar_pendientes()
+        return True
+
+    # Puntúa los saltos de una posición y busca su veredicto si todavía no se conoce
+    def preparar(self, estado: int):
+        if estado not in self.pistas:
+            self.pistas[estado] = self.motor.clasificar(estado)
+        if estado in self.veredictos:
+            return
+        evaluacion = self.motor.analizador.evaluar(estado)
+        if evaluacion.exacta:
+            self.veredictos[estado] = evaluacion.mejor_fichas
+            return
+        cache = obtener_cache(self.tablero)
+        resultado = cache.buscar(estado) if cache is not None else None
+        if resultado is not None:
+            self.veredictos[estado] = resultado.mejor_fichas
+            return
+        self.solucionador = nuevo_solucionador_informado(self.tablero, estado)
+
+    # Avanza la búsqueda del veredicto en curso y, al terminar, lo guarda (y lo deja
+    # pendiente de escribir en la caché)
+    def avanzar_veredicto(self, presupuesto_ms: float):
+        solucionador = self.solucionador
+        if not solucionador.avanzar(presupuesto_ms):
+            if solucionador.nodos_expandidos >= self.limite_nodos:
+                solucionador.cancelar()
+                self.solucionador = None
+            return
+        self.solucionador = None
+        camino = solucionador.mejor_camino()
+        self.veredictos[camino[0]] = contar_fichas(camino[-1])
+        self.por_guardar.append(datos_resultado(solucionador))
+
+    # Escribe en la caché en disco los resultados pendientes, en un solo lote
+    def guardar_pendientes(self):
+        if not self.por_guardar:
+            return
+        cache = obtener_cache(self.tablero)
+        if cache is not None:
+            cache.guardar_lote(self.por_guardar)
+        self.por_guardar = []
+
+    # Lo ya preparado de una posición: (saltos puntuados o None, mejor número de fichas o None)
+    def consultar(self, mascara: int) -> Tuple[Optional[List], Optional[int]]:
+        return self.pistas.get(mascara), self.veredictos.get(mascara)
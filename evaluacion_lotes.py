@@ -0,0 +1,116 @@
+import argparse # Para las órdenes de línea de comandos
+import multiprocessing # Para repartir lotes grandes entre varios procesos
+import sys # Para leer las disposiciones de la entrada estándar
+import time # Para medir cuántas disposiciones se evalúan por segundo
+from typing import Iterable, List, Optional, Tuple, Union # Para decir qué tipo de datos usan las funciones
+
+from analisis import AnalizadorEstados
+from solucionador import contar_fichas
+from tableros import Tablero, cargar_tablero
+from tablabase import abrir_tablabase
+
+# Disposiciones que recibe cada proceso de una vez (menos mensajes entre procesos)
+TAM_TROZO = 256
+
+# Resultado de una disposición: (máscara, fichas, resoluble, mejor_fichas, saltos_hasta_el_final, soluciones)
+# resoluble y soluciones son None cuando el tablero es demasiado grande y no hay tabla en disco
+Resultado = Tuple[int, int, Optional[bool], int, int, Optional[int]]
+
+# En un lote, cada disposición no válida da el mensaje de error en vez de su resultado
+ResultadoLote = Union[Resultado, str]
+
+
+# Evaluador de muchas disposiciones de fichas a la vez. Todas comparten el mismo
+# analizador de estados, así que las disposiciones que llevan a estados ya vistos
+# (algo muy habitual en un lote) no se vuelven a calcular, y cada evaluación no
+# construye ningún árbol: solo consulta el diccionario del analizador o la tabla.
+class EvaluadorLotes:
+
+    def __init__(self, tablero: Tablero, analizador: Optional[AnalizadorEstados] = None):
+        self.tablero = tablero
+        if analizador is None:
+            analizador = AnalizadorEstados(tablero, abrir_tablabase(tablero))
+        self.analizador = analizador
+
+    # Evalúa una disposición (etiquetas, cadena de 0/1, lista o máscara)
+    def evaluar(self, disposicion) -> Resultado:
+        mascara = self.tablero.disposicion_a_mascara(disposicion)
+        evaluacion = self.analizador.evaluar(mascara)
+        fichas = contar_fichas(mascara)
+        return (mascara, fichas, evaluacion.resoluble, evaluacion.mejor_fichas,
+                fichas - evaluacion.mejor_fichas, evaluacion.soluciones)
+
+    # Evalúa una disposición sin parar el lote si no es válida: devuelve el mensaje de error
+    def evaluar_sin_fallar(self, disposicion) -> ResultadoLote:
+        try:
+            return self.evaluar(disposicion)
+        except ValueError as error:
+            return str(error)
+
+    # Evalúa un lote completo en este proceso
+    def evaluar_lote(self, disposiciones: Iterable) -> List[ResultadoLote]:
+        return [self.evaluar_sin_fallar(d) for d in disposiciones]
+
+
+# Evaluador propio de cada proceso del grupo (se crea una vez por proceso)
+_evaluador_proceso = None
+
+def _iniciar_proceso(nombre_tablero: str):
+    global _evaluador_proceso
+    _evaluador_proceso = EvaluadorLotes(cargar_tablero(nombre_tablero))
+
+def _evaluar_en_proceso(disposicion) -> ResultadoLote:
+    return _evaluador_proceso.evaluar_sin_fallar(disposicion)
+
+
+# Evalúa un lote repartiéndolo entre varios procesos (procesos=1 lo hace en este mismo).
+# Los resultados salen en el mismo orden que las disposiciones; las que no son válidas
+# dan su mensaje de error y no paran a las demás.
+def evaluar_en_paralelo(nombre_tablero: str, disposiciones: List, procesos: Optional[int] = None) -> List[ResultadoLote]:
+    if procesos == 1 or len(disposiciones) < TAM_TROZO:
+        return EvaluadorLotes(cargar_tablero(nombre_tablero)).evaluar_lote(disposiciones)
+    with multiprocessing.Pool(procesos, _iniciar_proceso, (nombre_tablero,)) as grupo:
+        return grupo.map(_evaluar_en_proceso, disposiciones, chunksize=TAM_TROZO)
+
+
+# Órdenes de línea de comandos:
+#   python evaluacion_lotes.py triangulo5 disposiciones.txt [--procesos 4]
+# El archivo tiene una disposición por línea ('a1 b2 c3' o cadena de 0/1); con '-' se lee
+# de la entrada estándar. Escribe una línea CSV por disposición y al final la velocidad;
+# las disposiciones no válidas se avisan en la salida de errores y se saltan.
+def main():
+    parser = argparse.ArgumentParser(description="Evaluación por lotes de disposiciones de Comesolo")
+    parser.add_argument("tablero", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("archivo", help="archivo con una disposición por línea ('-' = entrada estándar)")
+    parser.add_argument("--procesos", type=int, default=1, help="procesos a usar (por defecto 1)")
+    argumentos = parser.parse_args()
+
+    tablero = cargar_tablero(argumentos.tablero)
+    entrada = sys.stdin if argumentos.archivo == "-" else open(argumentos.archivo, encoding="utf-8")
+    with entrada:
+        disposiciones = [linea.strip() for linea in entrada if linea.strip() and not linea.startswith("#")]
+
+    inicio = time.perf_counter()
+    resultados = evaluar_en_paralelo(argumentos.tablero, disposiciones, argumentos.procesos)
+    duracion = time.perf_counter() - inicio
+
+    print("disposicion,fichas,resoluble,mejor_fichas,saltos,soluciones")
+    errores = 0
+    for disposicion, resultado in zip(disposiciones, resultados):
+        if isinstance(resultado, str):
+            errores += 1
+            print(f"# disposición no válida '{disposicion}': {resultado}", file=sys.stderr)
+            continue
+        mascara, fichas, resoluble, mejor, saltos, soluciones = resultado
+        etiquetas = " ".join(tablero.etiquetas[h] for h in range(1, tablero.num_huecos + 1) if mascara >> h & 1)
+        resoluble = "" if resoluble is None else ("si" if resoluble else "no")
+        print(f"{etiquetas},{fichas},{resoluble},{mejor},{saltos},{'' if soluciones is None else soluciones}")
+
+    velocidad = len(resultados) / duracion if duracion > 0 else float("inf")
+    print(f"# {len(resultados)} disposiciones en {duracion:.3f} s ({velocidad:,.0f} por segundo)"
+          + (f", {errores} no válidas" if errores else ""), file=sys.stderr)
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
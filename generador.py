@@ -0,0 +1,282 @@
+import argparse # Para las órdenes de línea de comandos
+import itertools # Para cortar la serie de puzzles en la cantidad pedida
+import random # Para elegir la ficha final y los saltos inversos
+import sys # Para escribir la velocidad en la salida de errores
+import time # Para medir cuántos puzzles se generan por segundo
+from typing import Iterator, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from analisis import LIMITE_HUECOS_EXACTO, AnalizadorEstados
+from busqueda_informada import nuevo_solucionador_informado
+from cache_soluciones import canonizar
+from solucionador import contar_fichas
+from tableros import Tablero, cargar_tablero
+from tablabase import abrir_tablabase
+
+# Niveles de dificultad según la probabilidad de ganar jugando al azar
+NIVELES = [(0.25, "facil"), (0.05, "media"), (0.0, "dificil")]
+
+# Niveles según la fracción de primeros saltos que ganan, para cuando la probabilidad es
+# demasiado cara de calcular. Es otra escala (no sigue a la probabilidad), así que lleva
+# sus propios nombres y umbrales: en el tablero inglés con 16 fichas casi todos los
+# primeros saltos ganan, y con los umbrales de NIVELES todo saldría fácil
+NIVELES_SALTOS = [(0.9, "facil_saltos"), (0.5, "media_saltos"), (0.0, "dificil_saltos")]
+
+# Nivel de un puzzle del que no se ha podido saber si ningún primer salto gana
+SIN_CALIFICAR = "sin_calificar"
+
+# Candidatos seguidos descartados (repetidos o de otro nivel) antes de dar por agotada la búsqueda
+MAX_DESCARTES = 100000
+
+# Estados nuevos como máximo al calcular la probabilidad exacta de un puzzle en un
+# tablero grande; si no bastan, se califica solo por los primeros saltos. En los
+# tableros pequeños no hay límite: el analizador poda los estados perdidos y, con unas
+# 8 fichas en el triángulo de 6 filas, se califican miles de puzzles por segundo; con
+# 12 o más cada puzzle nuevo abre decenas de miles de estados y se baja a unos cientos
+# o decenas por segundo (es el coste de la probabilidad exacta, no se puede evitar)
+LIMITE_ESTADOS_PUZZLE = 1000
+
+# Nodos como máximo de la búsqueda que decide si un primer salto gana (cuando no lo
+# saben ni el análisis ya hecho ni la tabla en disco); si no bastan, el salto queda sin
+# saber. Sin tabla en disco, en el tablero inglés con 16 fichas esto deja la calificación
+# en unos 7 puzzles por segundo (casi todos los primeros saltos hay que decidirlos para
+# llegar al umbral de facil_saltos).
+LIMITE_NODOS_VEREDICTO = 300
+
+
+# Un puzzle generado con sus datos de dificultad:
+#   ganadores / legales -> primeros saltos que siguen siendo resolubles / saltos posibles
+#   desconocidos        -> primeros saltos de los que no se ha podido saber si ganan
+#   soluciones          -> número de secuencias ganadoras (None si no se calcula)
+#   probabilidad        -> probabilidad de ganar eligiendo cada salto al azar (None si no se calcula)
+# Sin probabilidad, los saltos desconocidos pueden ser ganadores o no: el nivel solo se
+# da si sale el mismo en los dos casos, y si no el puzzle queda SIN_CALIFICAR (en vez
+# de contar los desconocidos como perdedores).
+class Puzzle:
+    def __init__(self, mascara: int, fichas: int, ganadores: int, legales: int,
+                 soluciones: Optional[int], probabilidad: Optional[float], desconocidos: int = 0):
+        self.mascara = mascara
+        self.fichas = fichas
+        self.ganadores = ganadores
+        self.legales = legales
+        self.desconocidos = desconocidos
+        self.soluciones = soluciones
+        self.probabilidad = probabilidad
+        conocidos = legales - desconocidos
+        self.proporcion = ganadores / conocidos if conocidos else (1.0 if not legales else None)
+        if probabilidad is not None:
+            self.nivel = nivel_de(probabilidad)
+        else:
+            self.nivel = nivel_por_saltos(ganadores, legales, desconocidos)
+
+
+# Nivel de dificultad que corresponde a una medida en una escala de niveles
+def nivel_de(medida: float, niveles: List[Tuple[float, str]] = NIVELES) -> str:
+    return next(nombre for minimo, nombre in niveles if medida >= minimo)
+
+
+# Nivel de NIVELES_SALTOS según los primeros saltos ganadores, o SIN_CALIFICAR si
+# depende de los desconocidos
+def nivel_por_saltos(ganadores: int, legales: int, desconocidos: int) -> str:
+    if not legales:
+        return nivel_de(1.0, NIVELES_SALTOS)
+    peor = nivel_de(ganadores / legales, NIVELES_SALTOS)
+    mejor = nivel_de((ganadores + desconocidos) / legales, NIVELES_SALTOS)
+    return peor if peor == mejor else SIN_CALIFICAR
+
+
+# Generador de puzzles resolubles por construcción. Parte de una sola ficha y aplica
+# saltos al revés (una ficha salta sobre un hueco vacío y deja una ficha nueva en él),
+# de modo que jugando esos saltos hacia delante siempre se vuelve a la ficha final:
+# ningún puzzle se descarta por no tener solución. La dificultad sale de un único
+# recorrido de los estados alcanzables que calcula a la vez la probabilidad de ganar y
+# el número de soluciones; los valores se guardan, así que tras los primeros puzzles
+# casi todo son consultas. Si ese recorrido es demasiado grande (tableros grandes con
+# muchas fichas), cada primer salto se decide con el analizador o la tabla en disco o,
+# si no lo saben, con una búsqueda informada limitada.
+class GeneradorPuzzles:
+
+    def __init__(self, tablero: Tablero, analizador: Optional[AnalizadorEstados] = None,
+                 semilla: Optional[int] = None):
+        self.tablero = tablero
+        if analizador is None:
+            analizador = AnalizadorEstados(tablero, abrir_tablabase(tablero))
+        self.analizador = analizador
+        self.aleatorio = random.Random(semilla)
+        self.valores = {}  # {estado: (probabilidad de ganar al azar, soluciones)}, compartido entre puzzles
+        self.veredictos = {}  # {estado: resoluble o None}, para cuando no hay valores exactos
+        self.huecos = list(range(1, tablero.num_huecos + 1))
+
+        # Saltos inversos agrupados por el hueco donde está la ficha que "vuelve":
+        # la ficha de 'hasta' regresa a 'desde' y deja otra ficha en 'sobre'
+        self.inversos = {h: [] for h in self.huecos}
+        for desde, sobre, hasta, requerida, cambio in tablero.saltos:
+            self.inversos[hasta].append(((1 << desde) | (1 << sobre), cambio))
+
+    # Aplica un salto inverso al azar; devuelve None si ninguno es posible
+    def salto_inverso(self, mascara: int) -> Optional[int]:
+        posibles = [mascara ^ cambio
+                    for h in self.huecos if mascara >> h & 1
+                    for vacios, cambio in self.inversos[h] if not mascara & vacios]
+        return self.aleatorio.choice(posibles) if posibles else None
+
+    # Genera la máscara de un puzzle resoluble con el número de fichas pedido
+    def generar_mascara(self, fichas: int) -> int:
+        if not 1 <= fichas < self.tablero.num_huecos:
+            raise ValueError(f"El número de fichas debe estar entre 1 y {self.tablero.num_huecos - 1}")
+        while True:
+            mascara = 1 << self.aleatorio.choice(self.huecos)
+            for _ in range(fichas - 1):
+                mascara = self.salto_inverso(mascara)
+                if mascara is None:
+                    break  # Camino sin salida: se empieza de nuevo desde otra ficha final
+            else:
+                return mascara
+
+    # (probabilidad de terminar con una ficha eligiendo siempre un salto legal al azar,
+    # número de secuencias ganadoras) de un estado. Los estados que se sabe que están
+    # perdidos valen (0, 0) sin bajar por ellos. Gasta como mucho 'presupuesto[0]' estados
+    # nuevos (None = sin límite); si se acaban devuelve None (lo ya calculado queda
+    # guardado y es correcto).
+    def valorar(self, mascara: int, presupuesto: List[Optional[int]]) -> Optional[Tuple[float, int]]:
+        valor = self.valores.get(mascara)
+        if valor is not None:
+            return valor
+        if contar_fichas(mascara) == 1:
+            valor = (1.0, 1)
+        elif self.perdido(mascara):
+            valor = (0.0, 0)
+        else:
+            if presupuesto[0] is not None:
+                if presupuesto[0] <= 0:
+                    return None
+                presupuesto[0] -= 1
+            probabilidad = 0.0
+            soluciones = legales = 0
+            for desde, sobre, hasta, requerida, cambio in self.tablero.saltos:
+                if mascara & requerida == requerida and not mascara >> hasta & 1:
+                    hijo = self.valorar(mascara ^ cambio, presupuesto)
+                    if hijo is None:
+                        return None
+                    probabilidad += hijo[0]
+                    soluciones += hijo[1]
+                    legales += 1
+            valor = (probabilidad / legales if legales else 0.0, soluciones)
+        self.valores[mascara] = valor
+        return valor
+
+    # Si un estado seguro que no se puede resolver: en los tableros pequeños lo dice el
+    # analizador (exacto) y en los grandes la tabla en disco o, si no hay, la paridad
+    def perdido(self, mascara: int) -> bool:
+        if self.tablero.num_huecos <= LIMITE_HUECOS_EXACTO:
+            return not self.analizador.evaluar(mascara).resoluble
+        if self.tablero.cota_fichas(mascara) > 1:
+            return True
+        return self.analizador.tablabase is not None and not self.analizador.tablabase.es_resoluble(mascara)
+
+    # Si desde un estado se puede terminar con una ficha (None = no se ha podido saber):
+    # análisis ya hecho o tabla en disco y, si no, una búsqueda informada limitada (sin
+    # lanzar el análisis completo, que con muchas fichas tarda segundos)
+    def veredicto(self, mascara: int) -> Optional[bool]:
+        if mascara in self.veredictos:
+            return self.veredictos[mascara]
+        resoluble = None
+        if self.analizador.conocido(mascara):
+            resoluble = self.analizador.evaluar(mascara).resoluble
+        elif self.analizador.tablabase is not None:
+            resoluble = self.analizador.tablabase.es_resoluble(mascara)
+        if resoluble is None:
+            solucionador = nuevo_solucionador_informado(self.tablero, mascara)
+            while not solucionador.avanzar(50):
+                if solucionador.nodos_expandidos >= LIMITE_NODOS_VEREDICTO:
+                    break
+            if solucionador.mejor_fichas <= 1:
+                resoluble = True
+            elif solucionador.sin_solucion():
+                resoluble = False
+        self.veredictos[mascara] = resoluble
+        return resoluble
+
+    # Calcula la dificultad de un puzzle: con los valores exactos (en los tableros grandes,
+    # si caben en LIMITE_ESTADOS_PUZZLE estados) y, si no, con el veredicto de cada primer salto
+    def calificar(self, mascara: int) -> Puzzle:
+        hijos = [mascara ^ cambio for desde, sobre, hasta, requerida, cambio in self.tablero.saltos
+                 if mascara & requerida == requerida and not mascara >> hasta & 1]
+        limite = None if self.tablero.num_huecos <= LIMITE_HUECOS_EXACTO else LIMITE_ESTADOS_PUZZLE
+        valor = self.valorar(mascara, [limite])
+        if valor is not None:
+            ganadores = sum(1 for hijo in hijos if self.valores[hijo][1] > 0)
+            return Puzzle(mascara, contar_fichas(mascara), ganadores, len(hijos), valor[1], valor[0])
+
+        # Se decide salto a salto y se para en cuanto el resto ya no puede cambiar el nivel
+        ganadores = 0
+        desconocidos = len(hijos)
+        for hijo in hijos:
+            if nivel_por_saltos(ganadores, len(hijos), desconocidos) != SIN_CALIFICAR:
+                break
+            resoluble = self.veredicto(hijo)
+            if resoluble is not None:
+                desconocidos -= 1
+                ganadores += resoluble
+        return Puzzle(mascara, contar_fichas(mascara), ganadores, len(hijos), None, None, desconocidos)
+
+    # Genera puzzles mientras haya; con unicos=True no repite ninguno (ni girado ni
+    # reflejado) y con nivel solo devuelve los de esa dificultad. Termina si tras
+    # MAX_DESCARTES candidatos seguidos no aparece ninguno nuevo del nivel pedido.
+    def generar(self, fichas: int, nivel: Optional[str] = None, unicos: bool = False) -> Iterator[Puzzle]:
+        vistos = set()
+        descartes = 0
+        while descartes < MAX_DESCARTES:
+            mascara = self.generar_mascara(fichas)
+            descartes += 1
+            if unicos:
+                canonica = canonizar(mascara, self.tablero.simetrias)[0]
+                if canonica in vistos:
+                    continue
+                vistos.add(canonica)
+            puzzle = self.calificar(mascara)
+            if nivel is None or puzzle.nivel == nivel:
+                descartes = 0
+                yield puzzle
+
+    # Devuelve una lista con la cantidad de puzzles pedida (menos si no hay tantos)
+    def generar_lote(self, cantidad: int, fichas: int, nivel: Optional[str] = None,
+                     unicos: bool = False) -> List[Puzzle]:
+        return list(itertools.islice(self.generar(fichas, nivel, unicos), cantidad))
+
+
+# Órdenes de línea de comandos:
+#   python generador.py triangulo5 --cantidad 1000 --fichas 8 [--nivel dificil] [--semilla 1] [--unicos]
+# Escribe una línea CSV por puzzle (fichas, saltos ganadores, soluciones y nivel)
+def main():
+    parser = argparse.ArgumentParser(description="Generador de puzzles de Comesolo")
+    parser.add_argument("tablero", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("--cantidad", type=int, default=10, help="puzzles a generar")
+    parser.add_argument("--fichas", type=int, default=8, help="fichas de cada puzzle")
+    parser.add_argument("--nivel", choices=[nombre for minimo, nombre in NIVELES + NIVELES_SALTOS],
+                        help="solo puzzles de este nivel")
+    parser.add_argument("--semilla", type=int, help="semilla para repetir la misma serie")
+    parser.add_argument("--unicos", action="store_true", help="no repetir puzzles equivalentes por simetría")
+    argumentos = parser.parse_args()
+
+    tablero = cargar_tablero(argumentos.tablero)
+    generador = GeneradorPuzzles(tablero, semilla=argumentos.semilla)
+
+    inicio = time.perf_counter()
+    puzzles = generador.generar_lote(argumentos.cantidad, argumentos.fichas, argumentos.nivel, argumentos.unicos)
+    duracion = time.perf_counter() - inicio
+
+    print("disposicion,fichas,ganadores,legales,desconocidos,soluciones,probabilidad,nivel")
+    for puzzle in puzzles:
+        etiquetas = " ".join(tablero.etiquetas[h] for h in generador.huecos if puzzle.mascara >> h & 1)
+        soluciones = "" if puzzle.soluciones is None else puzzle.soluciones
+        probabilidad = "" if puzzle.probabilidad is None else f"{puzzle.probabilidad:.4f}"
+        print(f"{etiquetas},{puzzle.fichas},{puzzle.ganadores},{puzzle.legales},{puzzle.desconocidos},"
+              f"{soluciones},{probabilidad},{puzzle.nivel}")
+
+    velocidad = len(puzzles) / duracion if duracion > 0 else float("inf")
+    print(f"# {len(puzzles)} puzzles en {duracion:.3f} s ({velocidad:,.0f} por segundo)", file=sys.stderr)
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
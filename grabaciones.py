@@ -0,0 +1,247 @@
+import argparse # Para las órdenes de línea de comandos
+import os # Para la carpeta y el tamaño de los archivos
+import struct # Para la cabecera del archivo
+import time # Para medir la velocidad del análisis
+from collections import Counter # Para contar los errores más frecuentes
+from typing import Iterator, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from analisis import AnalizadorEstados
+from tableros import Tablero, cargar_tablero
+from tablabase import abrir_tablabase
+
+# Formato del archivo (solo se añade al final, nunca se reescribe):
+#   cabecera de 40 bytes: firma, versión, huecos, saltos e identificador del tablero
+#   cada partida: byte MARCA_PARTIDA, la disposición inicial en grupos de 7 bits
+#   (ceil(huecos / 7) bytes) y un byte por salto: el índice del salto en
+#   tablero.saltos, con el bit alto a 1 si lo hizo el solucionador, o MARCA_DESHACER
+#   si el jugador deshizo el último salto (rehacer se graba como un salto normal).
+# Ningún byte de una partida vale MARCA_PARTIDA, así que las partidas se separan con
+# un simple split() y un archivo cortado a medias solo pierde el último salto.
+FIRMA = b"CSGR"
+VERSION_FORMATO = 1
+FORMATO_CABECERA = "<4sHBB32s"
+TAM_CABECERA = struct.calcsize(FORMATO_CABECERA)
+MARCA_PARTIDA = 0xFF
+MARCA_DESHACER = 0xFE
+BIT_SOLUCIONADOR = 0x80
+MAX_SALTOS = 0x7E  # Índices 0..125; 0xFE es MARCA_DESHACER
+
+# Carpeta por defecto (se puede cambiar con la variable de entorno COMESOLO_PARTIDAS)
+CARPETA_POR_DEFECTO = os.environ.get(
+    "COMESOLO_PARTIDAS", os.path.join(os.path.expanduser("~"), ".comesolo_partidas"))
+
+
+# Ruta por defecto de las partidas de un tablero
+def ruta_por_defecto(tablero: Tablero) -> str:
+    return os.path.join(CARPETA_POR_DEFECTO, tablero.identificador + ".csgr")
+
+# Codifica una máscara en bytes de 7 bits (ninguno puede valer MARCA_PARTIDA)
+def codificar_mascara(mascara: int, num_huecos: int) -> bytes:
+    indice = mascara >> 1
+    return bytes((indice >> (7 * k)) & 0x7F for k in range((num_huecos + 6) // 7))
+
+# Decodifica los bytes de 7 bits de vuelta a máscara
+def decodificar_mascara(datos: bytes) -> int:
+    indice = 0
+    for k, byte in enumerate(datos):
+        indice |= byte << (7 * k)
+    return indice << 1
+
+
+# Lee la cabecera de un archivo abierto y comprueba que sea del tablero indicado
+def _leer_cabecera(datos: bytes, ruta: str, tablero: Optional[Tablero]) -> Tuple[int, int, str]:
+    if len(datos) < TAM_CABECERA:
+        raise ValueError(f"'{ruta}' no es un archivo de partidas")
+    firma, version, huecos, saltos, identificador = struct.unpack_from(FORMATO_CABECERA, datos)
+    if firma != FIRMA or version != VERSION_FORMATO:
+        raise ValueError(f"'{ruta}' no es un archivo de partidas de la versión {VERSION_FORMATO}")
+    identificador = identificador.rstrip(b"\0").decode()
+    if tablero is not None and (identificador != tablero.identificador or saltos != len(tablero.saltos)):
+        raise ValueError(f"Las partidas son del tablero '{identificador}', no de '{tablero.identificador}'")
+    return huecos, saltos, identificador
+
+
+# Grabador de partidas: abre el archivo en modo añadir y escribe cada salto en cuanto
+# se hace (un byte), de modo que un cierre inesperado no pierde la partida en curso
+class GrabadorPartidas:
+
+    def __init__(self, tablero: Tablero, ruta: str):
+        if len(tablero.saltos) > MAX_SALTOS:
+            raise ValueError(f"El tablero tiene demasiados saltos para grabarlo ({len(tablero.saltos)})")
+        self.tablero = tablero
+        self.ruta = ruta
+        self.indices = {(desde, hasta): i for i, (desde, sobre, hasta, requerida, cambio) in enumerate(tablero.saltos)}
+
+        carpeta = os.path.dirname(ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self.archivo = open(ruta, "ab")
+        if self.archivo.tell() == 0:
+            self.archivo.write(struct.pack(FORMATO_CABECERA, FIRMA, VERSION_FORMATO, tablero.num_huecos,
+                                           len(tablero.saltos), tablero.identificador.encode()[:32]))
+        else:
+            with open(ruta, "rb") as existente:
+                _leer_cabecera(existente.read(TAM_CABECERA), ruta, tablero)
+        self.archivo.flush()
+
+    # Empieza una partida nueva desde una disposición (máscara de bits)
+    def nueva_partida(self, mascara: int):
+        self.archivo.write(bytes([MARCA_PARTIDA]) + codificar_mascara(mascara, self.tablero.num_huecos))
+        self.archivo.flush()
+
+    # Anota un salto de la partida en curso (solucionador=True si no lo hizo el jugador)
+    def movimiento(self, desde: int, hasta: int, solucionador: bool = False):
+        indice = self.indices[(desde, hasta)]
+        self.archivo.write(bytes([indice | BIT_SOLUCIONADOR if solucionador else indice]))
+        self.archivo.flush()
+
+    # Anota que se deshizo el último salto de la partida en curso
+    def deshacer(self):
+        self.archivo.write(bytes([MARCA_DESHACER]))
+        self.archivo.flush()
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+# Grabadores abiertos en este proceso, uno por tablero
+_grabadores = {}
+
+# Devuelve el grabador del proceso para un tablero, o None si no se puede grabar
+# (carpeta sin permisos, archivo de otro tablero...): jugar nunca falla por esto
+def obtener_grabador(tablero: Tablero) -> Optional[GrabadorPartidas]:
+    if tablero.identificador not in _grabadores:
+        try:
+            _grabadores[tablero.identificador] = GrabadorPartidas(tablero, ruta_por_defecto(tablero))
+        except (OSError, ValueError):
+            return None
+    return _grabadores[tablero.identificador]
+
+
+# Lee todas las partidas de un archivo: (máscara inicial, bytes de los saltos)
+def leer_partidas(ruta: str, tablero: Optional[Tablero] = None) -> Iterator[Tuple[int, bytes]]:
+    with open(ruta, "rb") as archivo:
+        datos = archivo.read()
+    huecos, saltos, identificador = _leer_cabecera(datos, ruta, tablero)
+    tam_mascara = (huecos + 6) // 7
+    for partida in datos[TAM_CABECERA:].split(bytes([MARCA_PARTIDA])):
+        if len(partida) >= tam_mascara:
+            yield decodificar_mascara(partida[:tam_mascara]), partida[tam_mascara:]
+
+
+# Estadísticas de un conjunto de partidas
+class Estadisticas:
+    def __init__(self):
+        self.partidas = 0
+        self.saltos_jugador = 0
+        self.saltos_solucionador = 0
+        self.deshechos = 0
+        self.ganadas = 0
+        self.fichas_finales = Counter()  # {fichas al terminar: partidas}
+        self.errores_por_salto = Counter()  # {(desde, sobre, hasta): veces que se perdió la solución}
+        self.errores_por_fichas = Counter()  # {fichas antes del salto: veces}
+        self.partidas_con_error = 0
+        self.segundos = 0.0
+
+
+# Repite todas las partidas con los saltos compilados y, con un veredicto por estado
+# (resoluble o no), localiza los saltos del jugador que pasan de una posición resoluble
+# a una que ya no lo es. El veredicto se toma de la tabla en disco si existe y, si no,
+# del analizador de estados; los resultados se guardan en un diccionario, así que cada
+# estado distinto se consulta una sola vez aunque aparezca en millones de partidas.
+def analizar_partidas(tablero: Tablero, rutas: List[str], veredicto=None) -> Estadisticas:
+    if veredicto is None:
+        tabla = abrir_tablabase(tablero)
+        if tabla is not None:
+            veredicto = tabla.es_resoluble
+        else:
+            analizador = AnalizadorEstados(tablero)
+            veredicto = lambda mascara: bool(analizador.evaluar(mascara).resoluble)
+
+    saltos = [(desde, sobre, hasta, cambio) for desde, sobre, hasta, requerida, cambio in tablero.saltos]
+    conocidos = {}
+    estadisticas = Estadisticas()
+    inicio = time.perf_counter()
+
+    for ruta in rutas:
+        for mascara, movimientos in leer_partidas(ruta, tablero):
+            estadisticas.partidas += 1
+            resoluble = conocidos.get(mascara)
+            if resoluble is None:
+                resoluble = conocidos[mascara] = veredicto(mascara)
+            fichas = bin(mascara).count("1")
+            con_error = False
+            anteriores = []  # (máscara, resoluble) antes de cada salto, para deshacer
+
+            for byte in movimientos:
+                if byte == MARCA_DESHACER:
+                    if anteriores:
+                        mascara, resoluble = anteriores.pop()
+                        fichas += 1
+                        estadisticas.deshechos += 1
+                    continue
+                anteriores.append((mascara, resoluble))
+                desde, sobre, hasta, cambio = saltos[byte & 0x7F]
+                mascara ^= cambio
+                if byte & BIT_SOLUCIONADOR:
+                    estadisticas.saltos_solucionador += 1
+                    resoluble = None  # Se vuelve a consultar solo si hace falta
+                else:
+                    estadisticas.saltos_jugador += 1
+                    if resoluble is None:
+                        antes = mascara ^ cambio
+                        resoluble = conocidos.get(antes)
+                        if resoluble is None:
+                            resoluble = conocidos[antes] = veredicto(antes)
+                    if resoluble:
+                        resoluble = conocidos.get(mascara)
+                        if resoluble is None:
+                            resoluble = conocidos[mascara] = veredicto(mascara)
+                        if not resoluble:
+                            estadisticas.errores_por_salto[(desde, sobre, hasta)] += 1
+                            estadisticas.errores_por_fichas[fichas] += 1
+                            con_error = True
+                    # Si ya no era resoluble, ningún salto lo vuelve a ser
+                fichas -= 1
+
+            estadisticas.fichas_finales[fichas] += 1
+            estadisticas.ganadas += fichas == 1
+            estadisticas.partidas_con_error += con_error
+
+    estadisticas.segundos = time.perf_counter() - inicio
+    return estadisticas
+
+
+# Órdenes de línea de comandos:
+#   python grabaciones.py triangulo5 [archivo.csgr ...] [--top 10]
+# Sin archivos analiza las partidas grabadas por defecto de ese tablero
+def main():
+    parser = argparse.ArgumentParser(description="Análisis de partidas grabadas de Comesolo")
+    parser.add_argument("tablero", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("archivos", nargs="*", help="archivos de partidas (por defecto, los del tablero)")
+    parser.add_argument("--top", type=int, default=10, help="saltos con más errores a mostrar")
+    argumentos = parser.parse_args()
+
+    tablero = cargar_tablero(argumentos.tablero)
+    rutas = argumentos.archivos or [ruta_por_defecto(tablero)]
+    estadisticas = analizar_partidas(tablero, rutas)
+
+    e = estadisticas
+    velocidad = e.partidas / e.segundos * 60 if e.segundos > 0 else 0
+    print(f"{e.partidas:,} partidas ({e.saltos_jugador:,} saltos del jugador, {e.saltos_solucionador:,} del solucionador, "
+          f"{e.deshechos:,} deshechos) "
+          f"analizadas en {e.segundos:.2f} s ({velocidad:,.0f} por minuto)")
+    if not e.partidas:
+        return
+    print(f"Ganadas: {e.ganadas:,} ({e.ganadas / e.partidas:.1%})")
+    print(f"Partidas en las que se perdió la solución: {e.partidas_con_error:,} ({e.partidas_con_error / e.partidas:.1%})")
+    print("Fichas al terminar: " + ", ".join(f"{f}: {n:,}" for f, n in sorted(e.fichas_finales.items())))
+    print("Errores según las fichas en el tablero: " + ", ".join(f"{f}: {n:,}" for f, n in sorted(e.errores_por_fichas.items(), reverse=True)))
+    print(f"Saltos que más veces pierden la solución:")
+    for (desde, sobre, hasta), veces in e.errores_por_salto.most_common(argumentos.top):
+        print(f"   {tablero.etiquetas[desde]} → {tablero.etiquetas[hasta]} (sobre {tablero.etiquetas[sobre]}): {veces:,}")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
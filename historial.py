@@ -0,0 +1,67 @@
+from typing import List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+Movimiento = Tuple[int, int, int]
+
+
+# Una posición de la partida: el estado como máscara de bits, el salto que llevó a ella
+# y lo ya calculado sobre ella (para no volver a buscar al deshacer o rehacer):
+#   resoluble     -> si se puede terminar con una ficha (None = no se sabe todavía)
+#   mejor_fichas  -> menor número de fichas alcanzable (None = no se sabe)
+#   pistas        -> saltos legales ya puntuados por el motor de pistas (None = sin calcular)
+class EntradaHistorial:
+    __slots__ = ("mascara", "salto", "resoluble", "mejor_fichas", "pistas")
+
+    def __init__(self, mascara: int, salto: Optional[Movimiento] = None):
+        self.mascara = mascara
+        self.salto = salto
+        self.resoluble = None
+        self.mejor_fichas = None
+        self.pistas = None
+
+
+# Historial de una partida para deshacer y rehacer. Es una lista de posiciones y un
+# índice a la actual: deshacer y rehacer solo mueven el índice, y un salto nuevo después
+# de deshacer descarta las posiciones que se podían rehacer. Cada posición guarda sus
+# datos calculados, así que moverse por el historial nunca repite una búsqueda.
+class HistorialPartida:
+
+    def __init__(self):
+        self.entradas: List[EntradaHistorial] = []
+        self.indice = -1
+
+    # Empieza una partida nueva desde una máscara
+    def iniciar(self, mascara: int) -> EntradaHistorial:
+        self.entradas = [EntradaHistorial(mascara)]
+        self.indice = 0
+        return self.entradas[0]
+
+    # Posición actual (None si no hay partida)
+    def actual(self) -> Optional[EntradaHistorial]:
+        return self.entradas[self.indice] if self.indice >= 0 else None
+
+    # Añade la posición a la que lleva un salto y la convierte en la actual
+    def avanzar(self, mascara: int, salto: Movimiento) -> EntradaHistorial:
+        del self.entradas[self.indice + 1:]
+        self.entradas.append(EntradaHistorial(mascara, salto))
+        self.indice += 1
+        return self.entradas[self.indice]
+
+    def puede_deshacer(self) -> bool:
+        return self.indice > 0
+
+    def puede_rehacer(self) -> bool:
+        return self.indice + 1 < len(self.entradas)
+
+    # Vuelve a la posición anterior; devuelve la entrada que se ha deshecho (con su salto)
+    def deshacer(self) -> Optional[EntradaHistorial]:
+        if not self.puede_deshacer():
+            return None
+        self.indice -= 1
+        return self.entradas[self.indice + 1]
+
+    # Vuelve a hacer el siguiente salto deshecho; devuelve la nueva posición actual
+    def rehacer(self) -> Optional[EntradaHistorial]:
+        if not self.puede_rehacer():
+            return None
+        self.indice += 1
+        return self.entradas[self.indice]
@@ -0,0 +1,205 @@
+import argparse # Para las órdenes de línea de comandos
+import time # Para limitar el tiempo que el solucionador trabaja en cada llamada
+from typing import Dict, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from solucionador import Salto, contar_fichas, salto_entre
+from tableros import Tablero, cargar_tablero
+
+Movimiento = Tuple[int, int, int]
+
+
+# Saltos agrupados por el hueco de origen: {desde: [(mascara_requerida, mascara_cambio, hasta)]}
+def saltos_por_origen(saltos: List[Salto], num_huecos: int) -> Dict[int, List[Tuple[int, int, int]]]:
+    por_origen = {h: [] for h in range(1, num_huecos + 1)}
+    for desde, sobre, hasta, requerida, cambio in saltos:
+        por_origen[desde].append((requerida, cambio, hasta))
+    return por_origen
+
+# Todos los movimientos de un estado en la variante de "menos movimientos": un movimiento
+# es una cadena de uno o más saltos seguidos de la misma ficha. Devuelve
+# {estado resultante: estados intermedios de una cadena que lleva a él (el último es el resultante)}.
+# Cada (hueco de la ficha, estado) se explora una sola vez: dos cadenas que llegan a la
+# misma situación por distinto orden siguen igual, así que la segunda no se repite.
+def movimientos_en_cadena(mascara: int, por_origen: Dict[int, List[Tuple[int, int, int]]]) -> Dict[int, Tuple[int, ...]]:
+    resultados = {}
+    vistos = set()
+    resto = mascara
+    while resto:
+        bit = resto & -resto
+        resto ^= bit
+        pila = [(bit.bit_length() - 1, mascara, ())]
+        while pila:
+            hueco, actual, cadena = pila.pop()
+            for requerida, cambio, hasta in por_origen[hueco]:
+                if actual & requerida == requerida and not actual >> hasta & 1:
+                    siguiente = actual ^ cambio
+                    if (hasta, siguiente) in vistos:
+                        continue
+                    vistos.add((hasta, siguiente))
+                    cadena_siguiente = cadena + (siguiente,)
+                    resultados.setdefault(siguiente, cadena_siguiente)
+                    pila.append((hasta, siguiente, cadena_siguiente))
+    return resultados
+
+# Agrupa los saltos de un camino (lista de máscaras) en movimientos: saltos seguidos
+# de la misma ficha (cada uno sale de donde llegó el anterior) cuentan como uno solo
+def agrupar_movimientos(camino: List[int], saltos: List[Salto]) -> List[List[Movimiento]]:
+    movimientos = []
+    for antes, despues in zip(camino, camino[1:]):
+        salto = salto_entre(antes, despues, saltos)
+        if movimientos and movimientos[-1][-1][2] == salto[0]:
+            movimientos[-1].append(salto)
+        else:
+            movimientos.append([salto])
+    return movimientos
+
+
+# Solucionador de la variante de menos movimientos, que se puede pausar y reanudar.
+# Busca por niveles como SolucionadorIncremental, pero cada nivel es un movimiento
+# (una cadena de saltos de la misma ficha) en lugar de un salto, así que el primer
+# estado objetivo que aparece se alcanza con el menor número de movimientos posible.
+# Un estado puede aparecer a distintas profundidades (las cadenas quitan varias fichas
+# de una vez), y el diccionario de padres hace de tabla de transposición: cada estado
+# se expande una sola vez, a la menor profundidad.
+class SolucionadorMovimientos:
+
+    def __init__(self, estado_inicial: int, saltos: List[Salto], num_huecos: int, objetivo_fichas: int = 1):
+        self.estado_inicial = estado_inicial
+        self.saltos = saltos
+        self.objetivo_fichas = objetivo_fichas
+        self.por_origen = saltos_por_origen(saltos, num_huecos)
+
+        # Estructuras de la búsqueda
+        self.padres = {estado_inicial: None}  # {estado: estado un movimiento antes}
+        self.nivel_actual = [estado_inicial]
+        self.siguiente_nivel = []
+        self.indice = 0
+
+        # Estadísticas y resultado
+        self.fichas_iniciales = contar_fichas(estado_inicial)
+        self.movimientos_completados = 0  # Niveles terminados (movimientos desde el inicio)
+        self.nodos_expandidos = 0
+        self.mejor_fichas = self.fichas_iniciales
+        self.mejor_estado = estado_inicial
+        self.estado_objetivo = None
+        self.terminado = self.fichas_iniciales <= objetivo_fichas
+        self.cancelado = False
+        if self.terminado:
+            self.estado_objetivo = estado_inicial
+
+    # Trabaja como máximo presupuesto_ms milisegundos (None = hasta terminar)
+    # Devuelve True cuando la búsqueda ha terminado (con o sin éxito)
+    def avanzar(self, presupuesto_ms: Optional[float] = None) -> bool:
+        if self.terminado:
+            return True
+
+        limite = None if presupuesto_ms is None else time.perf_counter() + presupuesto_ms / 1000
+        padres = self.padres
+        por_origen = self.por_origen
+
+        while True:
+            # Si se agotó el nivel actual, pasa al siguiente movimiento
+            if self.indice >= len(self.nivel_actual):
+                if not self.siguiente_nivel:
+                    self.terminado = True
+                    return True
+                self.nivel_actual = self.siguiente_nivel
+                self.siguiente_nivel = []
+                self.indice = 0
+                self.movimientos_completados += 1
+
+            estado = self.nivel_actual[self.indice]
+            self.indice += 1
+            self.nodos_expandidos += 1
+
+            for hijo in movimientos_en_cadena(estado, por_origen):
+                if hijo in padres:
+                    continue
+                padres[hijo] = estado
+                fichas = contar_fichas(hijo)
+                if fichas < self.mejor_fichas:
+                    self.mejor_fichas = fichas
+                    self.mejor_estado = hijo
+                if fichas <= self.objetivo_fichas:
+                    self.estado_objetivo = hijo
+                    self.terminado = True
+                    return True
+                self.siguiente_nivel.append(hijo)
+
+            # Cada expansión puede generar muchas cadenas, así que el reloj se consulta
+            # después de cada una para no pasarse del presupuesto
+            if limite is not None and time.perf_counter() >= limite:
+                return False
+
+    # Fracción de la búsqueda completada (0.0 - 1.0), según las fichas ya quitadas
+    def progreso(self) -> float:
+        if self.terminado:
+            return 1.0
+        return (self.fichas_iniciales - self.mejor_fichas) / max(1, self.fichas_iniciales - self.objetivo_fichas)
+
+    # Detiene la búsqueda; las siguientes llamadas a avanzar no hacen nada
+    def cancelar(self):
+        self.cancelado = True
+        self.terminado = True
+        self.nivel_actual = []
+        self.siguiente_nivel = []
+
+    # Reconstruye el camino salto a salto hasta un estado: sigue los padres (un movimiento
+    # cada uno) y vuelve a generar la cadena de saltos de cada movimiento
+    def camino_hasta(self, estado: int) -> List[int]:
+        movimientos = []
+        while self.padres[estado] is not None:
+            movimientos.append((self.padres[estado], estado))
+            estado = self.padres[estado]
+        camino = [estado]
+        for antes, despues in reversed(movimientos):
+            camino.extend(movimientos_en_cadena(antes, self.por_origen)[despues])
+        return camino
+
+    # Devuelve la solución (lista de máscaras desde el inicio, una por salto) o lista vacía
+    def solucion(self) -> List[int]:
+        if self.cancelado or self.estado_objetivo is None:
+            return []
+        return self.camino_hasta(self.estado_objetivo)
+
+    # Devuelve el mejor camino encontrado (el que deja menos fichas)
+    def mejor_camino(self) -> List[int]:
+        if self.cancelado:
+            return []
+        return self.camino_hasta(self.mejor_estado)
+
+
+# Crea el solucionador de menos movimientos de una posición de un tablero, con la cota
+# de paridad del tablero como objetivo (igual que Tablero.nuevo_solucionador)
+def nuevo_solucionador_movimientos(tablero: Tablero, mascara: int) -> SolucionadorMovimientos:
+    return SolucionadorMovimientos(mascara, tablero.saltos, tablero.num_huecos, tablero.cota_fichas(mascara))
+
+
+# Órdenes de línea de comandos:
+#   python movimientos_minimos.py triangulo5 [a1 c3 ...]
+# Resuelve cada posición inicial vacía (todas si no se indica ninguna) con el menor
+# número de movimientos y muestra la solución agrupada en cadenas de saltos
+def main():
+    parser = argparse.ArgumentParser(description="Soluciones de Comesolo con el menor número de movimientos")
+    parser.add_argument("tablero", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("inicios", nargs="*", help="posiciones vacías iniciales (por defecto, todas)")
+    argumentos = parser.parse_args()
+
+    tablero = cargar_tablero(argumentos.tablero)
+    etiquetas = tablero.etiquetas
+    for etiqueta in argumentos.inicios or [etiquetas[h] for h in range(1, tablero.num_huecos + 1)]:
+        mascara = tablero.mascara_llena() & ~(1 << tablero.numeros[etiqueta])
+        inicio = time.perf_counter()
+        solucionador = nuevo_solucionador_movimientos(tablero, mascara)
+        solucionador.avanzar()
+        camino = solucionador.mejor_camino()
+        movimientos = agrupar_movimientos(camino, tablero.saltos)
+        print(f"{etiqueta:>4}: {contar_fichas(camino[-1])} ficha(s) en {len(movimientos)} movimientos "
+              f"({len(camino) - 1} saltos, {solucionador.nodos_expandidos:,} nodos, {time.perf_counter() - inicio:.2f} s)")
+        print("      " + "  ".join("→".join([etiquetas[cadena[0][0]]] + [etiquetas[h] for d, s, h in cadena])
+                                  for cadena in movimientos))
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse # Para las órdenes de línea de comandos
+import random # Para el orden de desempate reproducible
+import time # Para medir cada búsqueda
+from typing import List, Optional # Para decir qué tipo de datos usan las funciones
+
+from solucionador import SolucionadorProfundidad, hijos
+from tableros import Tablero, cargar_tablero
+
+
+# Orden en que la búsqueda en profundidad prueba los saltos de cada estado. En los
+# tableros grandes el orden decide si la primera rama ya lleva a una ficha o si hay que
+# recorrer millones de estados sin salida. Cada política recibe el tablero y una semilla:
+# con semilla, los saltos empatados se desempatan con un orden al azar fijo, así que la
+# misma semilla da siempre la misma búsqueda (y varias semillas miden la variación).
+# Esta es la política base: el orden en que están definidos los saltos.
+class OrdenMovimientos:
+    nombre = "natural"
+
+    def __init__(self, tablero: Tablero, semilla: Optional[int] = None):
+        self.tablero = tablero
+        self.saltos = list(tablero.saltos)
+        if semilla is not None:
+            random.Random(semilla).shuffle(self.saltos)
+
+    # Hijos de un estado en el orden en que se deben probar (profundidad = saltos desde el inicio)
+    def hijos(self, estado: int, profundidad: int) -> List[int]:
+        return hijos(estado, self.saltos)
+
+    # La búsqueda llama a esto con el camino (lista de estados) cada vez que iguala o
+    # mejora el menor número de fichas alcanzado; las políticas que aprenden lo usan
+    def premiar(self, camino: List[int]):
+        pass
+
+
+# Mantiene las fichas en el centro: primero los saltos que más acercan al centro las
+# fichas que quedan (la ficha llega a 'hasta' y se quitan las de 'desde' y 'sobre').
+# Como la puntuación de cada salto no depende del estado, los saltos se ordenan una vez.
+class OrdenCentro(OrdenMovimientos):
+    nombre = "centro"
+
+    def __init__(self, tablero, semilla=None):
+        super().__init__(tablero, semilla)
+        xs = [x for x, y in tablero.coordenadas.values()]
+        ys = [y for x, y in tablero.coordenadas.values()]
+        cx, cy = sum(xs) / len(xs), sum(ys) / len(ys)
+        self.distancia = {n: (x - cx) ** 2 + (y - cy) ** 2 for n, (x, y) in tablero.coordenadas.items()}
+        distancia = self.distancia
+        self.saltos.sort(key=lambda salto: distancia[salto[2]] - distancia[salto[0]] - distancia[salto[1]])
+
+
+# Evita dejar fichas aisladas (sin ninguna ficha vecina no se pueden comer ni saltar
+# nunca más): primero los saltos que dejan menos fichas aisladas y, a igualdad, el
+# orden de OrdenCentro
+class OrdenAislados(OrdenCentro):
+    nombre = "aislados"
+
+    def __init__(self, tablero, semilla=None):
+        super().__init__(tablero, semilla)
+        # Vecinos de cada hueco: las fichas sobre las que puede saltar
+        self.vecinos = [0] * (tablero.num_huecos + 1)
+        for desde, sobre, hasta, requerida, cambio in tablero.saltos:
+            self.vecinos[desde] |= 1 << sobre
+
+    # Fichas de una máscara sin ninguna ficha vecina
+    def aisladas(self, mascara: int) -> int:
+        vecinos = self.vecinos
+        cuenta, resto = 0, mascara
+        while resto:
+            bit = resto & -resto
+            if not mascara & vecinos[bit.bit_length() - 1]:
+                cuenta += 1
+            resto ^= bit
+        return cuenta
+
+    def hijos(self, estado, profundidad):
+        candidatos = []
+        for orden, (desde, sobre, hasta, requerida, cambio) in enumerate(self.saltos):
+            if estado & requerida == requerida and not estado >> hasta & 1:
+                hijo = estado ^ cambio
+                candidatos.append((self.aisladas(hijo), orden, hijo))
+        candidatos.sort()
+        return [hijo for aisladas, orden, hijo in candidatos]
+
+
+# Aprende de la propia búsqueda (heurísticas de historia y de "killer"): cada salto
+# del camino que iguala o mejora el mejor resultado suma puntos en una tabla por salto,
+# y el último salto así premiado en cada profundidad se prueba el primero en ella.
+# El resto se ordena por puntos y, a igualdad, según el orden de OrdenCentro.
+class OrdenHistoria(OrdenCentro):
+    nombre = "historia"
+
+    def __init__(self, tablero, semilla=None):
+        super().__init__(tablero, semilla)
+        self.historia = {cambio: 0 for desde, sobre, hasta, requerida, cambio in tablero.saltos}
+        self.asesinos = {}  # {profundidad: cambio del último salto premiado}
+
+    def hijos(self, estado, profundidad):
+        historia = self.historia
+        asesino = self.asesinos.get(profundidad)
+        candidatos = []
+        for orden, (desde, sobre, hasta, requerida, cambio) in enumerate(self.saltos):
+            if estado & requerida == requerida and not estado >> hasta & 1:
+                candidatos.append((cambio != asesino, -historia[cambio], orden, estado ^ cambio))
+        candidatos.sort()
+        return [hijo for no_asesino, puntos, orden, hijo in candidatos]
+
+    def premiar(self, camino):
+        for profundidad in range(len(camino) - 1):
+            cambio = camino[profundidad] ^ camino[profundidad + 1]
+            self.historia[cambio] += len(camino) - 1 - profundidad  # Más puntos cuanto más larga la rama
+            self.asesinos[profundidad] = cambio
+
+
+# Políticas disponibles, por nombre
+ORDENACIONES = {clase.nombre: clase for clase in (OrdenMovimientos, OrdenCentro, OrdenAislados, OrdenHistoria)}
+
+# Crea una política de ordenación por su nombre
+def crear_ordenacion(nombre: str, tablero: Tablero, semilla: Optional[int] = None) -> OrdenMovimientos:
+    if nombre not in ORDENACIONES:
+        raise ValueError(f"Ordenación '{nombre}' desconocida. Disponibles: {', '.join(ORDENACIONES)}")
+    return ORDENACIONES[nombre](tablero, semilla)
+
+
+# Órdenes de línea de comandos:
+#   python ordenacion.py triangulo6 [--politicas natural centro aislados historia] [--semillas 0 1 2] [--inicios a1 c3]
+# Resuelve en profundidad cada posición inicial con cada política y semilla, y compara
+# los nodos expandidos y el tiempo hasta la primera solución (o hasta agotar la búsqueda)
+def main():
+    parser = argparse.ArgumentParser(description="Compara políticas de ordenación de saltos en la búsqueda en profundidad")
+    parser.add_argument("tablero", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("--politicas", nargs="+", default=list(ORDENACIONES), choices=list(ORDENACIONES))
+    parser.add_argument("--semillas", nargs="+", type=int, default=[0], help="semillas del orden de desempate")
+    parser.add_argument("--inicios", nargs="+", help="posiciones vacías iniciales (por defecto, todas)")
+    argumentos = parser.parse_args()
+
+    tablero = cargar_tablero(argumentos.tablero)
+    inicios = argumentos.inicios or [tablero.etiquetas[h] for h in range(1, tablero.num_huecos + 1)]
+    print("politica,semilla,inicio,fichas,nodos,segundos")
+    totales = {}
+    for politica in argumentos.politicas:
+        for semilla in argumentos.semillas:
+            for etiqueta in inicios:
+                mascara = tablero.mascara_llena() & ~(1 << tablero.numeros[etiqueta])
+                solucionador = SolucionadorProfundidad(mascara, tablero.saltos, tablero.cota_fichas(mascara),
+                                                       crear_ordenacion(politica, tablero, semilla))
+                inicio = time.perf_counter()
+                solucionador.avanzar()
+                duracion = time.perf_counter() - inicio
+                print(f"{politica},{semilla},{etiqueta},{solucionador.mejor_fichas},{solucionador.nodos_expandidos},{duracion:.4f}")
+                nodos, segundos = totales.get(politica, (0, 0.0))
+                totales[politica] = (nodos + solucionador.nodos_expandidos, segundos + duracion)
+
+    for politica, (nodos, segundos) in totales.items():
+        print(f"# {politica:>9}: {nodos:>12,} nodos en {segundos:8.2f} s")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from typing import List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from analisis import AnalizadorEstados, Evaluacion
+from busqueda_montecarlo import BusquedaMontecarlo, GrupoMontecarlo
+from tableros import Tablero
+
+Movimiento = Tuple[int, int, int]
+
+
+# Motor de pistas: puntúa cada salto legal con el valor del estado al que lleva
+# (resoluble, mejor número de fichas alcanzable y número de soluciones) y los devuelve
+# ordenados de mejor a peor. Los valores salen del analizador compartido, así que una
+# vez analizada la posición inicial cada pista es solo una consulta por salto. En los
+# tableros grandes, sin análisis exacto, los saltos que la paridad no descarta se
+# pueden valorar después con una búsqueda de Monte Carlo en el grupo de procesos (si
+# se le da uno), que avanza por detrás sin bloquear a quien pide la pista.
+class MotorPistas:
+
+    def __init__(self, tablero: Tablero, analizador: Optional[AnalizadorEstados] = None,
+                 montecarlo: Optional[GrupoMontecarlo] = None):
+        self.tablero = tablero
+        self.analizador = analizador if analizador is not None else AnalizadorEstados(tablero)
+        self.montecarlo = montecarlo
+
+    # Lista de saltos legales (desde, sobre, hasta) en una máscara de bits
+    def movimientos_legales(self, mascara: int) -> List[Movimiento]:
+        return [(desde, sobre, hasta) for desde, sobre, hasta, requerida, cambio in self.tablero.saltos
+                if mascara & requerida == requerida and not mascara >> hasta & 1]
+
+    # Puntúa y ordena los saltos (por defecto todos los legales) de mejor a peor; con
+    # calcular=False solo usa lo ya analizado y, para el resto, la tabla o la paridad
+    def clasificar(self, mascara: int, movimientos: Optional[List[Movimiento]] = None,
+                   calcular: bool = True) -> List[Tuple[Movimiento, Evaluacion]]:
+        if movimientos is None:
+            movimientos = self.movimientos_legales(mascara)
+        puntuados = []
+        for desde, sobre, hasta in movimientos:
+            hijo = mascara ^ ((1 << desde) | (1 << sobre) | (1 << hasta))
+            puntuados.append(((desde, sobre, hasta), self.analizador.evaluar(hijo, calcular)))
+        puntuados.sort(key=lambda par: par[1].clave())
+        return puntuados
+
+    # Empieza la búsqueda de Monte Carlo que completará una clasificación, o devuelve None
+    # si no hay grupo o si todos los saltos ya tienen valor (exacto o descartado)
+    def iniciar_montecarlo(self, mascara: int, puntuados: List[Tuple[Movimiento, Evaluacion]],
+                           segundos: float) -> Optional[BusquedaMontecarlo]:
+        if self.montecarlo is None or all(evaluacion.exacta or evaluacion.resoluble is not None
+                                          for movimiento, evaluacion in puntuados):
+            return None
+        return self.montecarlo.iniciar(mascara, segundos)
+
+    # Sustituye las evaluaciones sin valor exacto ni descartadas por la paridad por las de
+    # una búsqueda de Monte Carlo terminada: el mejor resultado encontrado tras cada salto
+    # (si es una ficha, el salto es resoluble) y cuántas simulaciones pasaron por él
+    def completar_montecarlo(self, mascara: int, puntuados: List[Tuple[Movimiento, Evaluacion]],
+                             busqueda: BusquedaMontecarlo) -> List[Tuple[Movimiento, Evaluacion]]:
+        estadisticas = busqueda.resultado.estadisticas
+        completados = []
+        for (desde, sobre, hasta), evaluacion in puntuados:
+            datos = estadisticas.get(mascara ^ ((1 << desde) | (1 << sobre) | (1 << hasta)))
+            if datos is not None and not evaluacion.exacta and evaluacion.resoluble is None:
+                visitas, suma, minimo = datos
+                evaluacion = Evaluacion(True if minimo == 1 else None, minimo, None, False, visitas)
+            completados.append(((desde, sobre, hasta), evaluacion))
+        completados.sort(key=lambda par: par[1].clave())
+        return completados
+
+    # Devuelve el mejor salto o None si no hay ninguno
+    def mejor_movimiento(self, mascara: int, movimientos: Optional[List[Movimiento]] = None) -> Optional[Movimiento]:
+        clasificados = self.clasificar(mascara, movimientos)
+        return clasificados[0][0] if clasificados else None
@@ -0,0 +1,88 @@
+import json # Para escribir los eventos como líneas JSON
+import logging # Niveles y formato perezoso de la biblioteca estándar
+import sys # Para escribir en la salida estándar activa en cada momento
+from typing import Optional # Para decir qué tipo de datos usan las funciones
+
+# Registro raíz del juego; cada módulo usa uno hijo (comesolo.consola, comesolo.ventana, ...)
+NOMBRE_RAIZ = "comesolo"
+
+# Nivel que no deja pasar ningún mensaje (modo silencioso)
+SILENCIO = logging.CRITICAL + 1
+
+_raiz = logging.getLogger(NOMBRE_RAIZ)
+_raiz.addHandler(logging.NullHandler())  # Usado como biblioteca no escribe nada hasta configurarlo
+_raiz.setLevel(SILENCIO)
+_raiz.propagate = False
+
+
+# Devuelve el registro de un módulo. Los mensajes se escriben con argumentos
+# ('Paso %d: %s', paso, texto) para que solo se formateen si el nivel está activo.
+def obtener_registro(nombre: str) -> logging.Logger:
+    return logging.getLogger(f"{NOMBRE_RAIZ}.{nombre}")
+
+
+# Salida a la consola con el mismo aspecto que los print de siempre (solo el mensaje)
+class SalidaConsola(logging.Handler):
+
+    def emit(self, registro: logging.LogRecord):
+        try:
+            sys.stdout.write(self.format(registro) + "\n")
+        except Exception:
+            self.handleError(registro)
+
+
+# Salida de eventos en formato JSON-lines: una línea por mensaje con el momento, el
+# nivel, el módulo, el nombre del evento y sus datos (lo que se pase en extra={'evento':
+# ..., 'datos': {...}}), para analizar partidas y lotes sin tener que leer el texto
+class SalidaEventos(logging.Handler):
+
+    def __init__(self, ruta: str):
+        super().__init__()
+        self.archivo = open(ruta, "a", encoding="utf-8")
+
+    def emit(self, registro: logging.LogRecord):
+        try:
+            evento = {"tiempo": round(registro.created, 6), "nivel": registro.levelname,
+                      "origen": registro.name, "evento": getattr(registro, "evento", None),
+                      "mensaje": registro.getMessage().strip()}
+            evento.update(getattr(registro, "datos", {}))
+            self.archivo.write(json.dumps(evento, ensure_ascii=False) + "\n")
+            self.archivo.flush()
+        except Exception:
+            self.handleError(registro)
+
+    def close(self):
+        self.archivo.close()
+        super().close()
+
+
+# Configura el registro del juego (sustituye cualquier configuración anterior):
+#   nivel           -> nivel mínimo de los mensajes (logging.INFO = lo que antes se imprimía)
+#   silencioso      -> no escribir nada en la consola (uso como biblioteca o por lotes)
+#   archivo_eventos -> además, guardar cada mensaje como una línea JSON en ese archivo
+def configurar(nivel: int = logging.INFO, silencioso: bool = False,
+               archivo_eventos: Optional[str] = None) -> logging.Logger:
+    for salida in list(_raiz.handlers):
+        _raiz.removeHandler(salida)
+        salida.close()
+    _raiz.addHandler(logging.NullHandler())
+
+    if not silencioso:
+        _raiz.addHandler(SalidaConsola())
+    if archivo_eventos:
+        _raiz.addHandler(SalidaEventos(archivo_eventos))
+
+    # Sin ninguna salida activa se sube el nivel para que los mensajes se descarten
+    # antes de crear el registro y de formatear nada
+    _raiz.setLevel(nivel if not silencioso or archivo_eventos else SILENCIO)
+    return _raiz
+
+# Desactiva todos los mensajes (atajo para el uso como biblioteca)
+def silenciar():
+    configurar(silencioso=True)
+
+# Lee las opciones de registro de la línea de comandos: --silencioso y --eventos archivo.jsonl
+def configurar_desde_argumentos(argumentos=None) -> logging.Logger:
+    argumentos = sys.argv if argumentos is None else argumentos
+    archivo = argumentos[argumentos.index("--eventos") + 1] if "--eventos" in argumentos else None
+    return configurar(silencioso="--silencioso" in argumentos, archivo_eventos=archivo)
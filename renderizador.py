@@ -0,0 +1,162 @@
+import argparse # Para las órdenes de línea de comandos
+import os # Para crear las carpetas de salida y elegir el controlador de vídeo
+import time # Para medir cuántos fotogramas se dibujan por segundo
+from typing import List, Optional # Para decir qué tipo de datos usan las funciones
+
+# Sin pantalla: SDL dibuja en memoria (se puede cambiar con la variable SDL_VIDEODRIVER)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import comesolo as interfaz
+from cache_soluciones import resolver_con_cache
+from solucionador import contar_fichas, salto_entre
+
+# Pillow es opcional: solo hace falta para escribir GIF animados
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Espacio alrededor de cada ficha que ocupan sus anillos (selección, pista, pulso)
+MARGEN_CASILLA = 12
+
+
+# Dibuja los pasos de una solución sin ventana, con las mismas funciones de dibujo que
+# el juego. Lo que no cambia entre fotogramas se dibuja una sola vez: el fondo queda en
+# una capa fija y cada hueco (con o sin ficha y con su marca de pista) se guarda como
+# una casilla ya dibujada, así que cada fotograma solo copia rectángulos.
+class RenderizadorSoluciones:
+
+    def __init__(self, escala: float = 1.0):
+        self.escala = escala
+        self.tamano = (int(interfaz.ANCHO * escala), int(interfaz.ALTO * escala))
+        self.lienzo = pygame.Surface((interfaz.ANCHO, interfaz.ALTO))
+        self.fondo = pygame.Surface((interfaz.ANCHO, interfaz.ALTO))
+        self.fondo.fill(interfaz.FONDO_OSCURO)
+        self.casillas = {}  # {(hueco, tiene_ficha, estado): (superficie, esquina)}
+        self.textos = {}  # {(texto, tamaño, color): superficie}
+        self.fotogramas = 0
+
+    # Casilla de un hueco dibujada con dibujar_clavija_moderna (se dibuja la primera vez)
+    def casilla(self, hueco: int, tiene_ficha: bool, estado: str):
+        clave = (hueco, tiene_ficha, estado)
+        if clave not in self.casillas:
+            lado = 2 * (interfaz.RADIO_CLAVIJA + MARGEN_CASILLA)
+            superficie = pygame.Surface((lado, lado))
+            superficie.fill(interfaz.FONDO_OSCURO)
+            # Las funciones del juego dibujan en interfaz.pantalla: se apunta a la casilla un momento
+            pantalla = interfaz.pantalla
+            interfaz.pantalla = superficie
+            try:
+                interfaz.dibujar_clavija_moderna(lado // 2, lado // 2, interfaz.RADIO_CLAVIJA,
+                                                 tiene_ficha, estado, interfaz.POSICIONES_ETIQUETAS[hueco])
+            finally:
+                interfaz.pantalla = pantalla
+            x, y = interfaz.POSICIONES[hueco]
+            self.casillas[clave] = (superficie, (x - lado // 2, y - lado // 2))
+        return self.casillas[clave]
+
+    # Texto ya renderizado (los títulos y contadores se repiten mucho entre fotogramas)
+    def texto(self, texto: str, fuente, color):
+        clave = (texto, id(fuente), color)
+        if clave not in self.textos:
+            self.textos[clave] = fuente.render(texto, True, color)
+        return self.textos[clave]
+
+    # Dibuja el paso 'indice' de un camino (lista de máscaras) y devuelve la superficie.
+    # Si no es el último paso se marca el salto siguiente igual que una pista del juego.
+    def dibujar_paso(self, camino: List[int], indice: int, titulo: str):
+        mascara = camino[indice]
+        salto = salto_entre(mascara, camino[indice + 1], interfaz.SALTOS) if indice + 1 < len(camino) else None
+        marcas = {}
+        if salto:
+            desde, sobre, hasta = salto
+            marcas = {desde: 'hint_from', sobre: 'hint_over', hasta: 'hint_to'}
+
+        lienzo = self.lienzo
+        lienzo.blit(self.fondo, (0, 0))
+        for hueco in range(1, interfaz.NUM_HUECOS + 1):
+            superficie, esquina = self.casilla(hueco, bool(mascara >> hueco & 1), marcas.get(hueco, 'normal'))
+            lienzo.blit(superficie, esquina)
+
+        # Título y contadores
+        fichas = contar_fichas(mascara)
+        if indice + 1 == len(camino):
+            titulo, color = ("¡PERFECTO!", interfaz.ANILLO_VALIDO) if fichas == 1 else ("Fin de la solución", interfaz.ROJO)
+        else:
+            color = interfaz.BLANCO
+        texto_titulo = self.texto(titulo, interfaz.FUENTE_GRANDE, color)
+        lienzo.blit(texto_titulo, texto_titulo.get_rect(center=(interfaz.ANCHO // 2, 60)))
+        texto_paso = self.texto(f"Paso {indice}/{len(camino) - 1}   Fichas: {fichas}", interfaz.FUENTE_MEDIANA, interfaz.BLANCO)
+        lienzo.blit(texto_paso, texto_paso.get_rect(center=(interfaz.ANCHO // 2, 620)))
+
+        self.fotogramas += 1
+        if self.escala != 1.0:
+            return pygame.transform.smoothscale(lienzo, self.tamano)
+        return lienzo
+
+    # Guarda cada paso como PNG en una carpeta (paso_000.png, paso_001.png, ...)
+    def guardar_png(self, camino: List[int], carpeta: str, titulo: str) -> List[str]:
+        os.makedirs(carpeta, exist_ok=True)
+        rutas = []
+        for indice in range(len(camino)):
+            ruta = os.path.join(carpeta, f"paso_{indice:03d}.png")
+            pygame.image.save(self.dibujar_paso(camino, indice, titulo), ruta)
+            rutas.append(ruta)
+        return rutas
+
+    # Guarda la solución como GIF animado (necesita Pillow); el último paso dura más
+    def guardar_gif(self, camino: List[int], ruta: str, titulo: str, duracion_ms: int = 600):
+        if Image is None:
+            raise RuntimeError("Para escribir GIF hace falta Pillow (pip install pillow)")
+        carpeta = os.path.dirname(ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        imagenes = [Image.frombytes("RGB", self.tamano, pygame.image.tostring(self.dibujar_paso(camino, i, titulo), "RGB"))
+                    for i in range(len(camino))]
+        duraciones = [duracion_ms] * (len(imagenes) - 1) + [duracion_ms * 4]
+        imagenes[0].save(ruta, save_all=True, append_images=imagenes[1:], duration=duraciones, loop=0)
+
+
+# Órdenes de línea de comandos:
+#   python renderizador.py [--filas 6 | --tablero ingles] [a1 b3 ...] [--salida carpeta] [--gif] [--escala 0.5]
+# Resuelve cada posición inicial vacía (todas si no se indica ninguna) y dibuja su solución
+def main(argumentos: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Dibuja soluciones de Comesolo en PNG o GIF sin pantalla")
+    parser.add_argument("inicios", nargs="*", help="posiciones vacías iniciales (por defecto, todas)")
+    parser.add_argument("--filas", type=int, help="filas del triángulo (lo lee comesolo.py)")
+    parser.add_argument("--tablero", help="ingles, europeo o archivo .json (lo lee comesolo.py)")
+    parser.add_argument("--salida", default="soluciones", help="carpeta de salida")
+    parser.add_argument("--gif", action="store_true", help="un GIF animado por solución en vez de PNG sueltos")
+    parser.add_argument("--escala", type=float, default=1.0, help="escala de las imágenes (1.0 = 1000x800)")
+    parser.add_argument("--duracion", type=int, default=600, help="milisegundos por paso en el GIF")
+    argumentos = parser.parse_args(argumentos)
+
+    tablero = interfaz.TABLERO
+    inicios = argumentos.inicios or [tablero.etiquetas[h] for h in range(1, tablero.num_huecos + 1)]
+    renderizador = RenderizadorSoluciones(argumentos.escala)
+
+    inicio = time.perf_counter()
+    for etiqueta in inicios:
+        if etiqueta not in tablero.numeros:
+            print(f"Posición '{etiqueta}' no válida")
+            continue
+        camino = resolver_con_cache(tablero, tablero.mascara_llena() & ~(1 << tablero.numeros[etiqueta]))
+        titulo = f"Solución desde {etiqueta}"
+        if argumentos.gif:
+            ruta = os.path.join(argumentos.salida, f"{tablero.identificador}_{etiqueta}.gif")
+            renderizador.guardar_gif(camino, ruta, titulo, argumentos.duracion)
+        else:
+            ruta = os.path.join(argumentos.salida, f"{tablero.identificador}_{etiqueta}")
+            renderizador.guardar_png(camino, ruta, titulo)
+        print(f"{etiqueta}: {len(camino)} pasos -> {ruta}")
+
+    duracion = time.perf_counter() - inicio
+    velocidad = renderizador.fotogramas / duracion if duracion > 0 else 0
+    print(f"{renderizador.fotogramas} fotogramas en {duracion:.2f} s ({velocidad:,.0f} por segundo)")
+    pygame.quit()
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
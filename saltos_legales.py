@@ -0,0 +1,61 @@
+from typing import List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from solucionador import Salto, contar_fichas
+
+Movimiento = Tuple[int, int, int]
+
+
+# Saltos legales y número de fichas de una partida, al día después de cada salto sin
+# volver a recorrer el tablero. Un salto solo depende de sus tres huecos, así que al
+# cambiar el tablero basta con volver a comprobar los saltos cuya línea pasa por alguno
+# de los huecos que cambiaron (tres en un salto, deshacer o rehacer). Con eso el fin de
+# la partida, el contador de fichas y la validación de un salto son consultas directas.
+class SaltosLegales:
+
+    def __init__(self, saltos: List[Salto], num_huecos: int, mascara: int = 0):
+        self.saltos = saltos
+        self.lineas = [[] for _ in range(num_huecos + 1)]  # {hueco: saltos que lo usan como desde, sobre o hasta}
+        for salto in saltos:
+            desde, sobre, hasta, requerida, cambio = salto
+            for hueco in (desde, sobre, hasta):
+                self.lineas[hueco].append(salto)
+        self.reiniciar(mascara)
+
+    # Calcula todo de nuevo para otro tablero (al empezar una partida)
+    def reiniciar(self, mascara: int):
+        self.mascara = mascara
+        self.fichas = contar_fichas(mascara)
+        self.legales = {}  # {(desde, hasta): (desde, sobre, hasta)}
+        for desde, sobre, hasta, requerida, cambio in self.saltos:
+            if mascara & requerida == requerida and not mascara >> hasta & 1:
+                self.legales[(desde, hasta)] = (desde, sobre, hasta)
+
+    # Pasa a otro tablero revisando solo los saltos que pasan por los huecos que cambian
+    def cambiar(self, mascara: int):
+        diferencia = self.mascara ^ mascara
+        self.fichas += contar_fichas(mascara & diferencia) - contar_fichas(self.mascara & diferencia)
+        self.mascara = mascara
+        legales = self.legales
+        while diferencia:
+            bit = diferencia & -diferencia
+            diferencia ^= bit
+            for desde, sobre, hasta, requerida, cambio in self.lineas[bit.bit_length() - 1]:
+                if mascara & requerida == requerida and not mascara >> hasta & 1:
+                    legales[(desde, hasta)] = (desde, sobre, hasta)
+                else:
+                    legales.pop((desde, hasta), None)
+
+    # Hace un salto (desde, sobre, hasta) ya validado
+    def aplicar(self, desde: int, sobre: int, hasta: int):
+        self.cambiar(self.mascara ^ ((1 << desde) | (1 << sobre) | (1 << hasta)))
+
+    # Devuelve el salto legal de 'desde' a 'hasta', o None si no lo hay
+    def buscar(self, desde: int, hasta: int) -> Optional[Movimiento]:
+        return self.legales.get((desde, hasta))
+
+    def hay_saltos(self) -> bool:
+        return bool(self.legales)
+
+    # Hueco de la única ficha que queda (solo tiene sentido con fichas == 1)
+    def ultima_ficha(self) -> int:
+        return self.mascara.bit_length() - 1
@@ -0,0 +1,142 @@
+import os # Para leer el teclado sin pasar por el búfer de sys.stdin
+import sys # Para la entrada y la salida de la consola
+import threading # Para buscar mientras la consola sigue atendiendo al jugador
+import time # Para medir la búsqueda y esperar entre actualizaciones
+from typing import Optional # Para decir qué tipo de datos usan las funciones
+
+# Lectura de teclas sin esperar a Enter: msvcrt en Windows y termios en el resto
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import select
+    try:
+        import termios
+        import tty
+    except ImportError:
+        termios = None
+
+# Milisegundos de cada trozo de búsqueda: entre trozos el hilo mira si lo han cancelado
+PRESUPUESTO_MS = 50
+
+# Segundos entre actualizaciones de la línea de progreso
+INTERVALO_PROGRESO = 0.2
+
+
+# Profundidad alcanzada por un solucionador: saltos hasta el mejor estado encontrado
+# (o niveles completos en la búsqueda por niveles, que no lleva la cuenta de fichas)
+def profundidad_alcanzada(solucionador) -> int:
+    if hasattr(solucionador, "mejor_fichas"):
+        return solucionador.fichas_iniciales - solucionador.mejor_fichas
+    return solucionador.niveles_completados
+
+
+# Búsqueda que avanza en un hilo aparte con cualquier solucionador reanudable
+# (avanzar / progreso / cancelar). El hilo trabaja en trozos de PRESUPUESTO_MS y entre
+# uno y otro comprueba si se ha pedido cancelar, así que cancelar tarda como mucho un
+# trozo. Solo el hilo toca el solucionador mientras trabaja; desde fuera se leen sus
+# contadores para el progreso y, cuando termina, su resultado.
+class BusquedaSegundoPlano:
+
+    # tipo: lo que se busca ('verificar', 'resolver', ...); mascara: estado desde el que se busca
+    def __init__(self, solucionador, tipo: str, mascara: int):
+        self.solucionador = solucionador
+        self.tipo = tipo
+        self.mascara = mascara
+        self.error = None
+        self.inicio = time.perf_counter()
+        self.fin = None
+        self.cancelacion = threading.Event()
+        self.hilo = threading.Thread(target=self.trabajar, name=f"busqueda-{tipo}", daemon=True)
+        self.hilo.start()
+
+    def trabajar(self):
+        try:
+            while not self.solucionador.avanzar(PRESUPUESTO_MS):
+                if self.cancelacion.is_set():
+                    self.solucionador.cancelar()
+                    break
+        except Exception as e:  # Se informa al recoger el resultado, no desde el hilo
+            self.error = e
+        self.fin = time.perf_counter()
+
+    def terminada(self) -> bool:
+        return not self.hilo.is_alive()
+
+    # Pide al hilo que pare y espera a que lo haga
+    def cancelar(self):
+        self.cancelacion.set()
+        self.hilo.join()
+
+    def segundos(self) -> float:
+        return (self.fin if self.fin is not None else time.perf_counter()) - self.inicio
+
+    # Línea de progreso: porcentaje, profundidad, nodos, nodos por segundo y tiempo
+    def linea_progreso(self) -> str:
+        solucionador = self.solucionador
+        segundos = self.segundos()
+        nodos = solucionador.nodos_expandidos
+        velocidad = nodos / segundos if segundos > 0 else 0
+        return (f"⏳ {self.tipo}: {solucionador.progreso():6.1%}  profundidad {profundidad_alcanzada(solucionador)}  "
+                f"{nodos:,} nodos  {velocidad:,.0f} nodos/s  {int(segundos // 60):02d}:{int(segundos % 60):02d}")
+
+
+# Teclado sin esperas mientras está abierto: en una terminal, cada tecla llega al
+# pulsarla (sin Enter); si la entrada no es una terminal (un archivo o una tubería) se
+# lee una línea entera. Al cerrarse deja la terminal como estaba.
+class LectorTeclas:
+
+    def __init__(self):
+        self.descriptor = sys.stdin.fileno()
+        self.terminal = sys.stdin.isatty()
+        self.configuracion = None
+
+    def __enter__(self):
+        if msvcrt is None and termios is not None and self.terminal:
+            self.configuracion = termios.tcgetattr(self.descriptor)
+            tty.setcbreak(self.descriptor)
+        return self
+
+    def __exit__(self, *args):
+        if self.configuracion is not None:
+            termios.tcsetattr(self.descriptor, termios.TCSADRAIN, self.configuracion)
+
+    # Espera como mucho 'segundos' a una tecla; devuelve la tecla ('\n' = Enter) o None
+    def leer(self, segundos: float) -> Optional[str]:
+        if msvcrt is not None:
+            limite = time.perf_counter() + segundos
+            while time.perf_counter() < limite:
+                if msvcrt.kbhit():
+                    tecla = msvcrt.getwch()
+                    return "\n" if tecla == "\r" else tecla
+                time.sleep(0.02)
+            return None
+        if not select.select([self.descriptor], [], [], segundos)[0]:
+            return None
+        if self.terminal:
+            return os.read(self.descriptor, 1).decode(errors="ignore") or None
+        linea = b""
+        while not linea.endswith(b"\n"):
+            caracter = os.read(self.descriptor, 1)
+            if not caracter:  # Fin de la entrada: no llegarán más teclas
+                time.sleep(segundos)
+                return None
+            linea += caracter
+        return linea.decode(errors="ignore").strip()[:1] or "\n"
+
+
+# Muestra el progreso de una búsqueda en una sola línea (reescrita en el mismo renglón)
+# hasta que termina o se pulsa una tecla. Devuelve la tecla pulsada o None si terminó.
+def seguir_progreso(busqueda: BusquedaSegundoPlano) -> Optional[str]:
+    ancho = 0
+    with LectorTeclas() as teclas:
+        while not busqueda.terminada():
+            linea = busqueda.linea_progreso()
+            ancho = max(ancho, len(linea))
+            print("\r" + linea.ljust(ancho), end="", flush=True)
+            tecla = teclas.leer(INTERVALO_PROGRESO)
+            if tecla is not None:
+                print()
+                return tecla
+    print("\r" + busqueda.linea_progreso().ljust(ancho))
+    return None
@@ -0,0 +1,265 @@
+import argparse # Para las órdenes de línea de comandos
+import importlib # Para cargar agentes definidos en otros módulos ('modulo:Clase')
+import multiprocessing # Para jugar las partidas en varios procesos
+import random # Para los generadores aleatorios de cada partida
+import sys # Para escribir el progreso en la salida de errores
+import time # Para medir cuántas partidas se juegan por segundo
+from collections import Counter # Para la distribución de fichas finales
+from typing import Iterator, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from analisis import AnalizadorEstados
+from cache_soluciones import resolver_con_cache
+from comesolocon import Comesolo
+from pistas import MotorPistas
+from solucionador import contar_fichas, lista_a_mascara, salto_entre
+from tableros import Tablero
+from tablabase import abrir_tablabase
+
+# Partidas que juega cada tarea del grupo de procesos (los resultados llegan por trozos)
+TAM_TROZO = 200
+
+# Resultado de una partida: (agente, índice, posición inicial vacía, fichas finales, movimientos)
+Partida = Tuple[str, int, str, int, int]
+
+
+# Saltos legales de la partida, pedidos al juego igual que los pediría un jugador:
+# lista de (desde, sobre, hasta) en etiquetas para cada hueco con ficha
+def movimientos_legales(juego: Comesolo) -> List[Tuple[str, str, str]]:
+    movimientos = []
+    for numero in range(1, juego.num_huecos + 1):
+        if juego.tablero[numero] == 1:
+            movimientos.extend(juego.obtener_movimientos_desde_posicion(juego.convertir_a_posicion(numero)))
+    return movimientos
+
+
+# Un agente elige el siguiente salto de una partida. Recibe el juego (solo lo consulta;
+# el salto lo hace el simulador con hacer_movimiento) y el generador aleatorio de la
+# partida, que es el único azar que puede usar para que cada partida se pueda repetir.
+# Devuelve (desde, hasta) en etiquetas. Para añadir un agente basta con una clase así y
+# registrarla en AGENTES o pasarla como 'modulo:Clase'.
+class Agente:
+    nombre = "agente"
+
+    def __init__(self, tablero: Tablero):
+        self.tablero = tablero
+
+    def elegir(self, juego: Comesolo, aleatorio: random.Random) -> Tuple[str, str]:
+        raise NotImplementedError
+
+
+# Elige cualquier salto legal al azar
+class AgenteAzar(Agente):
+    nombre = "azar"
+
+    def elegir(self, juego, aleatorio):
+        desde, sobre, hasta = aleatorio.choice(movimientos_legales(juego))
+        return desde, hasta
+
+
+# Elige el salto que deja más saltos legales después (más movilidad); empates al azar
+class AgenteVoraz(Agente):
+    nombre = "voraz"
+
+    def elegir(self, juego, aleatorio):
+        mascara = lista_a_mascara(juego.tablero)
+        saltos = self.tablero.saltos
+        mejores, mejor_valor = [], -1
+        for desde, sobre, hasta in movimientos_legales(juego):
+            hijo = mascara ^ ((1 << juego.convertir_a_numero(desde)) | (1 << juego.convertir_a_numero(sobre))
+                              | (1 << juego.convertir_a_numero(hasta)))
+            valor = sum(1 for d, s, h, requerida, cambio in saltos
+                        if hijo & requerida == requerida and not hijo >> h & 1)
+            if valor > mejor_valor:
+                mejores, mejor_valor = [(desde, hasta)], valor
+            elif valor == mejor_valor:
+                mejores.append((desde, hasta))
+        return aleatorio.choice(mejores)
+
+
+# Sigue las pistas del motor de pistas: el salto con mejor valoración (resoluble, menos
+# fichas alcanzables, más soluciones); entre saltos igual de buenos elige al azar
+class AgentePistas(Agente):
+    nombre = "pistas"
+
+    def __init__(self, tablero):
+        super().__init__(tablero)
+        self.motor = MotorPistas(tablero, AnalizadorEstados(tablero, abrir_tablabase(tablero)))
+
+    def elegir(self, juego, aleatorio):
+        clasificados = self.motor.clasificar(lista_a_mascara(juego.tablero))
+        mejor = clasificados[0][1].clave()
+        desde, sobre, hasta = aleatorio.choice([m for m, evaluacion in clasificados if evaluacion.clave() == mejor])
+        return juego.convertir_a_posicion(desde), juego.convertir_a_posicion(hasta)
+
+
+# Juega la solución del solucionador (con la caché en disco): calcula el mejor camino
+# una vez y lo sigue mientras la partida vaya por él
+class AgenteSolucionador(Agente):
+    nombre = "solucionador"
+
+    def __init__(self, tablero):
+        super().__init__(tablero)
+        self.siguiente = {}  # {estado: estado siguiente del camino calculado}
+
+    def elegir(self, juego, aleatorio):
+        mascara = lista_a_mascara(juego.tablero)
+        if mascara not in self.siguiente:
+            camino = resolver_con_cache(self.tablero, mascara)
+            self.siguiente.update(zip(camino, camino[1:]))
+        desde, sobre, hasta = salto_entre(mascara, self.siguiente[mascara], self.tablero.saltos)
+        return juego.convertir_a_posicion(desde), juego.convertir_a_posicion(hasta)
+
+
+# Agentes incluidos, por nombre
+AGENTES = {clase.nombre: clase for clase in (AgenteAzar, AgenteVoraz, AgentePistas, AgenteSolucionador)}
+
+# Devuelve la clase de un agente: un nombre de AGENTES o 'modulo:Clase'
+def cargar_agente(nombre: str) -> type:
+    if nombre in AGENTES:
+        return AGENTES[nombre]
+    if ":" in nombre:
+        modulo, clase = nombre.split(":", 1)
+        return getattr(importlib.import_module(modulo), clase)
+    raise ValueError(f"Agente '{nombre}' desconocido. Agentes disponibles: {', '.join(AGENTES)}")
+
+
+# Juega una partida completa con un agente, desde la posición vacía indicada (None = al
+# azar con el generador de la partida). Solo usa la API del juego de consola, sin pygame.
+def jugar_partida(juego: Comesolo, agente: Agente, aleatorio: random.Random,
+                  posicion_vacia: Optional[str] = None) -> Tuple[str, int, int]:
+    if posicion_vacia is None:
+        posicion_vacia = juego.convertir_a_posicion(aleatorio.randint(1, juego.num_huecos))
+    juego.inicializar_juego(posicion_vacia)
+    while not juego.juego_terminado:
+        desde, hasta = agente.elegir(juego, aleatorio)
+        if not juego.hacer_movimiento(desde, hasta):
+            raise RuntimeError(f"El agente '{agente.nombre}' propuso un salto no válido: {desde} → {hasta}")
+    return posicion_vacia, contar_fichas(lista_a_mascara(juego.tablero)), juego.movimientos_realizados
+
+
+# Generador aleatorio de una partida: depende solo de la semilla y del índice de la
+# partida, así que los resultados no cambian con el número de procesos ni el reparto
+def aleatorio_partida(semilla: int, agente: str, indice: int) -> random.Random:
+    return random.Random(f"{semilla}:{agente}:{indice}")
+
+
+# Juego y agentes propios de cada proceso (se crean una vez por proceso)
+_juego = None
+_agentes = {}
+_opciones = None
+
+def _iniciar_proceso(filas: int, nombre_tablero: Optional[str], semilla: int, posicion_vacia: Optional[str]):
+    global _juego, _agentes, _opciones
+    _juego = Comesolo(None, filas, nombre_tablero)
+    _agentes = {}
+    _opciones = (semilla, posicion_vacia)
+
+# Juega un trozo de partidas de un agente: tarea = (agente, primer índice, último + 1)
+def _jugar_trozo(tarea: Tuple[str, int, int]) -> List[Partida]:
+    nombre, primero, fin = tarea
+    if nombre not in _agentes:
+        _agentes[nombre] = cargar_agente(nombre)(_juego.geometria)
+    agente = _agentes[nombre]
+    semilla, posicion_vacia = _opciones
+    partidas = []
+    for indice in range(primero, fin):
+        inicio, fichas, movimientos = jugar_partida(_juego, agente, aleatorio_partida(semilla, nombre, indice), posicion_vacia)
+        partidas.append((nombre, indice, inicio, fichas, movimientos))
+    return partidas
+
+
+# Resultados acumulados de un agente
+class Resumen:
+    def __init__(self, agente: str):
+        self.agente = agente
+        self.partidas = 0
+        self.ganadas = 0
+        self.movimientos = 0
+        self.fichas_finales = Counter()  # {fichas al terminar: partidas}
+
+    def anadir(self, fichas: int, movimientos: int):
+        self.partidas += 1
+        self.ganadas += fichas == 1
+        self.movimientos += movimientos
+        self.fichas_finales[fichas] += 1
+
+    def tasa_victoria(self) -> float:
+        return self.ganadas / self.partidas if self.partidas else 0.0
+
+    def fichas_medias(self) -> float:
+        return sum(f * n for f, n in self.fichas_finales.items()) / self.partidas if self.partidas else 0.0
+
+
+# Juega 'partidas' partidas con cada agente repartidas entre varios procesos (procesos=1
+# las juega en este mismo) y va devolviendo los resultados de cada partida según llegan,
+# sin esperar al final. El orden de llegada puede variar; el resultado de cada partida no.
+def simular(agentes: List[str], partidas: int, filas: int = 5, nombre_tablero: Optional[str] = None,
+            semilla: int = 0, posicion_vacia: Optional[str] = None,
+            procesos: Optional[int] = None) -> Iterator[Partida]:
+    for nombre in agentes:
+        cargar_agente(nombre)  # Falla aquí, y no dentro de un proceso, si el nombre no existe
+    tareas = [(nombre, primero, min(primero + TAM_TROZO, partidas))
+              for nombre in agentes for primero in range(0, partidas, TAM_TROZO)]
+    opciones = (filas, nombre_tablero, semilla, posicion_vacia)
+
+    if procesos == 1:
+        _iniciar_proceso(*opciones)
+        for tarea in tareas:
+            yield from _jugar_trozo(tarea)
+        return
+    with multiprocessing.Pool(procesos, _iniciar_proceso, opciones) as grupo:
+        for trozo in grupo.imap_unordered(_jugar_trozo, tareas):
+            yield from trozo
+
+
+# Órdenes de línea de comandos:
+#   python simulacion.py [--agentes azar voraz pistas solucionador] [--partidas 10000] [--filas 5 | --tablero ingles]
+#                        [--inicio a1] [--semilla 0] [--procesos 4] [--salida partidas.csv]
+# Escribe el progreso en la salida de errores mientras juega y al final el resumen por agente;
+# con --salida guarda una línea CSV por partida según van llegando ('-' = salida estándar)
+def main():
+    parser = argparse.ArgumentParser(description="Partidas automáticas de Comesolo con varios agentes")
+    parser.add_argument("--agentes", nargs="+", default=list(AGENTES), help="agentes (nombres o modulo:Clase)")
+    parser.add_argument("--partidas", type=int, default=1000, help="partidas por agente")
+    parser.add_argument("--filas", type=int, default=5, help="filas del triángulo")
+    parser.add_argument("--tablero", help="ingles, europeo o archivo .json (en vez de --filas)")
+    parser.add_argument("--inicio", help="posición inicial vacía (por defecto, una al azar en cada partida)")
+    parser.add_argument("--semilla", type=int, default=0, help="semilla para repetir los mismos resultados")
+    parser.add_argument("--procesos", type=int, help="procesos a usar (por defecto, uno por núcleo)")
+    parser.add_argument("--salida", help="archivo CSV con una línea por partida ('-' = salida estándar)")
+    argumentos = parser.parse_args()
+
+    salida = None
+    if argumentos.salida:
+        salida = sys.stdout if argumentos.salida == "-" else open(argumentos.salida, "w", encoding="utf-8")
+        salida.write("agente,partida,inicio,fichas,movimientos\n")
+
+    resumenes = {nombre: Resumen(nombre) for nombre in argumentos.agentes}
+    total = len(argumentos.agentes) * argumentos.partidas
+    jugadas = 0
+    inicio = time.perf_counter()
+    for agente, indice, vacia, fichas, movimientos in simular(argumentos.agentes, argumentos.partidas, argumentos.filas,
+                                                              argumentos.tablero, argumentos.semilla, argumentos.inicio,
+                                                              argumentos.procesos):
+        resumenes[agente].anadir(fichas, movimientos)
+        jugadas += 1
+        if salida is not None:
+            salida.write(f"{agente},{indice},{vacia},{fichas},{movimientos}\n")
+        if jugadas % TAM_TROZO == 0 or jugadas == total:
+            print(f"\r   {jugadas:,}/{total:,} partidas", end="", file=sys.stderr, flush=True)
+    duracion = time.perf_counter() - inicio
+    print(file=sys.stderr)
+    if salida is not None and salida is not sys.stdout:
+        salida.close()
+
+    velocidad = jugadas / duracion if duracion > 0 else float("inf")
+    print(f"{jugadas:,} partidas en {duracion:.2f} s ({velocidad:,.0f} por segundo)", file=sys.stderr)
+    for resumen in resumenes.values():
+        distribucion = ", ".join(f"{f}: {n}" for f, n in sorted(resumen.fichas_finales.items()))
+        print(f"{resumen.agente:>14}: ganadas {resumen.tasa_victoria():6.1%}, fichas medias {resumen.fichas_medias():.2f}  "
+              f"[{distribucion}]", file=sys.stderr)
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
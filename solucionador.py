@@ -0,0 +1,301 @@
+import time # Para limitar el tiempo que el solucionador trabaja en cada llamada
+from typing import Dict, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+# Un salto compilado: (desde, sobre, hasta, mascara_requerida, mascara_cambio)
+Salto = Tuple[int, int, int, int, int]
+
+# Convierte un tablero en forma de lista ([-1, 1, 0, ...]) a una máscara de bits
+# El bit i de la máscara vale 1 si hay ficha en la posición i (el bit 0 no se usa)
+def lista_a_mascara(tablero: List[int]) -> int:
+    mascara = 0
+    for i in range(1, len(tablero)):
+        if tablero[i] == 1:
+            mascara |= 1 << i
+    return mascara
+
+# Convierte una máscara de bits de vuelta al formato de lista que usan los juegos
+def mascara_a_lista(mascara: int, num_huecos: int) -> List[int]:
+    tablero = [-1] + [0] * num_huecos  # Índice 0 ignorado, igual que en los juegos
+    for i in range(1, num_huecos + 1):
+        if mascara >> i & 1:
+            tablero[i] = 1
+    return tablero
+
+# Cuenta cuántas fichas hay en una máscara
+def contar_fichas(mascara: int) -> int:
+    return bin(mascara).count("1")
+
+# Compila el diccionario de movimientos posibles {origen: [(sobre, destino)]}
+# a una lista de saltos con las máscaras ya calculadas para no repetir trabajo
+def compilar_saltos(movimientos_posibles: Dict[int, List[Tuple[int, int]]]) -> List[Salto]:
+    saltos = []
+    for desde in sorted(movimientos_posibles):
+        for sobre, hasta in movimientos_posibles[desde]:
+            requerida = (1 << desde) | (1 << sobre)  # Fichas que deben estar
+            cambio = requerida | (1 << hasta)  # Bits que cambian al saltar
+            saltos.append((desde, sobre, hasta, requerida, cambio))
+    return saltos
+
+# Genera los estados hijos de una máscara (un hijo por cada salto válido)
+def hijos(mascara: int, saltos: List[Salto]) -> List[int]:
+    resultado = []
+    for desde, sobre, hasta, requerida, cambio in saltos:
+        if mascara & requerida == requerida and not mascara >> hasta & 1:
+            resultado.append(mascara ^ cambio)
+    return resultado
+
+# Encuentra el salto (desde, sobre, hasta) que transforma un estado en el siguiente
+def salto_entre(antes: int, despues: int, saltos: List[Salto]) -> Optional[Tuple[int, int, int]]:
+    diferencia = antes ^ despues
+    for desde, sobre, hasta, requerida, cambio in saltos:
+        if cambio == diferencia and antes & requerida == requerida:
+            return (desde, sobre, hasta)
+    return None
+
+
+# Solucionador por niveles (BFS) que se puede pausar y reanudar.
+# Cada salto elimina una ficha, así que cada nivel del árbol tiene el mismo número
+# de fichas y los niveles forman un grafo sin ciclos: basta un diccionario de padres
+# para no repetir estados. El trabajo se hace en trozos con avanzar(ms), de modo que
+# el bucle de pygame puede llamarlo una vez por fotograma sin usar hilos.
+class SolucionadorIncremental:
+
+    # Prepara la búsqueda desde un estado inicial (máscara de bits)
+    def __init__(self, estado_inicial: int, saltos: List[Salto], objetivo_fichas: int = 1):
+        self.estado_inicial = estado_inicial
+        self.saltos = saltos
+        self.objetivo_fichas = objetivo_fichas
+
+        # Estructuras de la búsqueda
+        self.padres = {estado_inicial: None}  # {estado: estado_padre}
+        self.nivel_actual = [estado_inicial]  # Frontera que se está expandiendo
+        self.siguiente_nivel = []  # Nodos nuevos del siguiente nivel
+        self.indice = 0  # Posición dentro de la frontera actual
+
+        # Estadísticas y resultado
+        self.fichas_iniciales = contar_fichas(estado_inicial)
+        self.niveles_totales = max(1, self.fichas_iniciales - objetivo_fichas)
+        self.niveles_completados = 0
+        self.nodos_expandidos = 0
+        self.mejor_estado = estado_inicial  # Estado con menos fichas alcanzado
+        self.estado_objetivo = None
+        self.terminado = self.fichas_iniciales <= objetivo_fichas
+        self.cancelado = False
+        if self.terminado:
+            self.estado_objetivo = estado_inicial
+
+    # Trabaja como máximo presupuesto_ms milisegundos (None = hasta terminar)
+    # Devuelve True cuando la búsqueda ha terminado (con o sin éxito)
+    def avanzar(self, presupuesto_ms: Optional[float] = None) -> bool:
+        if self.terminado:
+            return True
+
+        limite = None if presupuesto_ms is None else time.perf_counter() + presupuesto_ms / 1000
+        padres = self.padres
+        saltos = self.saltos
+        contador = 0
+
+        while True:
+            # Si se agotó la frontera actual, pasa al siguiente nivel
+            if self.indice >= len(self.nivel_actual):
+                if not self.siguiente_nivel:
+                    self.terminado = True
+                    return True
+                self.nivel_actual = self.siguiente_nivel
+                self.siguiente_nivel = []
+                self.indice = 0
+                self.niveles_completados += 1
+                self.mejor_estado = self.nivel_actual[0]
+
+            estado = self.nivel_actual[self.indice]
+            self.indice += 1
+            self.nodos_expandidos += 1
+
+            # Expande el nodo con todos los saltos válidos
+            for desde, sobre, hasta, requerida, cambio in saltos:
+                if estado & requerida == requerida and not estado >> hasta & 1:
+                    hijo = estado ^ cambio
+                    if hijo in padres:
+                        continue
+                    padres[hijo] = estado
+                    self.siguiente_nivel.append(hijo)
+                    if self.fichas_iniciales - self.niveles_completados - 1 <= self.objetivo_fichas:
+                        self.estado_objetivo = hijo
+                        self.mejor_estado = hijo
+                        self.terminado = True
+                        return True
+
+            # Consulta el reloj solo de vez en cuando para no gastar tiempo en ello
+            contador += 1
+            if limite is not None and contador & 63 == 0 and time.perf_counter() >= limite:
+                return False
+
+    # Fracción de la búsqueda completada (0.0 - 1.0), según la frontera explorada
+    def progreso(self) -> float:
+        if self.terminado:
+            return 1.0
+        fraccion_nivel = self.indice / len(self.nivel_actual) if self.nivel_actual else 1.0
+        return min(1.0, (self.niveles_completados + fraccion_nivel) / self.niveles_totales)
+
+    # Detiene la búsqueda; las siguientes llamadas a avanzar no hacen nada
+    def cancelar(self):
+        self.cancelado = True
+        self.terminado = True
+        self.nivel_actual = []
+        self.siguiente_nivel = []
+
+    # Reconstruye el camino hasta un estado siguiendo los padres
+    def camino_hasta(self, estado: int) -> List[int]:
+        camino = []
+        while estado is not None:
+            camino.append(estado)
+            estado = self.padres[estado]
+        camino.reverse()
+        return camino
+
+    # Devuelve la solución (lista de máscaras desde el inicio) o lista vacía
+    def solucion(self) -> List[int]:
+        if self.cancelado or self.estado_objetivo is None:
+            return []
+        return self.camino_hasta(self.estado_objetivo)
+
+    # Devuelve el mejor camino encontrado (el que deja menos fichas)
+    def mejor_camino(self) -> List[int]:
+        if self.cancelado:
+            return []
+        return self.camino_hasta(self.mejor_estado)
+
+
+# Solucionador en profundidad (DFS) que se puede pausar y reanudar.
+# Baja directamente hacia una ficha y recuerda los estados ya explorados, así que en
+# los tableros grandes (6 filas o más) encuentra una solución mucho antes que la
+# búsqueda por niveles y usa menos memoria. Si no hay solución, recorre todos los
+# estados alcanzables una sola vez y se queda con el camino que deja menos fichas.
+class SolucionadorProfundidad:
+
+    # Prepara la búsqueda desde un estado inicial (máscara de bits)
+    # ordenacion: política que decide el orden en que se prueban los saltos (ordenacion.py);
+    # None = el orden en que están definidos
+    def __init__(self, estado_inicial: int, saltos: List[Salto], objetivo_fichas: int = 1, ordenacion=None):
+        self.estado_inicial = estado_inicial
+        self.saltos = saltos
+        self.objetivo_fichas = objetivo_fichas
+        self.ordenacion = ordenacion
+
+        # Pila de la búsqueda: [estado, hijos_pendientes, indice_siguiente_hijo]
+        self.pila = [[estado_inicial, self.hijos(estado_inicial, 0), 0]]
+        self.visitados = {estado_inicial}  # Estados que ya se han explorado
+
+        # Estadísticas y resultado
+        self.fichas_iniciales = contar_fichas(estado_inicial)
+        self.nodos_expandidos = 0
+        self.mejor_fichas = self.fichas_iniciales
+        self.camino_mejor = [estado_inicial]  # Camino que deja menos fichas
+        self.terminado = self.fichas_iniciales <= objetivo_fichas
+        self.cancelado = False
+
+    # Hijos de un estado en el orden de la política (o en el de los saltos si no hay)
+    def hijos(self, estado: int, profundidad: int) -> List[int]:
+        if self.ordenacion is None:
+            return hijos(estado, self.saltos)
+        return self.ordenacion.hijos(estado, profundidad)
+
+    # Trabaja como máximo presupuesto_ms milisegundos (None = hasta terminar)
+    # Devuelve True cuando la búsqueda ha terminado (con o sin éxito)
+    def avanzar(self, presupuesto_ms: Optional[float] = None) -> bool:
+        if self.terminado:
+            return True
+
+        limite = None if presupuesto_ms is None else time.perf_counter() + presupuesto_ms / 1000
+        ordenacion = self.ordenacion
+        pila = self.pila
+        visitados = self.visitados
+        saltos = self.saltos
+        contador = 0
+
+        while pila:
+            nodo = pila[-1]
+            lista_hijos = nodo[1]
+            # Busca el siguiente hijo que no se haya explorado todavía
+            while nodo[2] < len(lista_hijos) and lista_hijos[nodo[2]] in visitados:
+                nodo[2] += 1
+            if nodo[2] >= len(lista_hijos):
+                pila.pop()  # Todos los hijos explorados: se vuelve atrás
+                continue
+
+            hijo = lista_hijos[nodo[2]]
+            nodo[2] += 1
+            visitados.add(hijo)
+            self.nodos_expandidos += 1
+            if ordenacion is None:
+                pila.append([hijo, hijos(hijo, saltos), 0])
+            else:
+                pila.append([hijo, ordenacion.hijos(hijo, len(pila)), 0])
+
+            # Cada nivel de la pila tiene una ficha menos que el anterior
+            fichas = self.fichas_iniciales - len(pila) + 1
+            if ordenacion is not None and fichas <= self.mejor_fichas:
+                ordenacion.premiar([n[0] for n in pila])
+            if fichas < self.mejor_fichas:
+                self.mejor_fichas = fichas
+                self.camino_mejor = [n[0] for n in pila]
+                if fichas <= self.objetivo_fichas:
+                    self.terminado = True
+                    return True
+
+            # Consulta el reloj solo de vez en cuando para no gastar tiempo en ello
+            contador += 1
+            if limite is not None and contador & 63 == 0 and time.perf_counter() >= limite:
+                return False
+
+        self.terminado = True
+        return True
+
+    # Fracción estimada del árbol ya recorrida (0.0 - 1.0): cada nivel de la pila
+    # aporta los hijos terminados como parte proporcional de su rama
+    def progreso(self) -> float:
+        if self.terminado:
+            return 1.0
+        fraccion, peso = 0.0, 1.0
+        for estado, lista_hijos, indice in self.pila:
+            if not lista_hijos:
+                break
+            fraccion += peso * max(0, indice - 1) / len(lista_hijos)
+            peso /= len(lista_hijos)
+        return min(1.0, fraccion)
+
+    # Detiene la búsqueda; las siguientes llamadas a avanzar no hacen nada
+    def cancelar(self):
+        self.cancelado = True
+        self.terminado = True
+        self.pila = []
+
+    # Devuelve la solución (lista de máscaras desde el inicio) o lista vacía
+    def solucion(self) -> List[int]:
+        if self.cancelado or self.mejor_fichas > self.objetivo_fichas:
+            return []
+        return list(self.camino_mejor)
+
+    # Devuelve el mejor camino encontrado (el que deja menos fichas)
+    def mejor_camino(self) -> List[int]:
+        if self.cancelado:
+            return []
+        return list(self.camino_mejor)
+
+
+# Elige el solucionador adecuado para el tamaño del tablero: por niveles en el
+# triángulo clásico de 15 huecos y en profundidad en los tableros más grandes
+# (o siempre que se pida una ordenación de saltos, que solo importa en profundidad)
+def crear_solucionador(estado_inicial: int, saltos: List[Salto], num_huecos: int, objetivo_fichas: int = 1,
+                       ordenacion=None):
+    if num_huecos <= 15 and ordenacion is None:
+        return SolucionadorIncremental(estado_inicial, saltos, objetivo_fichas)
+    return SolucionadorProfundidad(estado_inicial, saltos, objetivo_fichas, ordenacion)
+
+
+# Resuelve de una vez (sin pausas) y devuelve el camino con menos fichas en forma de listas
+def resolver(tablero: List[int], movimientos_posibles: Dict[int, List[Tuple[int, int]]]) -> List[List[int]]:
+    num_huecos = len(tablero) - 1
+    solucionador = crear_solucionador(lista_a_mascara(tablero), compilar_saltos(movimientos_posibles), num_huecos)
+    solucionador.avanzar()
+    return [mascara_a_lista(m, num_huecos) for m in solucionador.mejor_camino()]
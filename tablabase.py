@@ -0,0 +1,244 @@
+import argparse # Para las órdenes de línea de comandos (construir / consultar / verificar)
+import mmap # Para leer la tabla sin cargarla entera en memoria
+import os # Para crear el archivo y su carpeta
+import struct # Para leer y escribir la cabecera binaria
+import time # Para informar del progreso de la construcción
+import zlib # Para la suma de control (CRC32) de los datos
+from typing import Callable, Optional # Para decir qué tipo de datos usan las funciones
+
+from tableros import Tablero, cargar_tablero
+
+# Cabecera de 64 bytes: firma, versión, bits por estado, huecos, CRC32, tamaño de datos y tablero
+FIRMA = b"CSTB"
+VERSION_FORMATO = 1
+FORMATO_CABECERA = "<4sHBBIQ32s"
+TAM_CABECERA = 64
+
+# Carpeta por defecto (se puede cambiar con la variable de entorno COMESOLO_TABLAS)
+CARPETA_POR_DEFECTO = os.environ.get(
+    "COMESOLO_TABLAS", os.path.join(os.path.expanduser("~"), ".comesolo_tablas"))
+
+# Estados procesados entre cada volcado de la tabla a disco
+TAM_BLOQUE = 1 << 20
+
+
+# Ruta por defecto de la tabla de un tablero
+def ruta_por_defecto(tablero: Tablero) -> str:
+    return os.path.join(CARPETA_POR_DEFECTO, tablero.identificador + ".tb")
+
+# Recorre en orden creciente todos los números de n bits con k bits a 1 (truco de Gosper)
+def combinaciones_bits(n: int, k: int):
+    if k == 0:
+        yield 0
+        return
+    c = (1 << k) - 1
+    limite = 1 << n
+    while c < limite:
+        yield c
+        u = c & -c
+        v = c + u
+        c = v + (((v ^ c) // u) >> 2)
+
+
+# Construye la tabla de un tablero y la escribe en disco.
+# Con 1 bit por estado se guarda si el estado puede terminar con una ficha; con 2 bits
+# se guarda el mejor número de fichas alcanzable (1, 2, 3 o "4 o más").
+# Los estados se recorren por número de fichas (cada salto quita una, así que los hijos
+# ya están calculados) y, dentro de cada nivel, en orden creciente de índice, de modo que
+# las escrituras en el archivo avanzan en orden y se vuelcan a disco por bloques.
+def construir_tablabase(tablero: Tablero, ruta: str, bits_por_estado: int = 1,
+                        informar: Optional[Callable[[int, int], None]] = None):
+    if bits_por_estado not in (1, 2):
+        raise ValueError("bits_por_estado debe ser 1 o 2")
+
+    n = tablero.num_huecos
+    tam_datos = ((1 << n) * bits_por_estado + 7) // 8
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+
+    # Se escribe primero en un archivo temporal; solo se renombra cuando está completo
+    temporal = ruta + ".construyendo"
+    with open(temporal, "wb") as archivo:
+        archivo.write(b"\0" * TAM_CABECERA)
+        archivo.truncate(TAM_CABECERA + tam_datos)
+
+    # Saltos agrupados por el hueco de destino: (mascara_requerida, mascara_cambio)
+    llegadas = {h: [] for h in range(1, n + 1)}
+    for desde, sobre, hasta, requerida, cambio in tablero.saltos:
+        llegadas[hasta].append((requerida, cambio))
+
+    with open(temporal, "r+b") as archivo:
+        datos = mmap.mmap(archivo.fileno(), 0)
+        base = TAM_CABECERA
+        procesados = 0
+
+        # Lee el valor guardado de un índice (el índice es la máscara sin el bit 0)
+        def leer(indice):
+            if bits_por_estado == 1:
+                return datos[base + (indice >> 3)] >> (indice & 7) & 1
+            return datos[base + (indice >> 2)] >> ((indice & 3) * 2) & 3
+
+        for fichas in range(1, n + 1):
+            for indice in combinaciones_bits(n, fichas):
+                mascara = indice << 1
+                if fichas == 1:
+                    valor = 1 if bits_por_estado == 1 else 0  # 0 = "queda 1 ficha"
+                elif bits_por_estado == 1:
+                    # Resoluble si algún hijo es resoluble
+                    valor = 0
+                    for h in range(1, n + 1):
+                        if not mascara >> h & 1:
+                            for requerida, cambio in llegadas[h]:
+                                if mascara & requerida == requerida and leer((mascara ^ cambio) >> 1):
+                                    valor = 1
+                                    break
+                            if valor:
+                                break
+                else:
+                    # Mejor resultado: el mínimo de los hijos, o las fichas actuales si no hay saltos
+                    valor = min(fichas - 1, 3)
+                    for h in range(1, n + 1):
+                        if valor and not mascara >> h & 1:
+                            for requerida, cambio in llegadas[h]:
+                                if mascara & requerida == requerida:
+                                    valor = min(valor, leer((mascara ^ cambio) >> 1))
+
+                if valor:
+                    if bits_por_estado == 1:
+                        datos[base + (indice >> 3)] |= 1 << (indice & 7)
+                    else:
+                        datos[base + (indice >> 2)] |= valor << ((indice & 3) * 2)
+
+                procesados += 1
+                if procesados % TAM_BLOQUE == 0:
+                    datos.flush()  # Vuelca el bloque terminado a disco
+                    if informar:
+                        informar(procesados, 1 << n)
+
+        # Suma de control de los datos, calculada por bloques
+        crc = 0
+        for inicio in range(base, base + tam_datos, TAM_BLOQUE):
+            crc = zlib.crc32(datos[inicio:min(inicio + TAM_BLOQUE, base + tam_datos)], crc)
+
+        cabecera = struct.pack(FORMATO_CABECERA, FIRMA, VERSION_FORMATO, bits_por_estado, n, crc,
+                               tam_datos, tablero.identificador.encode()[:32])
+        datos[0:len(cabecera)] = cabecera
+        datos.flush()
+        datos.close()
+
+    os.replace(temporal, ruta)
+
+
+# Lector de una tabla construida. Solo lee la cabecera al abrir (tiempo constante sea
+# cual sea el tablero) y proyecta el archivo en memoria con mmap: cada consulta toca
+# una sola página y varios procesos que abran la misma tabla comparten esas páginas
+# a través de la caché del sistema operativo.
+class TablaBase:
+
+    def __init__(self, ruta: str, tablero: Optional[Tablero] = None):
+        self.ruta = ruta
+        self.archivo = open(ruta, "rb")
+        try:
+            self.datos = mmap.mmap(self.archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.archivo.close()
+            raise ValueError(f"Tabla '{ruta}' vacía o dañada")
+
+        firma, version, bits, huecos, crc, tam_datos, identificador = struct.unpack_from(FORMATO_CABECERA, self.datos)
+        if firma != FIRMA or version != VERSION_FORMATO:
+            self.cerrar()
+            raise ValueError(f"'{ruta}' no es una tabla de Comesolo de la versión {VERSION_FORMATO}")
+        if len(self.datos) != TAM_CABECERA + tam_datos:
+            self.cerrar()
+            raise ValueError(f"Tabla '{ruta}' incompleta")
+
+        self.bits_por_estado = bits
+        self.num_huecos = huecos
+        self.crc = crc
+        self.tam_datos = tam_datos
+        self.identificador = identificador.rstrip(b"\0").decode()
+        if tablero is not None and tablero.identificador != self.identificador:
+            self.cerrar()
+            raise ValueError(f"La tabla es del tablero '{self.identificador}', no de '{tablero.identificador}'")
+
+    # Valor guardado para una máscara de bits (bit i = ficha en el hueco i)
+    def valor(self, mascara: int) -> int:
+        indice = mascara >> 1
+        if self.bits_por_estado == 1:
+            return self.datos[TAM_CABECERA + (indice >> 3)] >> (indice & 7) & 1
+        return self.datos[TAM_CABECERA + (indice >> 2)] >> ((indice & 3) * 2) & 3
+
+    # Indica si desde el estado se puede terminar con una sola ficha
+    def es_resoluble(self, mascara: int) -> bool:
+        if self.bits_por_estado == 1:
+            return self.valor(mascara) == 1
+        return mascara != 0 and self.valor(mascara) == 0
+
+    # Mejor número de fichas alcanzable (4 significa "4 o más"); solo con 2 bits por estado
+    def mejor_fichas(self, mascara: int) -> Optional[int]:
+        if self.bits_por_estado != 2:
+            return None
+        return self.valor(mascara) + 1
+
+    # Recalcula el CRC32 de los datos y lo compara con el de la cabecera (recorre todo el archivo)
+    def verificar(self) -> bool:
+        crc = 0
+        for inicio in range(TAM_CABECERA, TAM_CABECERA + self.tam_datos, TAM_BLOQUE):
+            crc = zlib.crc32(self.datos[inicio:min(inicio + TAM_BLOQUE, TAM_CABECERA + self.tam_datos)], crc)
+        return crc == self.crc
+
+    # Libera la proyección en memoria y el archivo
+    def cerrar(self):
+        self.datos.close()
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+# Abre la tabla por defecto de un tablero, o devuelve None si no se ha construido
+def abrir_tablabase(tablero: Tablero) -> Optional[TablaBase]:
+    ruta = ruta_por_defecto(tablero)
+    if not os.path.exists(ruta):
+        return None
+    try:
+        return TablaBase(ruta, tablero)
+    except (OSError, ValueError):
+        return None
+
+
+# Órdenes de línea de comandos:
+#   python tablabase.py construir triangulo6 [--bits 2] [--ruta archivo.tb]
+#   python tablabase.py verificar triangulo6 [--ruta archivo.tb]
+def main():
+    parser = argparse.ArgumentParser(description="Tablas de resolubilidad de Comesolo")
+    parser.add_argument("orden", choices=["construir", "verificar"])
+    parser.add_argument("tablero", help="triangulo5..triangulo8, ingles, europeo o archivo .json")
+    parser.add_argument("--bits", type=int, default=1, choices=[1, 2], help="bits por estado")
+    parser.add_argument("--ruta", help="archivo de la tabla (por defecto en ~/.comesolo_tablas)")
+    argumentos = parser.parse_args()
+
+    tablero = cargar_tablero(argumentos.tablero)
+    ruta = argumentos.ruta or ruta_por_defecto(tablero)
+
+    if argumentos.orden == "construir":
+        inicio = time.time()
+
+        def informar(hechos, total):
+            print(f"\r   {hechos / total:6.1%} ({hechos:,} de {total:,} estados)", end="", flush=True)
+
+        print(f"Construyendo tabla de {tablero.nombre} ({1 << tablero.num_huecos:,} estados)...")
+        construir_tablabase(tablero, ruta, argumentos.bits, informar)
+        print(f"\nTabla escrita en {ruta} ({time.time() - inicio:.1f} s)")
+    else:
+        with TablaBase(ruta, tablero) as tabla:
+            print("Tabla correcta" if tabla.verificar() else "Tabla DAÑADA: la suma de control no coincide")
+
+
+# Punto de entrada del programa
+if __name__ == "__main__":
+    main()
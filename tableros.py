@@ -0,0 +1,282 @@
+import json # Para leer las definiciones de tableros
+import os # Para encontrar la carpeta de definiciones
+from typing import Dict, List, Optional, Tuple # Para decir qué tipo de datos usan las funciones
+
+from solucionador import compilar_saltos, crear_solucionador
+
+# Letras para las columnas de las etiquetas (a1, b3, ...)
+LETRAS = "abcdefghijklmnopqrstuvwxyz"
+
+# Carpeta con las definiciones de tableros incluidas (ingles.json, europeo.json, ...)
+CARPETA_DEFINICIONES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "definiciones_tableros")
+
+
+# Describe la geometría de un tablero: huecos, etiquetas, coordenadas y saltos.
+# Los huecos se numeran desde 1 (el índice 0 de los tableros en lista no se usa).
+# Las coordenadas están en unidades de "separación entre huecos vecinos"; cada
+# interfaz las escala a su tamaño de pantalla.
+class Tablero:
+
+    def __init__(self, identificador: str, nombre: str,
+                 coordenadas: Dict[int, Tuple[float, float]],
+                 etiquetas: Dict[int, str],
+                 movimientos_posibles: Dict[int, List[Tuple[int, int]]],
+                 filas: List[List[int]],
+                 simetrias: List[List[int]],
+                 forma: str = "triangulo",
+                 vacio_inicial: Optional[int] = None):
+        self.identificador = identificador  # Nombre corto, se usa como clave en las cachés
+        self.nombre = nombre  # Nombre para mostrar
+        self.num_huecos = len(coordenadas)
+        self.coordenadas = coordenadas  # {numero: (x, y)}
+        self.etiquetas = etiquetas  # {numero: 'a1'}
+        self.numeros = {v: k for k, v in etiquetas.items()}  # {'a1': numero}
+        self.movimientos_posibles = movimientos_posibles  # {origen: [(sobre, destino)]}
+        self.filas = filas  # Huecos de cada fila, de arriba a abajo (para la consola)
+        self.simetrias = simetrias  # Permutaciones que dejan el tablero igual
+        self.forma = forma  # 'triangulo' o 'rejilla' (cómo se dibuja en la consola)
+        self.vacio_inicial = vacio_inicial or 1  # Hueco vacío sugerido para empezar
+        self.saltos = compilar_saltos(movimientos_posibles)  # Saltos ya compilados a máscaras
+
+        # Invariantes de paridad: ningún salto cambia la paridad de fichas en estas máscaras
+        lineas = {tuple(sorted((d, s, h))) for d, s, h, _, _ in self.saltos}
+        self.invariantes = nucleo_gf2(self.num_huecos, lineas)
+        self.firmas_huecos = {self.firma(1 << n) for n in etiquetas}
+        self.cotas_firma = {}  # {firma: cota de fichas}
+
+    # Firma de paridad de un estado: no cambia al saltar, así que dos estados con
+    # firmas distintas nunca se alcanzan uno desde el otro
+    def firma(self, mascara: int) -> int:
+        resultado = 0
+        for k, invariante in enumerate(self.invariantes):
+            resultado |= (bin(mascara & invariante).count("1") & 1) << k
+        return resultado
+
+    # Cota inferior de las fichas que pueden quedar desde un estado según la paridad:
+    # 1 si alguna ficha sola tiene su misma firma, 2 si hace falta una pareja, etc.
+    # El resultado por firma se guarda, porque las búsquedas lo piden en cada estado.
+    def cota_fichas(self, mascara: int) -> int:
+        objetivo = self.firma(mascara)
+        k = self.cotas_firma.get(objetivo)
+        if k is None:
+            alcanzadas, k = set(self.firmas_huecos), 1
+            while objetivo not in alcanzadas and k < self.num_huecos:
+                alcanzadas = {a ^ b for a in alcanzadas for b in self.firmas_huecos}
+                k += 1
+            self.cotas_firma[objetivo] = k
+        return min(k, bin(mascara).count("1"))
+
+    # Máscara con todos los huecos ocupados
+    def mascara_llena(self) -> int:
+        return ((1 << (self.num_huecos + 1)) - 1) & ~1
+
+    # Crea el solucionador adecuado para este tablero. Si la paridad demuestra que no
+    # se puede llegar a una ficha, el objetivo pasa a ser la cota alcanzable, así la
+    # búsqueda se detiene al llegar a ella en lugar de recorrer todos los estados.
+    # ordenacion: política de orden de los saltos para la búsqueda en profundidad (ordenacion.py)
+    def nuevo_solucionador(self, mascara: int, ordenacion=None):
+        return crear_solucionador(mascara, self.saltos, self.num_huecos, self.cota_fichas(mascara), ordenacion)
+
+    # Comprueba que una máscara sea una disposición válida (al menos una ficha, solo huecos del tablero)
+    def validar_mascara(self, mascara: int) -> int:
+        if mascara <= 0 or mascara & ~self.mascara_llena():
+            raise ValueError("Disposición de fichas no válida para este tablero")
+        return mascara
+
+    # Convierte una disposición dada como etiquetas ('a1 b3 c5'), cadena de 0/1 (un
+    # carácter por hueco, en orden) o lista de tablero ([-1, 1, 0, ...]) a máscara de bits
+    def disposicion_a_mascara(self, disposicion) -> int:
+        if isinstance(disposicion, int):
+            return self.validar_mascara(disposicion)
+        if isinstance(disposicion, str):
+            texto = disposicion.strip().lower()
+            if len(texto) == self.num_huecos and set(texto) <= {"0", "1"}:
+                return self.validar_mascara(sum(1 << (i + 1) for i, c in enumerate(texto) if c == "1"))
+            disposicion = texto.replace(",", " ").split()
+        disposicion = list(disposicion)
+        if len(disposicion) == self.num_huecos + 1 and all(v in (-1, 0, 1) for v in disposicion):
+            return self.validar_mascara(sum(1 << i for i in range(1, self.num_huecos + 1) if disposicion[i] == 1))
+
+        mascara = 0
+        for etiqueta in disposicion:
+            if etiqueta not in self.numeros:
+                raise ValueError(f"Posición '{etiqueta}' no válida")
+            if mascara >> self.numeros[etiqueta] & 1:
+                raise ValueError(f"Posición '{etiqueta}' repetida")
+            mascara |= 1 << self.numeros[etiqueta]
+        return self.validar_mascara(mascara)
+
+    # Tablero en forma de lista: todos ocupados excepto la posición vacía
+    def tablero_inicial(self, posicion_vacia: int) -> List[int]:
+        tablero = [1] * (self.num_huecos + 1)
+        tablero[0] = -1
+        tablero[posicion_vacia] = 0
+        return tablero
+
+
+# Calcula una base del núcleo (sobre GF(2)) de la matriz de líneas de salto:
+# máscaras que tocan un número par de huecos de cada línea
+def nucleo_gf2(num_huecos: int, lineas) -> List[int]:
+    pivotes = {}  # {bit_pivote: fila reducida}
+    for a, b, c in lineas:
+        fila = (1 << a) | (1 << b) | (1 << c)
+        for bit, pivote in pivotes.items():
+            if fila >> bit & 1:
+                fila ^= pivote
+        if fila:
+            bit = fila.bit_length() - 1
+            for otro in pivotes:
+                if pivotes[otro] >> bit & 1:
+                    pivotes[otro] ^= fila
+            pivotes[bit] = fila
+
+    # Cada hueco libre (sin pivote) da un vector de la base
+    base = []
+    for libre in range(1, num_huecos + 1):
+        if libre in pivotes:
+            continue
+        vector = 1 << libre
+        for bit, pivote in pivotes.items():
+            if pivote >> libre & 1:
+                vector |= 1 << bit
+        base.append(vector)
+    return base
+
+# Calcula las simetrías del triángulo de n filas (3 giros x reflejo) como permutaciones
+# Cada permutación es una lista donde permutacion[i] es el hueco al que va el hueco i
+def simetrias_triangulo(filas: int) -> List[List[int]]:
+    # Numeración de los huecos: fila r (0..n-1), columna c (0..r) -> r*(r+1)/2 + c + 1
+    def numero(r, c):
+        return r * (r + 1) // 2 + c + 1
+
+    # Coordenadas baricéntricas (r - c, c, n - 1 - r): las simetrías las permutan
+    ordenes = [(0, 1, 2), (1, 0, 2), (0, 2, 1), (2, 1, 0), (1, 2, 0), (2, 0, 1)]
+    num_huecos = filas * (filas + 1) // 2
+    permutaciones = []
+    for orden in ordenes:
+        permutacion = [0] * (num_huecos + 1)
+        for r in range(filas):
+            for c in range(r + 1):
+                coordenadas = (r - c, c, filas - 1 - r)
+                nuevas = [coordenadas[orden[k]] for k in range(3)]
+                permutacion[numero(r, c)] = numero(filas - 1 - nuevas[2], nuevas[1])
+        permutaciones.append(permutacion)
+    return permutaciones
+
+# Genera el tablero triangular de n filas (5 filas = 15 huecos, 6 = 21, 7 = 28, 8 = 36)
+def tablero_triangular(filas: int = 5) -> Tablero:
+    if not 3 <= filas <= len(LETRAS):
+        raise ValueError(f"Número de filas '{filas}' no válido")
+
+    numeros = {}  # {(fila, columna): numero}
+    coordenadas = {}
+    etiquetas = {}
+    lista_filas = []
+    for r in range(filas):
+        fila = []
+        for c in range(r + 1):
+            n = len(numeros) + 1
+            numeros[(r, c)] = n
+            # Vecinos de la misma fila a distancia 1 y filas separadas 0.7 (como el dibujo original)
+            coordenadas[n] = (c - r / 2, r * 0.7)
+            etiquetas[n] = f"{LETRAS[c]}{r + 1}"
+            fila.append(n)
+        lista_filas.append(fila)
+
+    # Las seis direcciones del triángulo, en el orden del tablero original de 15 huecos
+    direcciones = [(-1, -1), (-1, 0), (0, -1), (0, 1), (1, 0), (1, 1)]
+    movimientos = {}
+    for (r, c), desde in numeros.items():
+        movimientos[desde] = []
+        for dr, dc in direcciones:
+            sobre = numeros.get((r + dr, c + dc))
+            hasta = numeros.get((r + 2 * dr, c + 2 * dc))
+            if sobre and hasta:
+                movimientos[desde].append((sobre, hasta))
+
+    return Tablero(f"triangulo{filas}", f"Triángulo de {filas} filas", coordenadas, etiquetas,
+                   movimientos, lista_filas, simetrias_triangulo(filas))
+
+
+# Calcula las simetrías de un tablero de rejilla cuadrada (giros y reflejos)
+# que llevan los huecos y las líneas de salto a huecos y líneas del propio tablero
+def simetrias_rejilla(coordenadas: Dict[int, Tuple[float, float]],
+                      lineas: List[Tuple[int, int, int]]) -> List[List[int]]:
+    xs = [x for x, y in coordenadas.values()]
+    ys = [y for x, y in coordenadas.values()]
+    cx, cy = (max(xs) + min(xs)) / 2, (max(ys) + min(ys)) / 2
+    por_coordenada = {(x - cx, y - cy): n for n, (x, y) in coordenadas.items()}
+    conjunto_lineas = {frozenset(linea) for linea in lineas}
+    transformaciones = [lambda x, y: (x, y), lambda x, y: (-y, x), lambda x, y: (-x, -y),
+                        lambda x, y: (y, -x), lambda x, y: (-x, y), lambda x, y: (x, -y),
+                        lambda x, y: (y, x), lambda x, y: (-y, -x)]
+    permutaciones = []
+    for transformar in transformaciones:
+        permutacion = [0] * (len(coordenadas) + 1)
+        for (x, y), n in por_coordenada.items():
+            destino = por_coordenada.get(transformar(x, y))
+            if destino is None:
+                break
+            permutacion[n] = destino
+        else:
+            # La transformación conserva los huecos; comprobar que también conserva las líneas
+            if all(frozenset(permutacion[n] for n in linea) in conjunto_lineas for linea in lineas):
+                permutaciones.append(permutacion)
+    return permutaciones
+
+# Compila una definición de tablero (diccionario leído de JSON) a un Tablero.
+# Formato:
+#   "identificador": nombre corto,  "nombre": nombre para mostrar,
+#   "forma": "rejilla" o "triangulo",  "vacio_inicial": etiqueta sugerida,
+#   "huecos": {"etiqueta": [x, y], ...}  (coordenadas en unidades entre vecinos),
+#   "lineas": [["a1", "b1", "c1"], ...]  (tres huecos en línea; se salta en ambos sentidos)
+def compilar_definicion(definicion: dict) -> Tablero:
+    huecos = definicion["huecos"]
+    if not huecos:
+        raise ValueError("La definición no tiene huecos")
+
+    # Numera los huecos de arriba a abajo y de izquierda a derecha
+    orden = sorted(huecos, key=lambda etiqueta: (huecos[etiqueta][1], huecos[etiqueta][0]))
+    numeros = {etiqueta: i + 1 for i, etiqueta in enumerate(orden)}
+    coordenadas = {numeros[e]: (float(huecos[e][0]), float(huecos[e][1])) for e in orden}
+    etiquetas = {n: e for e, n in numeros.items()}
+
+    # Cada línea a-b-c permite saltar de a a c sobre b y de c a a sobre b
+    lineas = []
+    for linea in definicion["lineas"]:
+        if len(linea) != 3 or any(e not in numeros for e in linea):
+            raise ValueError(f"Línea de salto no válida: {linea}")
+        lineas.append(tuple(numeros[e] for e in linea))
+    movimientos = {n: [] for n in etiquetas}
+    for a, b, c in sorted(lineas):
+        movimientos[a].append((b, c))
+        movimientos[c].append((b, a))
+
+    # Filas para la consola: huecos agrupados por su coordenada y
+    filas = {}
+    for n in sorted(coordenadas, key=lambda n: coordenadas[n][0]):
+        filas.setdefault(coordenadas[n][1], []).append(n)
+
+    vacio = definicion.get("vacio_inicial")
+    return Tablero(definicion["identificador"], definicion.get("nombre", definicion["identificador"]),
+                   coordenadas, etiquetas, movimientos, [filas[y] for y in sorted(filas)],
+                   simetrias_rejilla(coordenadas, lineas), definicion.get("forma", "rejilla"),
+                   numeros.get(vacio) if vacio else None)
+
+# Carga un tablero por nombre ('triangulo6', 'ingles', 'europeo') o desde un archivo .json
+def cargar_tablero(nombre: str) -> Tablero:
+    if nombre.startswith("triangulo") and nombre[len("triangulo"):].isdigit():
+        return tablero_triangular(int(nombre[len("triangulo"):]))
+
+    ruta = nombre if nombre.endswith(".json") else os.path.join(CARPETA_DEFINICIONES, nombre + ".json")
+    if not os.path.exists(ruta):
+        raise ValueError(f"Tablero '{nombre}' no encontrado")
+    with open(ruta, encoding="utf-8") as archivo:
+        return compilar_definicion(json.load(archivo))
+
+# Nombres de los tableros disponibles (triángulos de 5 a 8 filas y las definiciones incluidas)
+def tableros_disponibles() -> List[str]:
+    nombres = [f"triangulo{n}" for n in range(5, 9)]
+    if os.path.isdir(CARPETA_DEFINICIONES):
+        nombres += sorted(f[:-5] for f in os.listdir(CARPETA_DEFINICIONES) if f.endswith(".json"))
+    return nombres